@@ -1,20 +1,43 @@
+import time
+
+_STARTUP_T0 = time.perf_counter()
+
 import pygame
 import sys
 import os
-import copy
 import re
-
-pygame.init()
+import json
+import mmap
+import struct
+import argparse
+import atexit
+import bisect
+import heapq
+import math
+import random
+import csv
+import tracemalloc
+import tempfile
+import threading
+import io
+import zlib
+import http.server
+import socket
+import multiprocessing
+import concurrent.futures
+import importlib.util
+from array import array
+from collections import deque
+from typing import NamedTuple, Optional
 
 # region DEFAULTS
 START_SCORE = 301
 player_names = ["Player 1", "Player 2"]
 
-# Get current display resolution and use fullscreen
-display_info = pygame.display.Info()
-WIDTH, HEIGHT = display_info.current_w, display_info.current_h
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN)
-pygame.display.set_caption(f"GSSZO Darts Counter")
+# The window is created once by init_app(); importing the module opens nothing
+WIDTH, HEIGHT = 0, 0       # size of screen, the surface everything is drawn on
+screen = None
+display_surface = None     # the window; screen is a smaller off-screen surface with --render-height
 
 # --- icon helpers ---
 
@@ -28,12 +51,170 @@ def resource_path(relative_path: str) -> str:
         base_path = os.path.dirname(__file__)
     return os.path.join(base_path, relative_path)
 
-try:
-    icon_path = resource_path(os.path.join("assets", "gsszo_logo_32x32.png"))
-    icon_surface = pygame.image.load(icon_path).convert_alpha()
-    pygame.display.set_icon(icon_surface)
-except Exception as e:
-    print("Could not set window icon:", e)
+# region ASSET BUNDLE
+#
+# Build step: `python gsszo_darts_counter.py --pack-assets` decodes every PNG in
+# assets/ and every sponsor logo once and writes the raw RGBA pixels into a
+# single file with a JSON index. At runtime the bundle is memory-mapped and
+# surfaces are created straight from the mapped pixels, so no PNG decoding
+# happens at startup. Anything missing from the bundle (or a loose file that
+# changed after packing) is loaded from the loose file as before. A loose file
+# counts as changed by size and CRC-32, not mtime: a PyInstaller onefile build
+# extracts everything into a fresh temp dir with new mtimes on every start.
+#
+# Layout: header "<4sII" (magic, version, index length), the UTF-8 JSON index,
+# then the pixel blobs, each aligned to ASSET_BUNDLE_ALIGN bytes.
+
+ASSET_BUNDLE_MAGIC = b"GSZB"
+ASSET_BUNDLE_VERSION = 1
+ASSET_BUNDLE_ALIGN = 16
+ASSET_BUNDLE_HEADER = struct.Struct("<4sII")
+ASSET_BUNDLE_PATH = resource_path(os.path.join("assets", "assets.bundle"))
+ASSET_IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+def _bundle_key(path: str):
+    """Bundle index key for a file path: forward-slash path relative to the app base."""
+    rel = os.path.relpath(os.path.abspath(path), os.path.abspath(resource_path("")))
+    if rel.startswith(".."):
+        return None
+    return rel.replace(os.sep, "/")
+
+def _asset_bundle_sources():
+    """Image files packed into the bundle: the app assets and the sponsor logos."""
+    sources = []
+    for folder in (os.path.join("assets"), os.path.join("display_bar", "logos")):
+        folder_path = resource_path(folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            path = os.path.join(folder_path, name)
+            if os.path.isfile(path) and name.lower().endswith(ASSET_IMAGE_EXTS):
+                sources.append(path)
+    return sources
+
+def pack_asset_bundle(output_path: str = ASSET_BUNDLE_PATH) -> int:
+    """Decode all bundled images and write them as one raw-pixel bundle. Returns the entry count."""
+    to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+
+    index = {}
+    blobs = []
+    offset = 0
+    for path in _asset_bundle_sources():
+        key = _bundle_key(path)
+        try:
+            surface = pygame.image.load(path)
+        except Exception as exc:
+            print(f"Skipping '{path}':", exc)
+            continue
+        pixels = to_bytes(surface, "RGBA")
+        stat = os.stat(path)
+        with open(path, "rb") as handle:
+            src_crc32 = zlib.crc32(handle.read())
+        index[key] = {
+            "w": surface.get_width(),
+            "h": surface.get_height(),
+            "offset": offset,
+            "size": len(pixels),
+            "src_size": stat.st_size,
+            "src_mtime_ns": stat.st_mtime_ns,
+            "src_crc32": src_crc32,
+        }
+        padding = -len(pixels) % ASSET_BUNDLE_ALIGN
+        blobs.append(pixels + b"\0" * padding)
+        offset += len(pixels) + padding
+
+    index_bytes = json.dumps({"entries": index}, sort_keys=True).encode("utf-8")
+    data_start = ASSET_BUNDLE_HEADER.size + len(index_bytes)
+    index_bytes += b" " * (-data_start % ASSET_BUNDLE_ALIGN)
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(ASSET_BUNDLE_HEADER.pack(ASSET_BUNDLE_MAGIC, ASSET_BUNDLE_VERSION, len(index_bytes)))
+        handle.write(index_bytes)
+        for blob in blobs:
+            handle.write(blob)
+    os.replace(tmp_path, output_path)
+    return len(index)
+
+class AssetBundle:
+    """Read-only, memory-mapped view of the packed asset bundle."""
+
+    def __init__(self, path: str):
+        self.entries = {}
+        self._map = None
+        self._data_start = 0
+        try:
+            with open(path, "rb") as handle:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+
+        try:
+            magic, version, index_len = ASSET_BUNDLE_HEADER.unpack_from(self._map, 0)
+            if magic != ASSET_BUNDLE_MAGIC or version != ASSET_BUNDLE_VERSION:
+                raise ValueError("unsupported bundle format")
+            index_start = ASSET_BUNDLE_HEADER.size
+            index = json.loads(self._map[index_start:index_start + index_len].decode("utf-8"))
+            self.entries = index["entries"]
+            self._data_start = index_start + index_len
+        except Exception as exc:
+            print("Ignoring asset bundle:", exc)
+            self.entries = {}
+
+    def load(self, path: str):
+        """Surface for path from the bundle, or None if it is missing or stale."""
+        key = _bundle_key(path)
+        entry = self.entries.get(key) if key else None
+        if entry is None:
+            return None
+
+        # A loose file that changed after packing wins over the bundled copy
+        if not self._source_unchanged(path, entry):
+            return None
+
+        start = self._data_start + entry["offset"]
+        pixels = memoryview(self._map)[start:start + entry["size"]]
+        return pygame.image.frombuffer(pixels, (entry["w"], entry["h"]), "RGBA")
+
+    @staticmethod
+    def _source_unchanged(path: str, entry: dict) -> bool:
+        """True if the loose file is missing or still the one that was packed."""
+        if getattr(sys, "frozen", False):
+            return True     # bundle and loose files come out of the same build
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return True
+        if stat.st_size != entry["src_size"]:
+            return False
+        if stat.st_mtime_ns == entry["src_mtime_ns"]:
+            return True
+        # Same size, new mtime (a fresh checkout or extraction): compare the contents
+        if "src_crc32" not in entry:
+            return False
+        try:
+            with open(path, "rb") as handle:
+                return zlib.crc32(handle.read()) == entry["src_crc32"]
+        except OSError:
+            return True
+
+asset_bundle = AssetBundle(ASSET_BUNDLE_PATH)
+
+def load_image(path: str, convert: bool = True) -> pygame.Surface:
+    """Load an image as a per-pixel-alpha surface, preferring the packed bundle."""
+    surface = asset_bundle.load(path)
+    if surface is None:
+        surface = pygame.image.load(path)
+    return surface.convert_alpha() if convert else surface
+
+def _set_window_icon():
+    # Set before the first set_mode so the window is created with the icon
+    try:
+        icon_path = resource_path(os.path.join("assets", "gsszo_logo_32x32.png"))
+        icon_surface = load_image(icon_path, convert=False)
+        pygame.display.set_icon(icon_surface)
+    except Exception as e:
+        print("Could not set window icon:", e)
 
 # Colours
 PALETTE_DARK = {
@@ -96,10 +277,401 @@ SPONSOR_BAR_HEIGHT = 40  # adjustable height for the sponsor ticker
 SPONSOR_SCROLL_SPEED = 20  # pixels per second
 SPONSOR_LOGO_GAP = 20
 SPONSOR_ENTRY_GAP = 40
+LOGO_TOP_GAP = 20          # px gap between screen top and logo top
+LOGO_BOTTOM_GAP = 20       # px gap between logo bottom and horizontal divider
+LOGO_SIDE_MARGIN = 20      # px side margin for width constraint
 
 current_fullscreen = True
 current_dark_mode = True
 
+# Fonts (sizes are for the 1920x1080 reference layout, scaled in compute_layout)
+FONT_SIZES = {
+    "font_title": 100,
+    "font_huge": 110,
+    "font_big": 72,
+    "font_med": 46,
+    "font_small": 30,
+    "font_round": 46,
+    "font_sponsor": 28,
+}
+
+font_title = font_huge = font_big = font_med = None
+font_small = font_round = font_sponsor = None
+
+class LazyFont:
+    """Stands in for a pygame Font and only loads it the first time it is used."""
+
+    def __init__(self, size: int, shared: dict):
+        self.point_size = size
+        self._shared = shared  # point size -> Font, so equal sizes load once
+
+    def _font(self):
+        font = self._shared.get(self.point_size)
+        if font is None:
+            font = pygame.font.SysFont(None, self.point_size)
+            self._shared[self.point_size] = font
+        return font
+
+    def __getattr__(self, name):
+        return getattr(self._font(), name)
+
+def _build_fonts(scale: float):
+    shared = {}
+    for name, size in FONT_SIZES.items():
+        globals()[name] = LazyFont(max(10, int(round(size * scale))), shared)
+
+# region SURFACE CACHES
+#
+# Every cache of pre-rendered surfaces has a byte budget and evicts the least
+# recently used surfaces beyond it, so a board that runs all day keeps a flat
+# memory footprint however many names, sizes and themes it goes through.
+
+MIB = 1024 * 1024
+SURFACE_CACHE_BUDGETS = {
+    "logo": 24 * MIB,      # scaled club logo layers
+    "ticker": 16 * MIB,    # sponsor bar logos and names
+    "text": 8 * MIB,       # wrapped player-name blocks
+}
+
+_MISSING = object()
+
+def surface_bytes(surface) -> int:
+    return surface.get_pitch() * surface.get_height() if surface is not None else 0
+
+class SurfaceCache:
+    """
+    LRU mapping of key -> surface, bounded by total pixel bytes. The render
+    thread fills it while the main thread may clear it, hence the lock.
+    """
+
+    def __init__(self, name: str, budget: int):
+        self.name = name
+        self.budget = budget
+        self.items = {}        # insertion order doubles as recency order
+        self.nbytes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, key):
+        with self.lock:
+            surface = self.items.pop(key)
+            self.items[key] = surface
+            return surface
+
+    def get(self, key, default=None):
+        with self.lock:
+            surface = self.items.pop(key, _MISSING)
+            if surface is _MISSING:
+                return default
+            self.items[key] = surface
+            return surface
+
+    def __setitem__(self, key, surface):
+        with self.lock:
+            if key in self.items:
+                self.nbytes -= surface_bytes(self.items.pop(key))
+            self.items[key] = surface
+            self.nbytes += surface_bytes(surface)
+            # Evict the oldest entries, but never the one just stored
+            while self.nbytes > self.budget and len(self.items) > 1:
+                oldest = next(iter(self.items))
+                self.nbytes -= surface_bytes(self.items.pop(oldest))
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.nbytes = 0
+
+# region LAYOUT
+
+# All coordinates below are designed for this reference resolution and scaled
+# uniformly to the real display, so nothing depends on hardcoded pixel offsets.
+LAYOUT_BASE_WIDTH = 1920
+LAYOUT_BASE_HEIGHT = 1080
+
+UI_SCALE = 1.0
+layout = {}                # rebuilt by compute_layout() on every mode switch / resize
+# SDL_ttf is not thread-safe and a relayout must not land in the middle of a
+# frame, so whatever draws with the shared fonts or rebuilds them holds this:
+# the render thread for a whole game frame, the main thread for the menu, the
+# end screen and relayouts, the sponsor watcher for each text it renders.
+frame_lock = threading.RLock()
+# (layer, diameter) -> scaled logo surface
+logo_scale_cache = SurfaceCache("logo", SURFACE_CACHE_BUDGETS["logo"])
+# (name, font, colour, wrap width) -> rendered name block
+name_block_cache = SurfaceCache("text", SURFACE_CACHE_BUDGETS["text"])
+# ("logo", filename, file stamp, height) / ("text", name, font, colour) -> sponsor bar piece
+ticker_surface_cache = SurfaceCache("ticker", SURFACE_CACHE_BUDGETS["ticker"])
+SURFACE_CACHES = (logo_scale_cache, ticker_surface_cache, name_block_cache)
+
+def _px(value) -> int:
+    """Scale a reference-layout pixel value to the current display."""
+    return max(1, int(round(value * UI_SCALE)))
+
+def _compute_menu_layout():
+    settings_btn = pygame.Rect(_px(60), _px(60), _px(64), _px(64))
+
+    col_w = _px(760)
+    col_x = WIDTH // 2 - col_w // 2
+    box_h = _px(70)
+    gap_y = _px(105)
+    y0 = HEIGHT // 2 - _px(250)
+
+    # Focus arrows sit beside a widget; side-by-side widgets leave room for them
+    arrow_w = font_big.size(">")[0] + _px(10)
+    pair_gap_x = 2 * (arrow_w + _px(4))
+
+    panel_padding = _px(20)
+    panel_w = _px(200)
+    checkbox_gap = _px(36)
+    label_h = _px(26)
+    panel_h = panel_padding * 2 + label_h + box_h * 3 + checkbox_gap * 2
+    panel = pygame.Rect(settings_btn.x, settings_btn.bottom + _px(20), panel_w, panel_h)
+
+    widgets = {}
+    # Player names fill the first two rows column by column: one column
+    # (the classic layout) for two players, up to four for eight. The grid
+    # stays centred and clear of the settings panel, focus arrows included.
+    player_count = menu_player_count()
+    name_cols = (player_count + 1) // 2
+    grid_margin = panel.right + arrow_w + _px(24)
+    grid_w = col_w if name_cols == 1 else max(name_cols * _px(120),
+                                              min(WIDTH - 2 * grid_margin, name_cols * _px(420)))
+    name_w = (grid_w - (name_cols - 1) * pair_gap_x) // name_cols
+    grid_x = WIDTH // 2 - grid_w // 2
+    for i, key in enumerate(PLAYER_NAME_KEYS[:player_count]):
+        col, row = divmod(i, 2)
+        widgets[key] = pygame.Rect(grid_x + col * (name_w + pair_gap_x), y0 + row * gap_y, name_w, box_h)
+
+    widgets["score"] = pygame.Rect(col_x, y0 + 2 * gap_y, col_w, box_h)
+    # Legs to win and the player count share a row
+    half_w = (col_w - pair_gap_x) // 2
+    widgets["legs"] = pygame.Rect(col_x, y0 + 3 * gap_y, half_w, box_h)
+    widgets["players"] = pygame.Rect(col_x + col_w - half_w, y0 + 3 * gap_y, half_w, box_h)
+    widgets["doubleout"] = pygame.Rect(col_x, y0 + 4 * gap_y, col_w, box_h)
+    widgets["start"] = pygame.Rect(col_x, y0 + 5 * gap_y, col_w, box_h + _px(10))
+
+    panel_widgets = {}
+    checkbox_y = panel.y + panel_padding + label_h
+    for key in ("fullscreen", "darkmode", "showsponsors"):
+        panel_widgets[key] = pygame.Rect(
+            panel.x + panel_padding, checkbox_y, panel_w - panel_padding * 2, box_h
+        )
+        checkbox_y += box_h + checkbox_gap
+
+    score_rect = widgets["score"]
+    score_half_w = score_rect.w // 2
+    score_301 = pygame.Rect(score_rect.x, score_rect.y, score_half_w, score_rect.h)
+    score_501 = pygame.Rect(score_rect.x + score_half_w, score_rect.y, score_rect.w - score_half_w, score_rect.h)
+
+    # Area a widget can paint: its label above and the focus arrows on both sides
+    damage = {
+        key: pygame.Rect(
+            rect.x - arrow_w - _px(4),
+            rect.y - label_h,
+            rect.w + 2 * (arrow_w + _px(4)),
+            rect.h + label_h + _px(4),
+        )
+        for key, rect in widgets.items()
+    }
+
+    return {
+        "settings_btn": settings_btn,
+        "title_center": (WIDTH // 2, HEIGHT // 2 - _px(330)),
+        "widgets": widgets,
+        "score_301": score_301,
+        "score_501": score_501,
+        "damage": damage,
+        "panel": panel,
+        "panel_widgets": panel_widgets,
+    }
+
+def _compute_player_layout(x_start: int, width: int, is_left: bool, height: int):
+    cx = x_start + width // 2
+
+    # Badge geometry (same style for Legs / Leg avg / Match avg)
+    stats_margin_x = _px(40)
+    badge_w, badge_h = _px(200), _px(56)
+    badge_gap_y = _px(8)
+    if is_left:
+        badge_x = x_start + stats_margin_x
+    else:
+        badge_x = x_start + width - stats_margin_x - badge_w
+
+    legs_rect = pygame.Rect(badge_x, _px(30), badge_w, badge_h)
+    leg_avg_rect = pygame.Rect(badge_x, legs_rect.bottom + badge_gap_y, badge_w, badge_h)
+    match_avg_rect = pygame.Rect(badge_x, leg_avg_rect.bottom + badge_gap_y, badge_w, badge_h)
+    # Optional win-chance badge; it sits beside "Remaining", not above it
+    win_rect = pygame.Rect(badge_x, match_avg_rect.bottom + badge_gap_y, badge_w, badge_h)
+
+    # "Remaining" sits below the badges so nothing overlaps
+    rem_label_y = match_avg_rect.bottom + _px(40)
+    rem_y = rem_label_y + _px(80)
+    rem_bottom = rem_y - font_huge.get_height() // 2 + font_huge.get_height()
+
+    input_label_y = rem_bottom + _px(40)
+    rounds_label_y = input_label_y + _px(80)
+    header_y = rounds_label_y + _px(30)
+    start_y = header_y + _px(36)
+    line_height = _px(36)
+    text_x = x_start + _px(40)
+
+    return {
+        "x": x_start,
+        "width": width,
+        "name_font": font_big,
+        "name_top_center": (cx, _px(50)),
+        # The name is centered between the badge columns on both sides
+        "name_wrap_w": max(_px(80), width - 2 * (stats_margin_x + badge_w + _px(20))),
+        "badges": (legs_rect, leg_avg_rect, match_avg_rect),
+        "win_badge": win_rect,
+        "rem_label_center": (cx, rem_label_y),
+        "rem_center": (cx, rem_y),
+        "input_label_pos": (text_x, input_label_y),
+        "input_value_pos": (text_x, input_label_y + _px(30)),
+        "rounds_label_pos": (text_x, rounds_label_y),
+        "table_font": font_round,
+        "table_headers": ("#", "Score", "Remaining"),
+        "header_y": header_y,
+        "col_round_x": text_x,
+        "col_score_x": x_start + _px(140),
+        "col_rem_x": x_start + _px(320),
+        "score_dx": _px(10),
+        "rem_dx": _px(40),
+        "rows_y": start_y + _px(10),
+        "line_height": line_height,
+        "max_lines": max(1, (height - start_y - _px(60)) // line_height),
+        # Horizontal divider: just under the remaining score, above the input label
+        "hline_y": min(rem_bottom + _px(8), input_label_y - _px(8)),
+    }
+
+def _compute_column_layout(x_start: int, width: int, height: int):
+    """
+    One of 3-8 equal columns: name, stacked badges and the remaining score on
+    top of each other, with a narrower font for the name and the rounds table.
+    """
+    cx = x_start + width // 2
+    margin = _px(20)
+
+    badge_w, badge_h = min(_px(200), width - 2 * margin), _px(48)
+    badge_gap_y = _px(8)
+    badge_x = cx - badge_w // 2
+    badge_y = _px(30) + NAME_MAX_LINES * font_med.get_linesize() + _px(10)
+    badge_rects = []
+    for _ in range(4):   # legs, leg avg, match avg, win chance
+        badge_rects.append(pygame.Rect(badge_x, badge_y, badge_w, badge_h))
+        badge_y += badge_h + badge_gap_y
+
+    rem_y = badge_rects[-1].bottom + _px(70)
+    rem_bottom = rem_y - font_huge.get_height() // 2 + font_huge.get_height()
+
+    input_label_y = rem_bottom + _px(30)
+    rounds_label_y = input_label_y + _px(70)
+    header_y = rounds_label_y + _px(30)
+    start_y = header_y + _px(30)
+    line_height = _px(30)
+    text_x = x_start + margin
+
+    return {
+        "x": x_start,
+        "width": width,
+        "name_font": font_med,
+        "name_top_center": (cx, _px(30)),
+        "name_wrap_w": max(_px(60), width - 2 * margin),
+        "badges": tuple(badge_rects[:3]),
+        "win_badge": badge_rects[3],
+        "rem_label_center": None,    # no room for the "Remaining:" label
+        "rem_center": (cx, rem_y),
+        "input_label_pos": (text_x, input_label_y),
+        "input_value_pos": (text_x, input_label_y + _px(30)),
+        "rounds_label_pos": (text_x, rounds_label_y),
+        "table_font": font_small,
+        "table_headers": ("#", "Score", "Left"),
+        "header_y": header_y,
+        "col_round_x": text_x,
+        "col_score_x": x_start + width * 3 // 10,
+        "col_rem_x": x_start + width * 6 // 10,
+        "score_dx": 0,
+        "rem_dx": 0,
+        "rows_y": start_y + _px(6),
+        "line_height": line_height,
+        "max_lines": max(1, (height - start_y - _px(60)) // line_height),
+        "hline_y": min(rem_bottom + _px(8), input_label_y - _px(8)),
+    }
+
+def _compute_game_layout(width: int, height: int, player_count: int):
+    if player_count == 2:
+        half_width = width // 2
+        players = [
+            _compute_player_layout(0, half_width, True, height),
+            _compute_player_layout(half_width, half_width, False, height),
+        ]
+    else:
+        col_w = width // player_count
+        players = [
+            # The last column takes the rounding remainder
+            _compute_column_layout(i * col_w, col_w if i < player_count - 1 else width - i * col_w, height)
+            for i in range(player_count)
+        ]
+    # Use the lower (max) so the line is surely under every "Remaining" number
+    hline_y = max(p["hline_y"] for p in players)
+
+    # Logo: centered circle between LOGO_TOP_GAP and the horizontal divider.
+    # With more than two columns there is no free space in the middle for it.
+    logo_top_gap = _px(LOGO_TOP_GAP)
+    available_h = hline_y - logo_top_gap - _px(LOGO_BOTTOM_GAP)
+    max_w = max(1, width - 2 * _px(LOGO_SIDE_MARGIN))
+    logo_diameter = int(max(0, min(available_h, max_w))) if player_count == 2 else 0
+
+    return {
+        "players": players,
+        "hline_y": hline_y,
+        "divider_xs": [p["x"] for p in players[1:]],
+        # Two players share the top half with the logo; columns are split all the way up
+        "divider_top": hline_y if player_count == 2 else 0,
+        "divider_w": max(1, _px(3)),
+        "logo_diameter": logo_diameter,
+        "logo_center": (width // 2, logo_top_gap + logo_diameter // 2),
+        "sponsor_bar_h": max(24, _px(SPONSOR_BAR_HEIGHT)),
+    }
+
+def _compute_end_layout(width: int, height: int):
+    cx, cy = width // 2, height // 2
+    return {
+        "title_center": (cx, cy - _px(200)),
+        "winner_center": (cx, cy - _px(80)),
+        "players_center": (cx, cy + _px(10)),
+        "legs_center": (cx, cy + _px(60)),
+        "rem_center": (cx, cy + _px(100)),
+    }
+
+def compute_layout():
+    """Rebuild fonts and every screen rect for the current WIDTH/HEIGHT."""
+    global UI_SCALE, layout
+
+    with frame_lock:
+        UI_SCALE = min(WIDTH / LAYOUT_BASE_WIDTH, HEIGHT / LAYOUT_BASE_HEIGHT)
+        _build_fonts(UI_SCALE)
+        logo_scale_cache.clear()
+        name_block_cache.clear()
+
+        layout = {
+            "label_dy": _px(26),
+            "arrow_gap": _px(10),
+            "border": max(1, _px(2)),
+            "radius": _px(10),
+            "menu": _compute_menu_layout(),
+            "game": _compute_game_layout(WIDTH, HEIGHT, len(player_names)),
+            "end": _compute_end_layout(WIDTH, HEIGHT),
+        }
+
 # Display mode helpers
 
 def _maximize_window_if_possible():
@@ -113,7 +685,7 @@ def _maximize_window_if_possible():
 
 def apply_display_mode(fullscreen: bool, force: bool = False):
     """Switch between fullscreen and maximized windowed modes."""
-    global screen, WIDTH, HEIGHT, current_fullscreen
+    global current_fullscreen
 
     if screen is not None and not force and fullscreen == current_fullscreen:
         return
@@ -127,21 +699,65 @@ def apply_display_mode(fullscreen: bool, force: bool = False):
     if not fullscreen:
         _maximize_window_if_possible()
 
-    WIDTH, HEIGHT = screen_surface.get_size()
-    screen = screen_surface
+    configure_render_target(screen_surface)
     current_fullscreen = fullscreen
+    compute_layout()
+
+# Internal render resolution
+#
+# On a 4K display every fill, blit and rotation touches 8 million pixels. With
+# --render-height (e.g. 1080) everything is drawn at that height into an
+# off-screen screen surface, laid out and with fonts as for that size, and
+# present_frame() upscales it to the window once per frame.
+
+RENDER_HEIGHT = 0          # internal rendering height; 0 (or a smaller display) renders natively
+RENDER_FILTER = "auto"     # upscale: "auto" (nearest at whole-number factors, else smooth), "smooth" or "nearest"
+
+def configure_render_target(window_surface):
+    """Point screen, WIDTH and HEIGHT at the window, or at an internal-resolution surface in front of it."""
+    global display_surface, screen, WIDTH, HEIGHT
+    display_surface = window_surface
+    window_w, window_h = window_surface.get_size()
+    if RENDER_HEIGHT and window_h > RENDER_HEIGHT:
+        size = (max(1, round(window_w * RENDER_HEIGHT / window_h)), RENDER_HEIGHT)
+        if screen is None or screen is window_surface or screen.get_size() != size:
+            screen = pygame.Surface(size, 0, window_surface)
+    else:
+        screen = window_surface
+    WIDTH, HEIGHT = screen.get_size()
+
+def upscale_frame(source, target):
+    """Scale source over the whole of target, in place."""
+    size = target.get_size()
+    factor = size[1] // source.get_height()
+    whole = size == (factor * source.get_width(), factor * source.get_height())
+    if RENDER_FILTER == "nearest" or (RENDER_FILTER == "auto" and whole):
+        # Whole-number factors repeat each pixel exactly: text stays crisp and it is the cheapest filter
+        pygame.transform.scale(source, size, target)
+    else:
+        pygame.transform.smoothscale(source, size, target)
+
+def present_frame(rects=None):
+    """Put screen on the display: the dirty rects (or everything) natively, or one upscale of the frame."""
+    if screen is display_surface:
+        if rects:
+            pygame.display.update(rects)
+        else:
+            pygame.display.flip()
+        return
+    upscale_frame(screen, display_surface)
+    pygame.display.flip()
+
+def render_pos(pos):
+    """A window position (mouse) in screen coordinates."""
+    if screen is display_surface:
+        return pos
+    return (pos[0] * WIDTH // display_surface.get_width(), pos[1] * HEIGHT // display_surface.get_height())
 
-apply_display_mode(True, force=True)
-pygame.display.set_caption("GSSZO Darts Counter")
+def pointer_pos():
+    """The mouse position in screen coordinates."""
+    return render_pos(pygame.mouse.get_pos())
 
-# Fonts
-font_title = pygame.font.SysFont(None, 100)
-font_huge  = pygame.font.SysFont(None, 110)
-font_big   = pygame.font.SysFont(None, 72)
-font_med   = pygame.font.SysFont(None, 46)
-font_small = pygame.font.SysFont(None, 30)
-font_round = pygame.font.SysFont(None, 46)
-font_sponsor = pygame.font.SysFont(None, 28)
 
 clock = pygame.time.Clock()
 frame_dt = 0.0
@@ -153,24 +769,39 @@ STATE_END  = "END"
 state = STATE_MENU
 
 # ---- MATCH / LEG STATE ----
+MIN_PLAYERS = 2
+MAX_PLAYERS = 8
+
 current_input = ""         # current numeric input while throwing
-scores = [[], []]          # per-leg list of throws
-active_player = 0          # 0 or 1 (whose turn)
-history = []               # list of (player_index, score) for undo (per leg)
+visit_darts = []           # (segment, multiplier) of this visit's darts from the dartboard
+scores = [array("H"), array("H")]  # per player: this leg's visits (0-180, 2 bytes each)
+active_player = 0          # index into player_names (whose turn)
+history = []               # list of (player_index, score) in throwing order (per leg)
+visit_times = []           # seconds since match_started_at of every visit in the match, in throwing order
+match_started_at = 0.0     # time.monotonic() when the match was set up
 winner_idx = None          # match winner when STATE_END
 
+# Running sums so rendering and stats never re-add whole legs; see recount_totals()
+leg_totals = array("l", [0, 0])     # sum of scores[p]
+match_totals = array("l", [0, 0])   # points scored in finished legs
+match_visits = array("l", [0, 0])   # visits thrown in finished legs
+
 LEGS_TO_WIN = 2            # target legs to win the match
 legs_won = [0, 0]          # legs won by players
 leg_starter_idx = 0        # who started the CURRENT leg
 DOUBLE_OUT_ENABLED = True  # double out rule active?
 
 # Stack of finished-leg snapshots for cross-leg undo
-finished_legs_stack = []   # each item: dict with scores, history, active_player, leg_starter_idx, winner
+finished_legs_stack = []   # each item: dict with scores, history, totals, active_player, leg_starter_idx, winner
+undo_stack = []            # actions in the order they were made, see do_visit() / swap_starter()
+redo_stack = []            # undone actions, most recently undone last
 
 # ---- MENU STATE ----
+PLAYER_NAME_KEYS = tuple(f"p{i}" for i in range(1, MAX_PLAYERS + 1))
+
 menu_values = {
-    "p1": player_names[0],
-    "p2": player_names[1],
+    **{key: f"Player {i}" for i, key in enumerate(PLAYER_NAME_KEYS, start=1)},
+    "players": "2",   # player count as string, MIN_PLAYERS..MAX_PLAYERS
     "score": "301",   # "301" or "501"
     "legs": "2",      # number as string
     "doubleout": True,
@@ -178,16 +809,13 @@ menu_values = {
     "darkmode": True,
     "fullscreen": True,
 }
-active_input_key = "p1"    # "p1" | "p2" | "score" | "legs" | "doubleout" | "start"
-start_btn_rect = None      # set in draw_menu()
+active_input_key = "p1"    # "p1".."p8" | "score" | "legs" | "players" | "doubleout" | "start"
+start_btn_rect = None      # set in menu_hit_rects()
 settings_menu_open = False
 settings_panel_rect = None
 
 # ---- ASSETS: LOGO (two-layer, with fallback) ----
 ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
-LOGO_TOP_GAP = 20          # px gap between screen top and logo top
-LOGO_BOTTOM_GAP = 20       # px gap between logo bottom and horizontal divider
-LOGO_SIDE_MARGIN = 20      # px side margin for width constraint
 
 # Rotation settings
 LOGO_ROT_SPEED_DEG = 40.0  # degrees per second
@@ -195,18 +823,31 @@ LOGO_ANGLE = 0.0           # will be updated every frame
 
 def _load_alpha(path):
     try:
-        return pygame.image.load(path).convert_alpha()
+        return load_image(path)
     except Exception:
         return None
 
 # Preferred two-piece assets
-LOGO_INNER_DARK = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_inner_white.png"))
-LOGO_RING_DARK  = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_outer_white.png"))
-LOGO_INNER_LIGHT = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_inner_black.png"))
-LOGO_RING_LIGHT  = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_outer_black.png"))
-
-LOGO_INNER_ORIG = LOGO_INNER_DARK or LOGO_INNER_LIGHT
-LOGO_RING_ORIG = LOGO_RING_DARK or LOGO_RING_LIGHT
+LOGO_INNER_DARK = LOGO_RING_DARK = None
+LOGO_INNER_LIGHT = LOGO_RING_LIGHT = None
+LOGO_INNER_ORIG = LOGO_RING_ORIG = None
+
+def load_logo_assets():
+    """Load both logo variants; needs the display mode to be set for convert_alpha()."""
+    global LOGO_INNER_DARK, LOGO_RING_DARK, LOGO_INNER_LIGHT, LOGO_RING_LIGHT
+    global LOGO_INNER_ORIG, LOGO_RING_ORIG
+
+    LOGO_INNER_DARK = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_inner_white.png"))
+    LOGO_RING_DARK  = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_outer_white.png"))
+    LOGO_INNER_LIGHT = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_inner_black.png"))
+    LOGO_RING_LIGHT  = _load_alpha(os.path.join(ASSETS_DIR, "gsszo_logo_outer_black.png"))
+
+    if current_dark_mode:
+        LOGO_INNER_ORIG = LOGO_INNER_DARK or LOGO_INNER_LIGHT
+        LOGO_RING_ORIG = LOGO_RING_DARK or LOGO_RING_LIGHT
+    else:
+        LOGO_INNER_ORIG = LOGO_INNER_LIGHT or LOGO_INNER_DARK
+        LOGO_RING_ORIG = LOGO_RING_LIGHT or LOGO_RING_DARK
 
 # region SPONSOR BAR SUPPORT
 
@@ -215,24 +856,49 @@ ORGANIZERS_LIST_PATH = resource_path(os.path.join("display_bar", "organizers.txt
 SPONSOR_LOGO_DIR = resource_path(os.path.join("display_bar", "logos"))
 
 
+SPONSOR_POLL_INTERVAL = 1.0   # seconds between mtime checks of the sponsor files
+SPONSOR_LOGO_EXTS = ("png", "jpg", "jpeg", "bmp", "gif")
+
 class SponsorTicker:
+    """
+    Scrolling sponsor / organiser strip for the bottom of the game screen.
+
+    reload() builds the strip synchronously. Once start_watching() has been
+    called, a daemon thread polls the mtimes of sponsors.txt, organizers.txt
+    and the logo folder instead, rebuilds the strip in the background when
+    something changed (unchanged names and logos come from
+    ticker_surface_cache) and update() swaps it in on the thread drawing
+    the game.
+    """
+
     def __init__(self):
-        self.height = max(40, int(SPONSOR_BAR_HEIGHT))
+        self.height = max(24, int(SPONSOR_BAR_HEIGHT))
         self.entries = []
+        self.entry_x = {}           # entry id -> x of the entry within the strip
         self.segment_surface = None
         self.segment_width = 0
         self.scroll_offset = 0.0
+        self.built = False
+
+        self.pending = None         # strip built by the watcher, waiting to be swapped in
+        self._pending_lock = threading.Lock()
+        self.wanted_height = None
+        self.force_rebuild = False
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
 
     def _normalize_name(self, name: str) -> str:
         normalized = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
         return normalized
 
-    def _append_surface_entry(self, entry_specs, surface: pygame.Surface):
+    def _append_surface_entry(self, entry_specs, entry_id, surface: pygame.Surface):
         """Append a plain surface entry if it has a visible width."""
         if surface is None or surface.get_width() <= 0:
             return
         entry_specs.append({
             "kind": "surface",
+            "id": entry_id,
             "surface": surface,
             "width": surface.get_width(),
         })
@@ -257,114 +923,249 @@ class SponsorTicker:
             print("Could not read organizers.txt:", exc)
             return []
 
-    def _load_logo(self, normalized_name: str):
-        if not normalized_name:
-            return None
-        possible_exts = ("png", "jpg", "jpeg", "bmp", "gif")
-        for ext in possible_exts:
-            logo_path = os.path.join(SPONSOR_LOGO_DIR, f"{normalized_name}_logo.{ext}")
-            if os.path.isfile(logo_path):
-                try:
-                    return pygame.image.load(logo_path).convert_alpha()
-                except Exception as exc:
-                    print(f"Failed to load sponsor logo '{logo_path}':", exc)
+    def _source_signature(self):
+        """(list files, logo files) with their mtimes and sizes; changes when anything is edited."""
+        lists = []
+        for path in (SPONSOR_LIST_PATH, ORGANIZERS_LIST_PATH):
+            try:
+                st = os.stat(path)
+                lists.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                lists.append(None)
+        logos = {}
+        try:
+            with os.scandir(SPONSOR_LOGO_DIR) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        logos[entry.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return tuple(lists), tuple(sorted(logos.items()))
+
+    def _load_logo(self, filename: str):
+        logo_path = os.path.join(SPONSOR_LOGO_DIR, filename)
+        try:
+            return load_image(logo_path)
+        except Exception as exc:
+            print(f"Failed to load sponsor logo '{logo_path}':", exc)
         return None
 
-    def reload(self):
-        self.height = max(40, int(SPONSOR_BAR_HEIGHT))
+    def _render_text(self, text: str, font, colour) -> pygame.Surface:
+        # The watcher and the drawing thread share ticker_surface_cache; it locks itself
+        key = ("text", text, font, colour)
+        surface = ticker_surface_cache.get(key)
+        if surface is None:
+            with frame_lock:
+                surface = font.render(text, True, colour)
+            ticker_surface_cache[key] = surface
+        return surface
+
+    def _scaled_logo(self, normalized_name: str, target_h: int, logo_files: dict):
+        """Sponsor logo scaled to target_h, or None. Keyed by file stamp, so edited logos reload."""
+        filename = stamp = None
+        for ext in SPONSOR_LOGO_EXTS:
+            candidate = f"{normalized_name}_logo.{ext}"
+            if normalized_name and candidate in logo_files:
+                filename, stamp = candidate, logo_files[candidate]
+                break
+        if filename is None:
+            return None
+
+        key = ("logo", filename, stamp, target_h)
+        cached = ticker_surface_cache.get(key, _MISSING)    # None: the logo could not be loaded
+        if cached is not _MISSING:
+            return cached
+        raw_logo = self._load_logo(filename)
+        logo_surface = None
+        if raw_logo is not None and raw_logo.get_height() > 0:
+            scale_ratio = target_h / raw_logo.get_height()
+            logo_width = max(1, int(raw_logo.get_width() * scale_ratio))
+            logo_surface = pygame.transform.smoothscale(raw_logo, (logo_width, target_h))
+        ticker_surface_cache[key] = logo_surface
+        return logo_surface
+
+    def _build(self, height: int, signature):
+        """
+        Build a complete strip without touching the ticker's current one.
+        Returns a dict that _install() swaps in. Safe to run off the main thread.
+        """
+        font, colour = font_sponsor, SPONSOR_TEXT_COLOUR
+        logo_files = dict(signature[1])
         names = self._read_sponsor_names()
         organizers = self._read_organizer_names()
-        self.entries = []
-        self.segment_surface = None
-        self.segment_width = 0
-        self.scroll_offset = 0.0
 
         entry_specs = []
-        logo_target_h = max(10, self.height - 10)
+        logo_target_h = max(10, height - _px(10))
+        logo_gap = _px(SPONSOR_LOGO_GAP)
+        entry_gap = _px(SPONSOR_ENTRY_GAP)
 
         if names:
-            prefix_surface = font_sponsor.render("Támogatóink:", True, SPONSOR_TEXT_COLOUR)
-            self._append_surface_entry(entry_specs, prefix_surface)
+            prefix_surface = self._render_text("Támogatóink:", font, colour)
+            self._append_surface_entry(entry_specs, ("header", "sponsors"), prefix_surface)
 
         for name in names:
-            text_surface = font_sponsor.render(name, True, SPONSOR_TEXT_COLOUR)
-            normalized = self._normalize_name(name)
-            raw_logo = self._load_logo(normalized)
-            logo_surface = None
-
-            if raw_logo is not None and raw_logo.get_height() > 0:
-                scale_ratio = logo_target_h / raw_logo.get_height()
-                logo_width = max(1, int(raw_logo.get_width() * scale_ratio))
-                logo_surface = pygame.transform.smoothscale(raw_logo, (logo_width, logo_target_h))
+            text_surface = self._render_text(name, font, colour)
+            logo_surface = self._scaled_logo(self._normalize_name(name), logo_target_h, logo_files)
 
             entry_width = text_surface.get_width()
             if logo_surface is not None:
                 entry_width += logo_surface.get_width()
                 if text_surface.get_width() > 0:
-                    entry_width += SPONSOR_LOGO_GAP
+                    entry_width += logo_gap
 
             entry_specs.append({
                 "kind": "sponsor",
+                "id": ("sponsor", name),
                 "text_surface": text_surface,
                 "logo_surface": logo_surface,
                 "entry_width": entry_width,
             })
 
         if organizers:
-            header_surface = font_sponsor.render("Szervezők:", True, SPONSOR_TEXT_COLOUR)
-            self._append_surface_entry(entry_specs, header_surface)
+            header_surface = self._render_text("Szervezők:", font, colour)
+            self._append_surface_entry(entry_specs, ("header", "organizers"), header_surface)
 
             for name in organizers:
-                text_surface = font_sponsor.render(name, True, SPONSOR_TEXT_COLOUR)
-                self._append_surface_entry(entry_specs, text_surface)
+                text_surface = self._render_text(name, font, colour)
+                self._append_surface_entry(entry_specs, ("organizer", name), text_surface)
 
+        built = {
+            "height": height, "signature": signature, "entries": entry_specs,
+            "entry_x": {}, "surface": None, "width": 0,
+        }
         if not entry_specs:
-            return
+            return built
 
-        leading_padding = SPONSOR_ENTRY_GAP
-        trailing_padding = SPONSOR_ENTRY_GAP
+        leading_padding = entry_gap
+        trailing_padding = entry_gap
         total_width = leading_padding + trailing_padding
 
         for spec in entry_specs:
             if spec["kind"] == "sponsor":
-                total_width += spec["entry_width"] + SPONSOR_ENTRY_GAP
+                total_width += spec["entry_width"] + entry_gap
             else:
-                total_width += spec["width"] + SPONSOR_ENTRY_GAP
+                total_width += spec["width"] + entry_gap
 
-        self.segment_width = max(1, int(total_width))
-        self.segment_surface = pygame.Surface((self.segment_width, self.height), pygame.SRCALPHA)
-        center_y = self.height // 2
+        segment_width = max(1, int(total_width))
+        segment_surface = pygame.Surface((segment_width, height), pygame.SRCALPHA)
+        center_y = height // 2
+        entry_x = built["entry_x"]
 
         x = leading_padding
         for spec in entry_specs:
+            entry_x.setdefault(spec["id"], x)
             if spec["kind"] == "sponsor":
                 logo_surface = spec["logo_surface"]
                 if logo_surface is not None:
                     logo_rect = logo_surface.get_rect(midleft=(x, center_y))
-                    self.segment_surface.blit(logo_surface, logo_rect)
+                    segment_surface.blit(logo_surface, logo_rect)
                     x = logo_rect.right
                     if spec["text_surface"].get_width() > 0:
-                        x += SPONSOR_LOGO_GAP
+                        x += logo_gap
 
                 text_surface = spec["text_surface"]
                 if text_surface.get_width() > 0:
                     text_rect = text_surface.get_rect(midleft=(x, center_y))
-                    self.segment_surface.blit(text_surface, text_rect)
+                    segment_surface.blit(text_surface, text_rect)
                     x = text_rect.right
 
-                x += SPONSOR_ENTRY_GAP
+                x += entry_gap
             else:
                 surface = spec["surface"]
                 surf_rect = surface.get_rect(midleft=(x, center_y))
-                self.segment_surface.blit(surface, surf_rect)
-                x = surf_rect.right + SPONSOR_ENTRY_GAP
+                segment_surface.blit(surface, surf_rect)
+                x = surf_rect.right + entry_gap
+
+        built["surface"] = segment_surface
+        built["width"] = segment_width
+        return built
+
+    def _install(self, built):
+        """Swap a built strip in, keeping the entry at the left screen edge where it was."""
+        new_offset = 0.0
+        if self.segment_surface is not None and built["surface"] is not None:
+            # Strip coordinate currently at screen x = 0, and the entry covering it
+            left = -self.scroll_offset
+            anchor = None
+            for entry_id, x in self.entry_x.items():
+                if x <= left and entry_id in built["entry_x"] and (anchor is None or x > self.entry_x[anchor]):
+                    anchor = entry_id
+            if anchor is not None:
+                into_entry = (left - self.entry_x[anchor]) * built["height"] / max(1, self.height)
+                new_offset = -(built["entry_x"][anchor] + into_entry)
+
+        self.height = built["height"]
+        self.entries = built["entries"]
+        self.entry_x = built["entry_x"]
+        self.segment_surface = built["surface"]
+        self.segment_width = built["width"]
+        self.scroll_offset = new_offset
+        self.built = True
+        self.update(0.0)
 
-        self.entries = entry_specs
+    def reload(self):
+        """Rebuild the strip now, on the calling thread."""
+        self._install(self._build(layout["game"]["sponsor_bar_h"], self._source_signature()))
+
+    def request_height(self, height: int):
+        """Ask for a strip of the given height; built in the background when watching."""
+        if self._thread is None:
+            self.reload()
+        elif self.wanted_height != height:
+            self.wanted_height = height
+            self._wake.set()
+
+    def invalidate(self):
+        """Rebuild the strip, e.g. after the text colour changed with the theme."""
+        if self._thread is None:
+            self.built = False
+        else:
+            self.force_rebuild = True
+            self._wake.set()
+
+    def start_watching(self):
+        if self._thread is not None:
+            return
+        self.wanted_height = layout["game"]["sponsor_bar_h"]
+        self._stopping = False
+        self._thread = threading.Thread(target=self._watch, name="sponsor-watcher", daemon=True)
+        self._thread.start()
+
+    def stop_watching(self):
+        """End the watcher thread; the strip stays as it is."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def _watch(self):
+        built_signature = built_height = None
+        while not self._stopping:
+            signature = self._source_signature()
+            height = self.wanted_height
+            if signature != built_signature or height != built_height or self.force_rebuild:
+                self.force_rebuild = False
+                try:
+                    built = self._build(height, signature)
+                    with self._pending_lock:
+                        self.pending = built
+                except Exception as exc:
+                    print("Could not rebuild the sponsor bar:", exc)
+                built_signature, built_height = signature, height
+            self._wake.wait(SPONSOR_POLL_INTERVAL)
+            self._wake.clear()
 
     def update(self, dt: float):
+        with self._pending_lock:
+            pending, self.pending = self.pending, None
+        if pending is not None:
+            self._install(pending)
         if not self.segment_surface or self.segment_width <= 0:
             return
-        self.scroll_offset -= SPONSOR_SCROLL_SPEED * dt
+        self.scroll_offset -= _px(SPONSOR_SCROLL_SPEED) * dt
         while self.scroll_offset <= -self.segment_width:
             self.scroll_offset += self.segment_width
         while self.scroll_offset > 0:
@@ -373,7 +1174,7 @@ class SponsorTicker:
     def draw(self, target_surface: pygame.Surface, top_y: int):
         bar_rect = pygame.Rect(0, top_y, target_surface.get_width(), self.height)
         pygame.draw.rect(target_surface, SPONSOR_BAR_BG, bar_rect)
-        pygame.draw.line(target_surface, SPONSOR_BAR_BORDER, (0, top_y), (target_surface.get_width(), top_y), 2)
+        pygame.draw.line(target_surface, SPONSOR_BAR_BORDER, (0, top_y), (target_surface.get_width(), top_y), layout["border"])
 
         if not self.segment_surface:
             return
@@ -401,171 +1202,515 @@ def apply_theme(dark_mode: bool):
     if dark_mode == current_dark_mode:
         return
 
-    palette = PALETTE_DARK if dark_mode else PALETTE_LIGHT
-    _apply_palette(palette)
-
-    current_dark_mode = dark_mode
+    with frame_lock:
+        palette = PALETTE_DARK if dark_mode else PALETTE_LIGHT
+        _apply_palette(palette)
 
-    if dark_mode:
-        LOGO_INNER_ORIG = LOGO_INNER_DARK or LOGO_INNER_LIGHT or LOGO_INNER_ORIG
-        LOGO_RING_ORIG = LOGO_RING_DARK or LOGO_RING_LIGHT or LOGO_RING_ORIG
-    else:
-        LOGO_INNER_ORIG = LOGO_INNER_LIGHT or LOGO_INNER_DARK or LOGO_INNER_ORIG
-        LOGO_RING_ORIG = LOGO_RING_LIGHT or LOGO_RING_DARK or LOGO_RING_ORIG
+        current_dark_mode = dark_mode
+        name_block_cache.clear()
 
-    ticker = globals().get("sponsor_ticker")
-    if ticker:
-        ticker.reload()
+        if dark_mode:
+            LOGO_INNER_ORIG = LOGO_INNER_DARK or LOGO_INNER_LIGHT or LOGO_INNER_ORIG
+            LOGO_RING_ORIG = LOGO_RING_DARK or LOGO_RING_LIGHT or LOGO_RING_ORIG
+        else:
+            LOGO_INNER_ORIG = LOGO_INNER_LIGHT or LOGO_INNER_DARK or LOGO_INNER_ORIG
+            LOGO_RING_ORIG = LOGO_RING_LIGHT or LOGO_RING_DARK or LOGO_RING_ORIG
+
+        ticker = globals().get("sponsor_ticker")
+        if ticker:
+            ticker.invalidate()
+
+# Dragging a window edge sends dozens of VIDEORESIZE events a second. They
+# only record the wanted size; until none has come for RESIZE_SETTLE_S the
+# last frame is shown stretched, then apply_window_size() relayouts once.
+RESIZE_SETTLE_S = 0.15
+RESIZE_POLL_MS = 15
+pending_resize = None      # (width, height, time of the latest VIDEORESIZE)
+resize_preview = None      # copy of the last full frame, stretched while resizing
+resize_preview_size = None
 
 def handle_window_resize(event: pygame.event.Event):
-    """Update the window surface when the user resizes in windowed mode."""
-    global screen, WIDTH, HEIGHT
+    """Note the size the user is dragging the window to (windowed mode only)."""
+    global pending_resize, resize_preview, resize_preview_size
 
     if event.type != pygame.VIDEORESIZE or current_fullscreen:
         return
+    if pending_resize is None:
+        resize_preview = screen.copy()
+        resize_preview_size = screen.get_size()
+    pending_resize = (max(1, event.w), max(1, event.h), time.perf_counter())
 
-    new_width = max(1, event.w)
-    new_height = max(1, event.h)
-    flags = screen.get_flags() if screen is not None else pygame.RESIZABLE
-    screen_surface = pygame.display.set_mode((new_width, new_height), flags)
-    WIDTH, HEIGHT = screen_surface.get_size()
-    screen = screen_surface
+def settle_window_resize() -> bool:
+    """
+    While a resize is in progress, keep the stretched preview on screen and
+    return False; once it has settled, apply the final size and return True.
+    """
+    global pending_resize, resize_preview, resize_preview_size
+    new_width, new_height, last_event_at = pending_resize
+    if time.perf_counter() - last_event_at < RESIZE_SETTLE_S:
+        # SDL already resized the window surface; a nearest-neighbour stretch is cheap
+        surface = pygame.display.get_surface()
+        if surface.get_size() != resize_preview_size:
+            pygame.transform.scale(resize_preview, surface.get_size(), surface)
+            resize_preview_size = surface.get_size()
+            pygame.display.flip()
+        return False
+    pending_resize = resize_preview = resize_preview_size = None
+    apply_window_size(new_width, new_height)
+    return True
+
+def apply_window_size(new_width: int, new_height: int):
+    """Resize the window surface and rebuild the layout and size-dependent caches once."""
+    # get_flags() reports internal bits (and FULLSCREEN unsigned) that set_mode() rejects
+    flags = pygame.FULLSCREEN if current_fullscreen else pygame.RESIZABLE
+    screen_surface = pygame.display.get_surface()
+    if screen_surface is None or screen_surface.get_size() != (new_width, new_height):
+        screen_surface = pygame.display.set_mode((new_width, new_height), flags)
+    configure_render_target(screen_surface)
+    # Fonts, rects, logo and name caches; the ticker and stats panel follow the new size on their next frame
+    compute_layout()
 
 # region UTILITIES
 
 def is_leg_pristine():
     """True if the current leg has no typed digits and no committed throws."""
-    return current_input == "" and not history and not scores[0] and not scores[1]
+    return current_input == "" and not history and not any(scores)
 
 def current_leg_number():
-    return legs_won[0] + legs_won[1] + 1
+    return sum(legs_won) + 1
 
 def avg(lst):
     return (sum(lst) / len(lst)) if lst else 0.0
 
-def match_averages():
-    """Compute per-player match averages across all finished legs + current leg."""
-    totals = [0, 0]
-    counts = [0, 0]
-    # finished legs
+def new_leg_scores(players: int):
+    return [array("H") for _ in range(players)]
+
+def recount_totals():
+    """
+    Rebuild leg_totals / match_totals / match_visits from scores and the
+    finished legs. Only needed after bulk changes (new match, archived match);
+    visits and leg boundaries adjust the totals directly.
+    """
+    global leg_totals, match_totals, match_visits
+    players = len(scores)
+    leg_totals = array("l", (sum(player_scores) for player_scores in scores))
+    match_totals = array("l", [0] * players)
+    match_visits = array("l", [0] * players)
     for snap in finished_legs_stack:
-        for p in (0, 1):
-            totals[p] += sum(snap['scores'][p])
-            counts[p] += len(snap['scores'][p])
-    # current leg
-    for p in (0, 1):
-        totals[p] += sum(scores[p])
-        counts[p] += len(scores[p])
-    return [ (totals[p] / counts[p]) if counts[p] else 0.0 for p in (0,1) ]
+        for p, player_scores in enumerate(snap['scores']):
+            match_totals[p] += sum(player_scores)
+            match_visits[p] += len(player_scores)
+
+def leg_averages():
+    return [leg_totals[p] / len(scores[p]) if scores[p] else 0.0 for p in range(len(scores))]
+
+def match_averages():
+    """Per-player match averages across all finished legs + current leg."""
+    averages = []
+    for p in range(len(scores)):
+        visits = match_visits[p] + len(scores[p])
+        averages.append((match_totals[p] + leg_totals[p]) / visits if visits else 0.0)
+    return averages
+
+# region RULES KERNEL
+#
+# The X01 rules as pure functions over an immutable MatchState, with no globals
+# and no UI. commit_throw() wraps apply_visit() for the scoreboard; the
+# scoresheet import, benchmarks and simulations call it directly.
+
+VISIT_OK = "ok"
+VISIT_BUST = "bust"
+VISIT_CHECKOUT = "checkout"
+MAX_VISIT = 180
+
+class MatchState(NamedTuple):
+    start_score: int
+    legs_to_win: int
+    double_out: bool
+    remaining: tuple           # per player, in the current leg
+    legs_won: tuple            # per player
+    active: int                # whose visit is next
+    leg_starter: int           # who started the current leg
+    winner: Optional[int]      # set once the match is over
+
+class VisitOutcome(NamedTuple):
+    player: int
+    recorded: int              # what goes on the scoresheet (0 for a bust)
+    kind: str                  # VISIT_OK / VISIT_BUST / VISIT_CHECKOUT
+    leg_won: bool
+    match_won: bool
+
+def new_match_state(start_score: int, legs_to_win: int, double_out: bool = True,
+                    players: int = 2, starter: int = 0) -> MatchState:
+    return MatchState(
+        start_score, max(1, legs_to_win), bool(double_out),
+        (start_score,) * players, (0,) * players, starter, starter, None,
+    )
+
+def start_leg(match: MatchState, starter: int) -> MatchState:
+    """Fresh leg with the given starter, keeping the legs won so far."""
+    return MatchState(
+        match.start_score, match.legs_to_win, match.double_out,
+        (match.start_score,) * len(match.remaining), match.legs_won, starter, starter, match.winner,
+    )
+
+_new_tuple = tuple.__new__   # builds MatchState / VisitOutcome without a Python-level __new__ call
+
+def apply_visit(match: MatchState, value: int, finished_on_double: bool = True):
+    """
+    Pure transition: (match state, visit total) -> (new match state, outcome).
+
+    Over-scoring is a bust; with Double Out so is leaving 1 or checking out on
+    anything but a double. A bust is recorded as 0. A checkout either wins the
+    match (the state keeps the finished leg and records the winner) or starts
+    the next leg with the next starter. Typed totals cannot tell how the last
+    dart landed and are trusted; the dartboard passes finished_on_double so
+    Double Out is enforced.
+    """
+    start_score, legs_to_win, double_out, remaining, legs_won, player, leg_starter, _ = match
+    if value > MAX_VISIT:
+        value = MAX_VISIT
+    elif value < 0:
+        value = 0
+
+    remaining_after = remaining[player] - value
+    if remaining_after < 0 or (double_out and (remaining_after == 1 or
+                                                (remaining_after == 0 and not finished_on_double))):
+        return _new_tuple(MatchState, (
+            start_score, legs_to_win, double_out, remaining, legs_won,
+            (player + 1) % len(remaining), leg_starter, None,
+        )), _new_tuple(VisitOutcome, (player, 0, VISIT_BUST, False, False))
+
+    if remaining_after:
+        remaining = remaining[:player] + (remaining_after,) + remaining[player + 1:]
+        return _new_tuple(MatchState, (
+            start_score, legs_to_win, double_out, remaining, legs_won,
+            (player + 1) % len(remaining), leg_starter, None,
+        )), _new_tuple(VisitOutcome, (player, value, VISIT_OK, False, False))
+
+    won = legs_won[player] + 1
+    legs_won = legs_won[:player] + (won,) + legs_won[player + 1:]
+    if won >= legs_to_win:
+        remaining = remaining[:player] + (0,) + remaining[player + 1:]
+        return _new_tuple(MatchState, (
+            start_score, legs_to_win, double_out, remaining, legs_won, player, leg_starter, player,
+        )), _new_tuple(VisitOutcome, (player, value, VISIT_CHECKOUT, True, True))
+
+    players = len(remaining)
+    starter = (leg_starter + 1) % players
+    return _new_tuple(MatchState, (
+        start_score, legs_to_win, double_out, (start_score,) * players, legs_won, starter, starter, None,
+    )), _new_tuple(VisitOutcome, (player, value, VISIT_CHECKOUT, True, False))
+
+def benchmark_rules(transitions: int = 1_000_000, seed: int = 0):
+    """Measure apply_visit() throughput on random visits; prints transitions per second."""
+    rng = random.Random(seed)
+    visits = [rng.choice((0, 26, 41, 45, 60, 81, 85, 100, 140, 180)) for _ in range(4096)]
+    fresh = new_match_state(501, 3, True)
+    match = fresh
+    matches = 0
+
+    started = time.perf_counter()
+    for i in range(transitions):
+        remaining = match.remaining[match.active]
+        value = remaining if remaining <= 60 else visits[i & 4095]
+        match, outcome = apply_visit(match, value)
+        if outcome.match_won:
+            match = fresh
+            matches += 1
+    elapsed = time.perf_counter() - started
+
+    print(f"{transitions} transitions ({matches} matches) in {elapsed:.3f} s: "
+          f"{transitions / elapsed:,.0f} transitions/s")
 
 # region MATCH CONTROL
 
-def reset_game(new_start_score: int, p1: str, p2: str, target_legs: int = None,
+def reset_game(new_start_score: int, names, target_legs: int = None,
                double_out: bool = True, show_sponsor_bar: bool = False):
-    """Reset the WHOLE match (new game from menu)."""
+    """Reset the WHOLE match (new game from menu) for the given 2-8 player names."""
     global START_SCORE, player_names, scores, active_player, history
     global winner_idx, legs_won, leg_starter_idx, LEGS_TO_WIN, state, current_input
     global finished_legs_stack, DOUBLE_OUT_ENABLED, sponsor_bar_enabled, sponsor_ticker
+    global match_archived, layout, match_started_at
 
     START_SCORE = new_start_score
-    player_names = [p1.strip() or "Player 1", p2.strip() or "Player 2"]
+    player_names = [name.strip() or f"Player {i}" for i, name in enumerate(names, start=1)]
+    player_count = len(player_names)
 
     LEGS_TO_WIN = max(1, int(target_legs) if target_legs is not None else LEGS_TO_WIN)
-    legs_won = [0, 0]
+    legs_won = [0] * player_count
     finished_legs_stack = []  # clear snapshots
+    undo_stack.clear()
+    redo_stack.clear()
+    reset_match_stats(player_count)
     DOUBLE_OUT_ENABLED = bool(double_out)
     sponsor_bar_enabled = bool(show_sponsor_bar)
-    sponsor_ticker.reload()
+    name_block_cache.clear()
+    win_chance.reset()
 
     # First leg setup
     leg_starter_idx = 0
     active_player = leg_starter_idx
-    scores = [[], []]
+    scores = new_leg_scores(player_count)
     history = []
+    visit_times.clear()
+    match_started_at = time.monotonic()
+    recount_totals()
     current_input = ""
+    visit_darts.clear()
     winner_idx = None
+    match_archived = False
+    if layout:
+        # Columns depend on the number of players; a new dict, as snapshots may hold the old one
+        layout = {**layout, "game": _compute_game_layout(WIDTH, HEIGHT, player_count)}
 
     state = STATE_GAME
     pygame.display.set_caption(f"GSSZO Darts Counter")
 
+def current_match_state() -> MatchState:
+    """Kernel view of the match on the scoreboard."""
+    return MatchState(
+        START_SCORE, LEGS_TO_WIN, DOUBLE_OUT_ENABLED,
+        tuple(START_SCORE - total for total in leg_totals),
+        tuple(legs_won), active_player, leg_starter_idx, winner_idx,
+    )
+
 def start_new_leg():
-    """Start the next leg, alternating starter."""
-    global scores, history, current_input, active_player, leg_starter_idx
-    leg_starter_idx = 1 - leg_starter_idx
+    """
+    Put the just-won leg on finished_legs_stack and start the next one; the
+    starter moves on to the next player. The leg's arrays are moved, not
+    copied, and the match totals are adjusted, so this is O(players).
+    """
+    global scores, history, current_input, active_player, leg_starter_idx, leg_totals
+    finished_legs_stack.append({
+        'scores': scores,
+        'history': history,
+        'totals': leg_totals,
+        'active_player': active_player,
+        'leg_starter_idx': leg_starter_idx,
+        'winner': active_player
+    })
+    for p in range(len(scores)):
+        match_totals[p] += leg_totals[p]
+        match_visits[p] += len(scores[p])
+    leg_starter_idx = (leg_starter_idx + 1) % len(scores)
     active_player = leg_starter_idx
-    scores = [[], []]
+    scores = new_leg_scores(len(scores))
     history = []
+    leg_totals = array("l", [0] * len(scores))
     current_input = ""
+    visit_darts.clear()
 
-def revert_last_finished_leg():
-    """Pop last finished-leg snapshot, roll back legs and delete the winning throw."""
-    global scores, history, active_player, leg_starter_idx, legs_won, current_input
-    if not finished_legs_stack:
-        return
+def reopen_finished_leg():
+    """Inverse of start_new_leg(): continue the last finished leg just after its winning visit."""
+    global scores, history, active_player, leg_starter_idx, leg_totals, current_input
     snap = finished_legs_stack.pop()
-    legs_won[snap['winner']] = max(0, legs_won[snap['winner']] - 1)
-    scores = copy.deepcopy(snap['scores'])
-    history = snap['history'][:]
+    scores = snap['scores']
+    history = snap['history']
+    leg_totals = snap['totals']
     active_player = snap['active_player']
     leg_starter_idx = snap['leg_starter_idx']
+    for p in range(len(scores)):
+        match_totals[p] -= leg_totals[p]
+        match_visits[p] -= len(scores[p])
     current_input = ""
-    undo_last_score()  # remove winning throw
+    visit_darts.clear()
+
+# region MATCH STATISTICS
+#
+# The F1 panel's statistics are per-player counters, updated once per visit by
+# commit_throw(). Every update journals the values it overwrote, one frame per
+# visit, so undo_action() puts back exactly what the visit changed without
+# recounting anything; redo_action() replays the visit and records it again.
+# Typed visits count as three darts; board visits count the darts thrown.
+
+STAT_FIELDS = (
+    "tons", "ton40s", "maxes",              # visits of 100-139, 140-179 and 180
+    "high_finish",
+    "best_leg", "worst_leg",                # darts in won legs (0 = no leg won yet)
+    "first9_total", "first9_visits",        # first three visits of every leg
+    "checkout_attempts", "checkouts",       # visits started on a finish / finished
+    "leg_darts",                            # darts thrown in the current leg
+)
+
+match_stats = {field: array("l", [0, 0]) for field in STAT_FIELDS}
+stats_journal = []      # per committed visit: [(column, player, previous value), ...]
+stats_version = 0       # bumped on every change; keys the rendered panel
+stats_panel_visible = False
+stats_panel_cache = (None, None)   # (key, surface)
+stats_rows_cache = (None, None)    # (key, rows)
+
+def reset_match_stats(players: int):
+    global stats_version
+    for field in STAT_FIELDS:
+        match_stats[field] = array("l", [0] * players)
+    stats_journal.clear()
+    stats_version += 1
+
+def record_visit_stats(player: int, remaining_before: int, outcome: VisitOutcome, darts: int):
+    """Count one committed visit (call after it was appended to scores)."""
+    global stats_version
+    changes = []
+
+    def set_stat(field, p, value):
+        column = match_stats[field]
+        changes.append((column, p, column[p]))
+        column[p] = value
+
+    value = outcome.recorded
+    if value == MAX_VISIT:
+        set_stat("maxes", player, match_stats["maxes"][player] + 1)
+    elif value >= 140:
+        set_stat("ton40s", player, match_stats["ton40s"][player] + 1)
+    elif value >= 100:
+        set_stat("tons", player, match_stats["tons"][player] + 1)
+    if len(scores[player]) <= 3:
+        set_stat("first9_total", player, match_stats["first9_total"][player] + value)
+        set_stat("first9_visits", player, match_stats["first9_visits"][player] + 1)
+    if can_check_out(remaining_before, DOUBLE_OUT_ENABLED):
+        set_stat("checkout_attempts", player, match_stats["checkout_attempts"][player] + 1)
+    leg_darts = match_stats["leg_darts"][player] + darts
+    set_stat("leg_darts", player, leg_darts)
+
+    if outcome.kind == VISIT_CHECKOUT:
+        set_stat("checkouts", player, match_stats["checkouts"][player] + 1)
+        set_stat("high_finish", player, max(match_stats["high_finish"][player], value))
+        best = match_stats["best_leg"][player]
+        set_stat("best_leg", player, min(best, leg_darts) if best else leg_darts)
+        set_stat("worst_leg", player, max(match_stats["worst_leg"][player], leg_darts))
+        if not outcome.match_won:
+            for p in range(len(scores)):
+                set_stat("leg_darts", p, 0)
+
+    stats_journal.append(changes)
+    stats_version += 1
+
+def undo_visit_stats():
+    """Roll back the statistics of the most recent visit."""
+    global stats_version
+    if not stats_journal:
+        return
+    for column, p, previous in reversed(stats_journal.pop()):
+        column[p] = previous
+    stats_version += 1
+
+def stats_rows():
+    """Panel text: a header row and one row per player."""
+    rows = [("", "100+", "140+", "180", "High out", "Best leg", "Worst leg", "First 9", "Checkout")]
+    for p, name in enumerate(player_names):
+        s = {field: column[p] for field, column in match_stats.items()}
+        attempts = s["checkout_attempts"]
+        checkout = f"{s['checkouts']}/{attempts}" + (f"  {100 * s['checkouts'] / attempts:.0f}%" if attempts else "")
+        rows.append((
+            name, str(s["tons"]), str(s["ton40s"]), str(s["maxes"]),
+            str(s["high_finish"] or "-"),
+            f"{s['best_leg']} darts" if s["best_leg"] else "-",
+            f"{s['worst_leg']} darts" if s["worst_leg"] else "-",
+            f"{s['first9_total'] / s['first9_visits']:.1f}" if s["first9_visits"] else "-",
+            checkout,
+        ))
+    return rows
+
+def current_stats_rows():
+    """stats_rows(), formatted again only after a stat or a name changed."""
+    global stats_rows_cache
+    key = (stats_version, tuple(player_names))
+    if stats_rows_cache[0] != key:
+        stats_rows_cache = (key, tuple(stats_rows()))
+    return stats_rows_cache[1]
+
+def _render_stats_panel(rows, panel_layout):
+    rows = [[font_small.render(text, True, TEXT_COLOUR if r else HINT_COLOUR) for text in row]
+            for r, row in enumerate(rows)]
+    pad, gap = _px(16), _px(28)
+    col_ws = [max(row[c].get_width() for row in rows) for c in range(len(rows[0]))]
+    row_h = max(surf.get_height() for row in rows for surf in row)
+    panel = pygame.Surface((sum(col_ws) + gap * (len(col_ws) - 1) + 2 * pad, row_h * len(rows) + 2 * pad),
+                           pygame.SRCALPHA)
+    box = panel.get_rect()
+    pygame.draw.rect(panel, BOX_BG, box, border_radius=panel_layout["radius"])
+    pygame.draw.rect(panel, BOX_BORDER, box, panel_layout["border"], border_radius=panel_layout["radius"])
+    y = pad
+    for row in rows:
+        x = pad
+        for c, surf in enumerate(row):
+            # Names left-aligned, numbers right-aligned
+            panel.blit(surf, (x if c == 0 else x + col_ws[c] - surf.get_width(), y))
+            x += col_ws[c] + gap
+        y += row_h
+    return panel
+
+def draw_stats_panel(surface, snap):
+    """Centred on the scoreboard; only re-rendered when a stat, name, size or theme changed."""
+    global stats_panel_cache
+    key = (snap.stats_rows, snap.width, snap.height, TEXT_COLOUR, BOX_BG)
+    if stats_panel_cache[0] != key:
+        stats_panel_cache = (key, _render_stats_panel(snap.stats_rows, snap.layout))
+    panel = stats_panel_cache[1]
+    surface.blit(panel, panel.get_rect(center=(snap.width // 2, snap.height // 2)))
 
 # region MENU AND RENDERING EVENTS
 
-def draw_input_box(x, y, w, h, label, value, active=False):
+def draw_input_box(rect, label, value, active=False, note=None):
     label_surf = font_small.render(label, True, HINT_COLOUR)
-    screen.blit(label_surf, (x, y - 26))
+    screen.blit(label_surf, (rect.x, rect.y - layout["label_dy"]))
 
-    rect = pygame.Rect(x, y, w, h)
-    pygame.draw.rect(screen, BOX_BG, rect, border_radius=10)
+    radius = layout["radius"]
+    pygame.draw.rect(screen, BOX_BG, rect, border_radius=radius)
     pygame.draw.rect(
         screen,
         BOX_BORDER_ACTIVE if active else BOX_BORDER,
         rect,
-        2,
-        border_radius=10,
+        layout["border"],
+        border_radius=radius,
     )
 
     text_surf = font_med.render(value, True, TEXT_COLOUR)
-    text_rect = text_surf.get_rect(midleft=(x + 14, y + h // 2))
+    text_rect = text_surf.get_rect(midleft=(rect.x + _px(14), rect.centery))
     screen.blit(text_surf, text_rect)
 
+    if note:
+        # Right-aligned hint inside the box (the player's rating)
+        note_surf = font_small.render(note, True, HINT_COLOUR)
+        note_rect = note_surf.get_rect(midright=(rect.right - _px(14), rect.centery))
+        if note_rect.left > text_rect.right + _px(10):
+            screen.blit(note_surf, note_rect)
+
     if active:
         draw_focus_arrows(rect)
 
     return rect
 
-def draw_score_switch(x, y, w, h, active: bool, selected: str):
+def draw_score_switch(outer, active: bool, selected: str):
     label_surf = font_small.render("Starting score", True, HINT_COLOUR)
-    screen.blit(label_surf, (x, y - 26))
+    screen.blit(label_surf, (outer.x, outer.y - layout["label_dy"]))
 
-    outer = pygame.Rect(x, y, w, h)
-    half_w = w // 2
-    r301 = pygame.Rect(x, y, half_w, h)
-    r501 = pygame.Rect(x + half_w, y, w - half_w, h)
+    half_w = outer.w // 2
+    r301 = pygame.Rect(outer.x, outer.y, half_w, outer.h)
+    r501 = pygame.Rect(outer.x + half_w, outer.y, outer.w - half_w, outer.h)
+    radius = layout["radius"]
 
-    pygame.draw.rect(screen, BOX_BG, outer, border_radius=10)
+    pygame.draw.rect(screen, BOX_BG, outer, border_radius=radius)
 
     # Highlight the selected side
     if selected == "301":
-        pygame.draw.rect(screen, ACCENT_ACTIVE, r301, border_radius=10)
+        pygame.draw.rect(screen, ACCENT_ACTIVE, r301, border_radius=radius)
     else:
-        pygame.draw.rect(screen, ACCENT_ACTIVE, r501, border_radius=10)
+        pygame.draw.rect(screen, ACCENT_ACTIVE, r501, border_radius=radius)
 
     pygame.draw.line(
         screen,
         BOX_BORDER,
-        (outer.x + half_w, outer.y + 6),
-        (outer.x + half_w, outer.y + h - 6),
-        2,
+        (outer.x + half_w, outer.y + _px(6)),
+        (outer.x + half_w, outer.bottom - _px(6)),
+        layout["border"],
     )
     pygame.draw.rect(
         screen,
         BOX_BORDER_ACTIVE if active else BOX_BORDER,
         outer,
-        2,
-        border_radius=10,
+        layout["border"],
+        border_radius=radius,
     )
 
     # Text colours
@@ -587,30 +1732,30 @@ def draw_score_switch(x, y, w, h, active: bool, selected: str):
 
     return outer, r301, r501
 
-def draw_checkbox(x, y, w, h, label, checked: bool, active: bool):
+def draw_checkbox(rect, label, checked: bool, active: bool):
     """Simple labeled checkbox-style toggle."""
     label_surf = font_small.render(label, True, HINT_COLOUR)
-    screen.blit(label_surf, (x, y - 26))
+    screen.blit(label_surf, (rect.x, rect.y - layout["label_dy"]))
 
-    rect = pygame.Rect(x, y, w, h)
-    pygame.draw.rect(screen, BOX_BG, rect, border_radius=10)
+    radius = layout["radius"]
+    pygame.draw.rect(screen, BOX_BG, rect, border_radius=radius)
     pygame.draw.rect(
         screen,
         BOX_BORDER_ACTIVE if active else BOX_BORDER,
         rect,
-        2,
-        border_radius=10,
+        layout["border"],
+        border_radius=radius,
     )
 
-    pad = 8
-    inner = pygame.Rect(x + pad, y + pad, h - 2 * pad, h - 2 * pad)
-    pygame.draw.rect(screen, BTN_BG, inner, border_radius=8)
+    pad = _px(8)
+    inner = pygame.Rect(rect.x + pad, rect.y + pad, rect.h - 2 * pad, rect.h - 2 * pad)
+    pygame.draw.rect(screen, BTN_BG, inner, border_radius=_px(8))
     if checked:
-        pygame.draw.rect(screen, ACCENT_ACTIVE, inner, border_radius=8)
+        pygame.draw.rect(screen, ACCENT_ACTIVE, inner, border_radius=_px(8))
 
     txt = "ON" if checked else "OFF"
     txt_surf = font_med.render(f"{txt}", True, TEXT_COLOUR)
-    txt_rect = txt_surf.get_rect(midleft=(inner.right + 16, y + h // 2))
+    txt_rect = txt_surf.get_rect(midleft=(inner.right + _px(16), rect.centery))
     screen.blit(txt_surf, txt_rect)
 
     if active:
@@ -618,26 +1763,26 @@ def draw_checkbox(x, y, w, h, label, checked: bool, active: bool):
 
     return rect
 
-def draw_settings_button(x, y, size, active: bool):
-    rect = pygame.Rect(x, y, size, size)
-    mouse_pos = pygame.mouse.get_pos()
+def draw_settings_button(rect, active: bool):
+    mouse_pos = pointer_pos()
     hover = rect.collidepoint(mouse_pos)
+    size = rect.w
 
     fill_colour = ACCENT_ACTIVE if active else (BTN_BG_HOVER if hover else BTN_BG)
-    pygame.draw.rect(screen, fill_colour, rect, border_radius=10)
+    pygame.draw.rect(screen, fill_colour, rect, border_radius=layout["radius"])
     pygame.draw.rect(
         screen,
         BOX_BORDER_ACTIVE if active else BOX_BORDER,
         rect,
-        2,
-        border_radius=10,
+        layout["border"],
+        border_radius=layout["radius"],
     )
 
     line_width = size * 0.75
     line_height = max(3, size // 10)
     spacing = size // 4
-    left = x + (size - line_width) / 2
-    center_y = y + size / 2
+    left = rect.x + (size - line_width) / 2
+    center_y = rect.y + size / 2
 
     for offset in (-spacing, 0, spacing):
         line_rect = pygame.Rect(
@@ -650,23 +1795,23 @@ def draw_settings_button(x, y, size, active: bool):
 
     return rect
 
-def draw_button(x, y, w, h, label, focused=False):
-    mouse_pos = pygame.mouse.get_pos()
-    rect = pygame.Rect(x, y, w, h)
+def draw_button(rect, label, focused=False):
+    mouse_pos = pointer_pos()
     hover = rect.collidepoint(mouse_pos)
+    radius = _px(12)
 
     pygame.draw.rect(
         screen,
         BTN_BG_HOVER if hover else BTN_BG,
         rect,
-        border_radius=12,
+        border_radius=radius,
     )
     pygame.draw.rect(
         screen,
         BOX_BORDER_ACTIVE if focused else BOX_BORDER,
         rect,
-        3 if focused else 2,
-        border_radius=12,
+        max(1, _px(3)) if focused else layout["border"],
+        border_radius=radius,
     )
 
     txt = font_big.render(label, True, TEXT_COLOUR)
@@ -678,114 +1823,201 @@ def draw_button(x, y, w, h, label, focused=False):
 
     return rect, hover
 
-def draw_menu():
-    global start_btn_rect, settings_panel_rect
-    screen.fill(BG_COLOUR)
-
-    settings_btn_size = 64
-    settings_btn_x = 60
-    settings_btn_y = 60
-    settings_rect = draw_settings_button(settings_btn_x, settings_btn_y, settings_btn_size, settings_menu_open)
-
-    title = "GSSZO Darts Counter"
-    title_surf = font_title.render(title, True, TEXT_COLOUR)
-    title_rect = title_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 330))
-    screen.blit(title_surf, title_rect)
-
-    col_x = WIDTH // 2 - 380
-    col_w = 760
-    box_h = 70
-    gap_y = 105
-    y0 = HEIGHT // 2 - 250
-
-    p1_rect = draw_input_box(col_x, y0 + 0*gap_y, col_w, box_h,
-                             "Player 1 name", menu_values["p1"], active_input_key == "p1")
-    p2_rect = draw_input_box(col_x, y0 + 1*gap_y, col_w, box_h,
-                             "Player 2 name", menu_values["p2"], active_input_key == "p2")
-
-    score_outer, score_301, score_501 = draw_score_switch(
-        col_x, y0 + 2*gap_y, col_w, box_h,
-        active=(active_input_key == "score"),
-        selected=menu_values["score"] if menu_values["score"] in ("301", "501") else "301"
-    )
-
-    legs_rect = draw_input_box(
-        col_x, y0 + 3*gap_y, col_w, box_h,
-        "Legs to win", menu_values["legs"], active_input_key == "legs"
-    )
-
-    dob_rect = draw_checkbox(
-        col_x, y0 + 4*gap_y, col_w, box_h,
-        "Double Out", bool(menu_values["doubleout"]), active_input_key == "doubleout"
-    )
-
-    start_btn_rect, _ = draw_button(
-        col_x, y0 + 5*gap_y, col_w, box_h + 10,
-        "Start",
-        focused=(active_input_key == "start")
-    )
+def menu_player_count() -> int:
+    try:
+        return min(MAX_PLAYERS, max(MIN_PLAYERS, int(menu_values["players"])))
+    except ValueError:
+        return MIN_PLAYERS
+
+def menu_widget_keys():
+    """Main-column widgets in focus (TAB) order."""
+    return PLAYER_NAME_KEYS[:menu_player_count()] + ("score", "legs", "players", "doubleout", "start")
+
+def set_menu_player_count(count: int):
+    """Change the number of name boxes; the menu layout depends on it."""
+    count = min(MAX_PLAYERS, max(MIN_PLAYERS, count))
+    if count != menu_player_count():
+        menu_values["players"] = str(count)
+        layout["menu"] = _compute_menu_layout()
+
+def menu_values_from_match():
+    """
+    Prefill the menu with the current match's settings (M from the game or end
+    screen). A pending tournament pairing keeps its names and legs, which
+    prefill_tournament_match() already put there.
+    """
+    menu_values["score"] = str(START_SCORE) if START_SCORE in (301, 501) else "301"
+    menu_values["doubleout"] = DOUBLE_OUT_ENABLED
+    menu_values["showsponsors"] = sponsor_bar_enabled
+    if tournament is not None and tournament_match_id is not None:
+        return
+    for key, name in zip(PLAYER_NAME_KEYS, player_names):
+        menu_values[key] = name
+    menu_values["legs"] = str(LEGS_TO_WIN)
+    set_menu_player_count(len(player_names))
+
+menu_drawn_state = None    # widget states currently on screen; None forces a full redraw
+
+def _draw_menu_widget(key):
+    """Draw a single main-column menu widget from the cached layout."""
+    widgets = layout["menu"]["widgets"]
+    if key in PLAYER_NAME_KEYS:
+        label = f"Player {PLAYER_NAME_KEYS.index(key) + 1} name"
+        draw_input_box(widgets[key], label, menu_values[key], active_input_key == key, menu_rating_note(key))
+    elif key == "score":
+        draw_score_switch(
+            widgets["score"],
+            active=(active_input_key == "score"),
+            selected=menu_values["score"] if menu_values["score"] in ("301", "501") else "301"
+        )
+    elif key == "legs":
+        draw_input_box(widgets["legs"], "Legs to win", menu_values["legs"], active_input_key == "legs")
+    elif key == "players":
+        draw_input_box(widgets["players"], "Players", menu_values["players"], active_input_key == "players")
+    elif key == "doubleout":
+        draw_checkbox(
+            widgets["doubleout"], "Double Out", bool(menu_values["doubleout"]), active_input_key == "doubleout"
+        )
+    elif key == "start":
+        draw_button(widgets["start"], "Start", focused=(active_input_key == "start"))
+
+def menu_rating_note(key) -> Optional[str]:
+    rating = player_ratings.rating(menu_values[key].strip())
+    return f"{rating:.0f}" if rating is not None else None
+
+def _draw_settings_panel():
+    panel_rect = layout["menu"]["panel"]
+    panel_widgets = layout["menu"]["panel_widgets"]
+    pygame.draw.rect(screen, BOX_BG, panel_rect, border_radius=_px(12))
+    pygame.draw.rect(screen, BOX_BORDER_ACTIVE, panel_rect, layout["border"], border_radius=_px(12))
+
+    draw_checkbox(panel_widgets["fullscreen"], "Fullscreen", bool(menu_values["fullscreen"]), False)
+    draw_checkbox(panel_widgets["darkmode"], "Dark mode", bool(menu_values["darkmode"]), False)
+    draw_checkbox(panel_widgets["showsponsors"], "Show sponsors", bool(menu_values["showsponsors"]), False)
+
+def menu_hit_rects():
+    """Clickable menu rects; settings panel entries are None while it is closed."""
+    global settings_panel_rect, start_btn_rect
+    menu_layout = layout["menu"]
+    widgets = menu_layout["widgets"]
+    panel_widgets = menu_layout["panel_widgets"] if settings_menu_open else {}
+    settings_panel_rect = menu_layout["panel"] if settings_menu_open else None
+    start_btn_rect = widgets["start"]
+    return {
+        **{key: widgets[key] for key in PLAYER_NAME_KEYS if key in widgets},
+        "players": widgets["players"],
+        "score_outer": widgets["score"],
+        "score_301": menu_layout["score_301"],
+        "score_501": menu_layout["score_501"],
+        "legs": widgets["legs"],
+        "doubleout": widgets["doubleout"],
+        "settings": menu_layout["settings_btn"],
+        "showsponsors": panel_widgets.get("showsponsors"),
+        "darkmode": panel_widgets.get("darkmode"),
+        "fullscreen": panel_widgets.get("fullscreen"),
+        "start": widgets["start"],
+    }
 
-    showsponsors_rect = None
-    darkmode_rect = None
-    fullscreen_rect = None
-    settings_panel_rect = None
-    if settings_menu_open:
-        panel_padding = 20
-        panel_w = 200
-        checkbox_gap = 36
-        panel_h = panel_padding * 2 + 26 + box_h * 3 + checkbox_gap * 2
-        panel_x = settings_btn_x
-        panel_y = settings_btn_y + settings_btn_size + 20
-        settings_panel_rect = pygame.Rect(panel_x, panel_y, panel_w, panel_h)
-        pygame.draw.rect(screen, BOX_BG, settings_panel_rect, border_radius=12)
-        pygame.draw.rect(screen, BOX_BORDER_ACTIVE, settings_panel_rect, 2, border_radius=12)
-
-        checkbox_y = panel_y + panel_padding + 26
-        fullscreen_rect = draw_checkbox(
-            panel_x + panel_padding,
-            checkbox_y,
-            panel_w - panel_padding * 2,
-            box_h,
-            "Fullscreen",
+def draw_menu():
+    """Full menu redraw (first frame, relayout, theme change or window expose)."""
+    with frame_lock:
+        screen.fill(BG_COLOUR)
+
+        menu_layout = layout["menu"]
+        draw_settings_button(menu_layout["settings_btn"], settings_menu_open)
+
+        title = "GSSZO Darts Counter"
+        title_surf = font_title.render(title, True, TEXT_COLOUR)
+        title_rect = title_surf.get_rect(center=menu_layout["title_center"])
+        screen.blit(title_surf, title_rect)
+
+        for key in menu_widget_keys():
+            _draw_menu_widget(key)
+
+        if settings_menu_open:
+            _draw_settings_panel()
+
+        present_frame()
+        return menu_hit_rects()
+
+def _menu_widget_states():
+    """Everything the look of each menu widget depends on, keyed by widget."""
+    mouse_pos = pointer_pos()
+    menu_layout = layout["menu"]
+    states = {
+        # Any change here (including the player count) means a full redraw
+        "screen": (WIDTH, HEIGHT, current_fullscreen, current_dark_mode, menu_player_count()),
+    }
+    for key in PLAYER_NAME_KEYS[:menu_player_count()]:
+        states[key] = (menu_values[key], active_input_key == key, menu_rating_note(key))
+    states.update({
+        "score": (menu_values["score"], active_input_key == "score"),
+        "legs": (menu_values["legs"], active_input_key == "legs"),
+        "players": (menu_values["players"], active_input_key == "players"),
+        "doubleout": (bool(menu_values["doubleout"]), active_input_key == "doubleout"),
+        "start": (active_input_key == "start", menu_layout["widgets"]["start"].collidepoint(mouse_pos)),
+        "settings": (settings_menu_open, menu_layout["settings_btn"].collidepoint(mouse_pos)),
+        "panel": (
+            settings_menu_open,
             bool(menu_values["fullscreen"]),
-            False,
-        )
-        checkbox_y += box_h + checkbox_gap
-        darkmode_rect = draw_checkbox(
-            panel_x + panel_padding,
-            checkbox_y,
-            panel_w - panel_padding * 2,
-            box_h,
-            "Dark mode",
             bool(menu_values["darkmode"]),
-            False,
-        )
-        checkbox_y += box_h + checkbox_gap
-        showsponsors_rect = draw_checkbox(
-            panel_x + panel_padding,
-            checkbox_y,
-            panel_w - panel_padding * 2,
-            box_h,
-            "Show sponsors",
             bool(menu_values["showsponsors"]),
-            False,
-        )
+        ),
+    })
+    return states
 
-    pygame.display.flip()
-    return {
-        "p1": p1_rect,
-        "p2": p2_rect,
-        "score_outer": score_outer,
-        "score_301": score_301,
-        "score_501": score_501,
-        "legs": legs_rect,
-        "doubleout": dob_rect,
-        "settings": settings_rect,
-        "showsponsors": showsponsors_rect,
-        "darkmode": darkmode_rect,
-        "fullscreen": fullscreen_rect,
-        "start": start_btn_rect,
-    }
+def invalidate_menu():
+    """Force a full menu redraw on the next refresh_menu()."""
+    global menu_drawn_state
+    menu_drawn_state = None
+
+def refresh_menu():
+    """
+    Bring the menu on screen up to date with the least work possible.
+
+    Only widgets whose state changed since the last refresh are repainted and
+    pushed with display.update(); a relayout or theme change repaints it all.
+    """
+    global menu_drawn_state
+
+    with frame_lock:
+        states = _menu_widget_states()
+        if menu_drawn_state is None or states["screen"] != menu_drawn_state["screen"]:
+            rects = draw_menu()
+            menu_drawn_state = states
+            return rects
+
+        menu_layout = layout["menu"]
+        dirty_rects = []
+        for key, widget_state in states.items():
+            if widget_state == menu_drawn_state[key]:
+                continue
+            if key in menu_layout["widgets"]:
+                damage = menu_layout["damage"][key]
+                screen.fill(BG_COLOUR, damage)
+                _draw_menu_widget(key)
+                dirty_rects.append(damage)
+            elif key == "settings":
+                screen.fill(BG_COLOUR, menu_layout["settings_btn"])
+                draw_settings_button(menu_layout["settings_btn"], settings_menu_open)
+                dirty_rects.append(menu_layout["settings_btn"])
+            elif key == "panel":
+                panel = menu_layout["panel"]
+                screen.fill(BG_COLOUR, panel)
+                # On very narrow windows widgets can reach under the panel; repaint them beneath it
+                for widget_key, damage in menu_layout["damage"].items():
+                    if damage.colliderect(panel):
+                        screen.fill(BG_COLOUR, damage)
+                        _draw_menu_widget(widget_key)
+                        dirty_rects.append(damage)
+                if settings_menu_open:
+                    _draw_settings_panel()
+                dirty_rects.append(panel)
+
+        if dirty_rects:
+            present_frame(dirty_rects)
+        menu_drawn_state = states
+        return menu_hit_rects()
 
 def menu_toggle_score():
     menu_values["score"] = "501" if menu_values["score"] == "301" else "301"
@@ -796,8 +2028,7 @@ def menu_start_now():
     apply_display_mode(bool(menu_values["fullscreen"]))
     reset_game(
         int(menu_values["score"]),
-        menu_values["p1"],
-        menu_values["p2"],
+        [menu_values[key] for key in PLAYER_NAME_KEYS[:menu_player_count()]],
         int(legs_txt),
         bool(menu_values["doubleout"]),
         bool(menu_values["showsponsors"])
@@ -809,45 +2040,47 @@ def handle_menu_event(event, input_rects):
     global active_input_key, state, settings_menu_open, settings_panel_rect
 
     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        pos = render_pos(event.pos)
         settings_rect = input_rects.get("settings")
-        if settings_rect and settings_rect.collidepoint(event.pos):
+        if settings_rect and settings_rect.collidepoint(pos):
             settings_menu_open = not settings_menu_open
             return
-        if settings_menu_open and settings_panel_rect and not settings_panel_rect.collidepoint(event.pos):
+        if settings_menu_open and settings_panel_rect and not settings_panel_rect.collidepoint(pos):
             settings_menu_open = False
             # continue handling click for other controls after closing
-        if input_rects["p1"].collidepoint(event.pos):
-            active_input_key = "p1"; return
-        if input_rects["p2"].collidepoint(event.pos):
-            active_input_key = "p2"; return
-        if input_rects["score_outer"].collidepoint(event.pos):
+        for key in PLAYER_NAME_KEYS:
+            if key in input_rects and input_rects[key].collidepoint(pos):
+                active_input_key = key; return
+        if input_rects["score_outer"].collidepoint(pos):
             active_input_key = "score"
-            if input_rects["score_301"].collidepoint(event.pos):
+            if input_rects["score_301"].collidepoint(pos):
                 menu_values["score"] = "301"
-            elif input_rects["score_501"].collidepoint(event.pos):
+            elif input_rects["score_501"].collidepoint(pos):
                 menu_values["score"] = "501"
             return
-        if input_rects["legs"].collidepoint(event.pos):
+        if input_rects["legs"].collidepoint(pos):
             active_input_key = "legs"; return
-        if input_rects["doubleout"].collidepoint(event.pos):
+        if input_rects["players"].collidepoint(pos):
+            active_input_key = "players"; return
+        if input_rects["doubleout"].collidepoint(pos):
             active_input_key = "doubleout"
             menu_values["doubleout"] = not bool(menu_values["doubleout"])
             return
         fullscreen_rect = input_rects.get("fullscreen")
-        if settings_menu_open and fullscreen_rect and fullscreen_rect.collidepoint(event.pos):
+        if settings_menu_open and fullscreen_rect and fullscreen_rect.collidepoint(pos):
             menu_values["fullscreen"] = not bool(menu_values["fullscreen"])
             apply_display_mode(bool(menu_values["fullscreen"]))
             return
         darkmode_rect = input_rects.get("darkmode")
-        if settings_menu_open and darkmode_rect and darkmode_rect.collidepoint(event.pos):
+        if settings_menu_open and darkmode_rect and darkmode_rect.collidepoint(pos):
             menu_values["darkmode"] = not bool(menu_values["darkmode"])
             apply_theme(bool(menu_values["darkmode"]))
             return
         showsponsors_rect = input_rects.get("showsponsors")
-        if settings_menu_open and showsponsors_rect and showsponsors_rect.collidepoint(event.pos):
+        if settings_menu_open and showsponsors_rect and showsponsors_rect.collidepoint(pos):
             menu_values["showsponsors"] = not bool(menu_values["showsponsors"])
             return
-        if input_rects["start"].collidepoint(event.pos):
+        if input_rects["start"].collidepoint(pos):
             active_input_key = "start"
             if menu_start_now():
                 state = STATE_GAME
@@ -860,7 +2093,7 @@ def handle_menu_event(event, input_rects):
                 return
             pygame.quit(); sys.exit()
         if event.key == pygame.K_TAB:
-            order = ["p1", "p2", "score", "legs", "doubleout", "start"]
+            order = menu_widget_keys()
             idx = order.index(active_input_key)
             active_input_key = order[(idx + 1) % len(order)]
             return
@@ -877,7 +2110,7 @@ def handle_menu_event(event, input_rects):
                 return
             return
 
-        if active_input_key in ("p1", "p2"):
+        if active_input_key in PLAYER_NAME_KEYS:
             if event.key == pygame.K_BACKSPACE:
                 menu_values[active_input_key] = menu_values[active_input_key][:-1]
             else:
@@ -891,6 +2124,14 @@ def handle_menu_event(event, input_rects):
             else:
                 if event.unicode and event.unicode.isdigit() and len(menu_values["legs"]) < 3:
                     menu_values["legs"] += event.unicode
+        elif active_input_key == "players":
+            # A single digit (2-8) or Left/Right to step
+            if event.key == pygame.K_LEFT:
+                set_menu_player_count(menu_player_count() - 1)
+            elif event.key == pygame.K_RIGHT:
+                set_menu_player_count(menu_player_count() + 1)
+            elif event.unicode and event.unicode.isdigit():
+                set_menu_player_count(int(event.unicode))
         elif active_input_key == "doubleout" and event.key == pygame.K_SPACE:
             menu_values["doubleout"] = not bool(menu_values["doubleout"]); return
 
@@ -899,11 +2140,12 @@ def draw_focus_arrows(rect: pygame.Rect):
     left_arrow_surf = font_big.render(">", True, ACCENT_ACTIVE)
     right_arrow_surf = font_big.render("<", True, ACCENT_ACTIVE)
 
+    arrow_gap = layout["arrow_gap"]
     left_arrow_rect = left_arrow_surf.get_rect(
-        midright=(rect.left - 10, rect.centery - 5)
+        midright=(rect.left - arrow_gap, rect.centery - _px(5))
     )
     right_arrow_rect = right_arrow_surf.get_rect(
-        midleft=(rect.right + 10, rect.centery - 5)
+        midleft=(rect.right + arrow_gap, rect.centery - _px(5))
     )
 
     screen.blit(left_arrow_surf, left_arrow_rect)
@@ -912,119 +2154,98 @@ def draw_focus_arrows(rect: pygame.Rect):
 
 # region GAME RENDERING & EVENTS
 
-def draw_player_section(player_idx, x_start, width, is_active, leg_avg_val, match_avg_val):
-    title = player_names[player_idx]
+def draw_player_section(surface, snap, player_idx):
+    section = snap.layout["game"]["players"][player_idx]
+    title = snap.player_names[player_idx]
+    is_active = snap.active_player == player_idx
     title_colour = ACCENT_ACTIVE if is_active else ACCENT_INACTIVE
-    title_top_center = (x_start + width // 2, 50)  # adjust 50 up/down if needed
 
     draw_player_name_multiline(
-        screen,
-        font_big,          # same font you used before
+        surface,
+        section["name_font"],
         title,
         title_colour,
-        title_top_center,
+        section["name_top_center"],
+        section["name_wrap_w"],
     )
 
     # --- Static stats placement on each side of the screen ---
-    is_left = (player_idx == 0)
-    stats_margin_x = 40
-    stats_top_y = 30
-
-    # Badge geometry (same style for Legs / Leg avg / Match avg)
-    badge_w, badge_h = 200, 56
-    badge_gap_y = 8
-
-    if is_left:
-        badge_x = x_start + stats_margin_x
-    else:
-        badge_x = x_start + width - stats_margin_x - badge_w
-
-    # ----- Legs Won badge -----
-    legs_rect = pygame.Rect(badge_x, stats_top_y, badge_w, badge_h)
-    pygame.draw.rect(screen, BOX_BG, legs_rect, border_radius=12)
-    pygame.draw.rect(screen, BOX_BORDER, legs_rect, 2, border_radius=12)
-    legs_text_surf = font_small.render(f"Legs Won: {legs_won[player_idx]}", True, TEXT_COLOUR)
-    screen.blit(legs_text_surf, legs_text_surf.get_rect(center=legs_rect.center))
-
-    # ----- Leg average badge -----
-    leg_avg_rect = pygame.Rect(badge_x, legs_rect.bottom + badge_gap_y, badge_w, badge_h)
-    pygame.draw.rect(screen, BOX_BG, leg_avg_rect, border_radius=12)
-    pygame.draw.rect(screen, BOX_BORDER, leg_avg_rect, 2, border_radius=12)
-    leg_avg_text_surf = font_small.render(f"Leg avg: {leg_avg_val:.1f}", True, TEXT_COLOUR)
-    screen.blit(leg_avg_text_surf, leg_avg_text_surf.get_rect(center=leg_avg_rect.center))
-
-    # ----- Match average badge -----
-    match_avg_rect = pygame.Rect(badge_x, leg_avg_rect.bottom + badge_gap_y, badge_w, badge_h)
-    pygame.draw.rect(screen, BOX_BG, match_avg_rect, border_radius=12)
-    pygame.draw.rect(screen, BOX_BORDER, match_avg_rect, 2, border_radius=12)
-    match_avg_text_surf = font_small.render(f"Match avg: {match_avg_val:.1f}", True, TEXT_COLOUR)
-    screen.blit(match_avg_text_surf, match_avg_text_surf.get_rect(center=match_avg_rect.center))
+    badge_texts = (
+        f"Legs Won: {snap.legs_won[player_idx]}",
+        f"Leg avg: {snap.leg_averages[player_idx]:.1f}",
+        f"Match avg: {snap.match_averages[player_idx]:.1f}",
+    )
+    badges = list(zip(section["badges"], badge_texts))
+    if snap.win_chances is not None and player_idx < len(snap.win_chances):
+        badges.append((section["win_badge"], f"Win chance: {snap.win_chances[player_idx] * 100:.0f}%"))
+    radius = _px(12)
+    for badge_rect, badge_text in badges:
+        pygame.draw.rect(surface, BOX_BG, badge_rect, border_radius=radius)
+        pygame.draw.rect(surface, BOX_BORDER, badge_rect, snap.layout["border"], border_radius=radius)
+        text_surf = font_small.render(badge_text, True, TEXT_COLOUR)
+        surface.blit(text_surf, text_surf.get_rect(center=badge_rect.center))
 
     # ----- Remaining score -----
-    total_scored = sum(scores[player_idx])
-    remaining = START_SCORE - total_scored
+    remaining = snap.start_score - snap.leg_totals[player_idx]
 
-    # Place "Remaining" below the badges so nothing overlaps
-    rem_label_y = match_avg_rect.bottom + 40
-    rem_label_surf = font_med.render("Remaining:", True, TEXT_COLOUR)
-    rem_label_rect = rem_label_surf.get_rect(center=(x_start + width // 2, rem_label_y))
-    screen.blit(rem_label_surf, rem_label_rect)
+    if section["rem_label_center"] is not None:
+        rem_label_surf = font_med.render("Remaining:", True, TEXT_COLOUR)
+        surface.blit(rem_label_surf, rem_label_surf.get_rect(center=section["rem_label_center"]))
 
     rem_surf = font_huge.render(str(remaining), True, title_colour)
-    rem_rect = rem_surf.get_rect(center=(x_start + width // 2, rem_label_y + 80))
-    screen.blit(rem_surf, rem_rect)
-
-    # Decide horizontal divider Y: below remaining number, above input label
-    pad_below_remaining = 8
+    surface.blit(rem_surf, rem_surf.get_rect(center=section["rem_center"]))
 
     # ----- Current input (only for active player) -----
-    input_label_y = rem_rect.bottom + 40
     if is_active:
-        input_label = font_small.render("Current input:", True, TEXT_COLOUR)
-        screen.blit(input_label, (x_start + 40, input_label_y))
+        label_text = "Darts: " + "  ".join(map(dart_label, snap.visit_darts)) if snap.visit_darts else "Current input:"
+        input_label = font_small.render(label_text, True, TEXT_COLOUR)
+        surface.blit(input_label, section["input_label_pos"])
 
-        input_text = current_input if current_input != "" else "-"
+        input_text = snap.current_input if snap.current_input != "" else "-"
         input_surf = font_big.render(input_text, True, ACCENT_ACTIVE)
-        screen.blit(input_surf, (x_start + 40, input_label_y + 30))
+        surface.blit(input_surf, section["input_value_pos"])
 
     # ----- Rounds list -----
-    rounds_label_y = input_label_y + 80
     rounds_label = font_small.render("Rounds:", True, TEXT_COLOUR)
-    screen.blit(rounds_label, (x_start + 40, rounds_label_y))
-
-    # Table header
-    header_y = rounds_label_y + 30
-    col_round_x = x_start + 40
-    col_score_x = x_start + 140
-    col_rem_x   = x_start + 320
-
-    header_hash  = font_round.render("#", True, TEXT_COLOUR)
-    header_score = font_round.render("Score", True, TEXT_COLOUR)
-    header_rem   = font_round.render("Remaining", True, TEXT_COLOUR)
-
-    screen.blit(header_hash,  (col_round_x, header_y))
-    screen.blit(header_score, (col_score_x, header_y))
-    screen.blit(header_rem,   (col_rem_x,   header_y))
+    surface.blit(rounds_label, section["rounds_label_pos"])
 
-    start_y = header_y + 36
-    line_height = 36  # bigger spacing for the larger font
-    max_lines = max(1, (HEIGHT - start_y - 60) // line_height)
+    # Only the visible tail of the leg is in the snapshot; show the last
+    # max_lines throws of it
+    visible_scores = snap.visible_scores[player_idx][-section["max_lines"]:]
+    start_round_index = snap.visit_counts[player_idx] - len(visible_scores) + 1
+    draw_rounds_table(surface, section, visible_scores, start_round_index, remaining)
 
-    player_scores = scores[player_idx]
-
-    # Precompute remaining after each throw in this leg
-    remaining_list = []
-    rem_tmp = START_SCORE
-    for s in player_scores:
+def draw_rounds_table(surface, section, visible_scores, start_round_index: int, remaining: int):
+    """
+    The "# / Score / Remaining" table of a player section: a header at
+    section["header_y"], then one row per visit from section["rows_y"].
+    remaining is what is left after the last visit shown; the running
+    remaining of the rows is worked back from it, so this is O(rows).
+    Returns the y just below the last row.
+    """
+    header_y = section["header_y"]
+    col_round_x = section["col_round_x"]
+    col_score_x = section["col_score_x"]
+    col_rem_x   = section["col_rem_x"]
+
+    table_font = section["table_font"]
+    hash_text, score_header_text, rem_header_text = section["table_headers"]
+    header_hash  = table_font.render(hash_text, True, TEXT_COLOUR)
+    header_score = table_font.render(score_header_text, True, TEXT_COLOUR)
+    header_rem   = table_font.render(rem_header_text, True, TEXT_COLOUR)
+
+    surface.blit(header_hash,  (col_round_x, header_y))
+    surface.blit(header_score, (col_score_x, header_y))
+    surface.blit(header_rem,   (col_rem_x,   header_y))
+
+    line_height = section["line_height"]
+    rem_tmp = remaining + sum(visible_scores)
+    visible_remaining  = []
+    for s in visible_scores:
         rem_tmp -= s
-        remaining_list.append(rem_tmp)
-
-    # Only show the last max_lines throws
-    visible_scores     = player_scores[-max_lines:]
-    visible_remaining  = remaining_list[-max_lines:]
-    start_round_index  = len(player_scores) - len(visible_scores) + 1
+        visible_remaining.append(rem_tmp)
 
-    y = start_y + 10
+    y = section["rows_y"]
     for i, (s, rem_after) in enumerate(zip(visible_scores, visible_remaining)):
         round_num = start_round_index + i
 
@@ -1036,137 +2257,234 @@ def draw_player_section(player_idx, x_start, width, is_active, leg_avg_val, matc
         score_text = f"{score_val:>3}"
         rem_text   = f"{rem_val:>3}"
 
-        round_surf = font_round.render(round_text, True, TEXT_COLOUR)
-        score_surf = font_round.render(score_text, True, TEXT_COLOUR)
-        rem_surf   = font_round.render(rem_text,   True, TEXT_COLOUR)
+        round_surf = table_font.render(round_text, True, TEXT_COLOUR)
+        score_surf = table_font.render(score_text, True, TEXT_COLOUR)
+        rem_surf   = table_font.render(rem_text,   True, TEXT_COLOUR)
 
-        screen.blit(round_surf, (col_round_x, y))
-        screen.blit(score_surf, (col_score_x + 10, y))
-        screen.blit(rem_surf,   (col_rem_x + 40,   y))
+        surface.blit(round_surf, (col_round_x, y))
+        surface.blit(score_surf, (col_score_x + section["score_dx"], y))
+        surface.blit(rem_surf,   (col_rem_x + section["rem_dx"],   y))
 
         y += line_height
+    return y
+
+NAME_MAX_CHARS = 45
+NAME_MAX_LINES = 3
+
+def _wrap_name_lines(font, text, wrap_width):
+    """Split text into lines no wider than wrap_width pixels, wrapping at spaces."""
+    lines = []
+    current_line = ""
+    for word in text.split():
+        candidate = f"{current_line} {word}" if current_line else word
+        if font.size(candidate)[0] <= wrap_width:
+            current_line = candidate
+            continue
+        if current_line:
+            lines.append(current_line)
+        # A single word wider than the column is broken between characters
+        current_line = ""
+        for ch in word:
+            if current_line and font.size(current_line + ch)[0] > wrap_width:
+                lines.append(current_line)
+                current_line = ""
+            current_line += ch
+    if current_line:
+        lines.append(current_line)
+
+    if len(lines) > NAME_MAX_LINES:
+        last = lines[NAME_MAX_LINES - 1]
+        while last and font.size(last + "...")[0] > wrap_width:
+            last = last[:-1]
+        lines = lines[:NAME_MAX_LINES - 1] + [last.rstrip() + "..."]
+    return lines
+
+def _render_name_block(font, text, colour, wrap_width):
+    lines = _wrap_name_lines(font, text, wrap_width)
+    if not lines:
+        return None
 
-    # Horizontal divider should sit just under the remaining score, but above the input label
-    hline_y = min(rem_rect.bottom + pad_below_remaining, input_label_y - 8)
-    return hline_y
+    line_gap = _px(4)  # pixels between lines
+    line_surfs = [font.render(line, True, colour) for line in lines]
+    block_w = max(surf.get_width() for surf in line_surfs)
+    block_h = sum(surf.get_height() for surf in line_surfs) + line_gap * (len(line_surfs) - 1)
+
+    block = pygame.Surface((block_w, block_h), pygame.SRCALPHA)
+    y = 0
+    for surf in line_surfs:
+        rect = surf.get_rect(midtop=(block_w // 2, y))
+        block.blit(surf, rect)
+        y = rect.bottom + line_gap
+    return block
 
-def draw_player_name_multiline(surface, font, text, colour, top_center_pos):
+def draw_player_name_multiline(surface, font, text, colour, top_center_pos, wrap_width):
     """
     Draw the player name in up to 3 lines with a fixed top.
 
     Rules:
     - Max total length of the name: 45 characters (extra is truncated).
-    - Wrap only at spaces.
-    - Start a new line if adding the next word would make the line > 15 characters.
+    - Wrap at spaces so no line is wider than wrap_width pixels.
     - Lines stack downward from a fixed top y.
+
+    The finished block is cached in name_block_cache, so names are only
+    wrapped and rendered again after reset_game, a theme change or a relayout.
     """
     if not text:
         return
 
-    # Enforce max total length
-    text = text[:45]
-
-    # Split into words (collapses multiple spaces)
-    words = text.split()
-    if not words:
-        return
-
-    # Build lines with max 15 characters per line (wrapping at spaces)
-    lines = []
-    current_line = words[0]
-
-    for word in words[1:]:
-        # +1 for the space
-        if len(current_line) + 1 + len(word) <= 15:
-            current_line += " " + word
-        else:
-            lines.append(current_line)
-            current_line = word
-
-    lines.append(current_line)
-
-    # Draw lines with fixed top
-    cx, top_y = top_center_pos
-    line_gap = 4  # pixels between lines
-    y = top_y
+    key = (text, font, colour, wrap_width)
+    block = name_block_cache.get(key, _MISSING)
+    if block is _MISSING:
+        block = _render_name_block(font, text[:NAME_MAX_CHARS], colour, wrap_width)
+        name_block_cache[key] = block
 
-    for line in lines:
-        surf = font.render(line, True, colour)
-        rect = surf.get_rect(midtop=(cx, y))
-        surface.blit(surf, rect)
-        y = rect.bottom + line_gap
+    if block is not None:
+        surface.blit(block, block.get_rect(midtop=top_center_pos))
 
 # ---- Logo drawing with 20 px gaps above and below ----
-def draw_logo_layers(max_bottom_y: int, angle_deg: float):
+def _scaled_logo_layer(name: str, original: pygame.Surface, diameter: int, smooth: bool = True):
+    """Return the logo layer scaled to diameter, cached until the next relayout."""
+    key = (name, id(original), diameter, smooth)
+    scaled = logo_scale_cache.get(key)
+    if scaled is None:
+        scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        scaled = scale(original, (diameter, diameter))
+        logo_scale_cache[key] = scaled
+    return scaled
+
+def draw_logo_layers(surface, game_layout, angle_deg: float, tier: dict = None):
     """
     Draw the centered logo at the top as a circle with:
       - top at LOGO_TOP_GAP
-      - bottom at max_bottom_y - LOGO_BOTTOM_GAP
+      - bottom at LOGO_BOTTOM_GAP above the horizontal divider
     The outer ring rotates by angle_deg, the inner stays fixed.
-    Falls back to a single static image if two-piece assets are missing.
+    Diameter and center come from the cached game layout; tier (a
+    QUALITY_TIERS entry, default the finest) picks the scaling and rotation.
     """
-    # Compute available diameter from vertical gap and side margin
-    available_h = max_bottom_y - LOGO_TOP_GAP - LOGO_BOTTOM_GAP
-    if available_h <= 1:
+    tier = tier or QUALITY_TIERS[0]
+    diameter = game_layout["logo_diameter"]
+    if diameter <= 1 or LOGO_INNER_ORIG is None or LOGO_RING_ORIG is None:
         return
 
-    max_w = max(1, WIDTH - 2 * LOGO_SIDE_MARGIN)
-    diameter = int(max(1, min(available_h, max_w)))
-    cx = WIDTH // 2
-    cy = LOGO_TOP_GAP + diameter // 2
+    cx, cy = game_layout["logo_center"]
 
-    # Scale both layers to the target diameter once per frame
-    inner_scaled = pygame.transform.smoothscale(LOGO_INNER_ORIG, (diameter, diameter))
-    ring_scaled  = pygame.transform.smoothscale(LOGO_RING_ORIG,  (diameter, diameter))
+    # Both layers are scaled once per layout, not once per frame
+    inner_scaled = _scaled_logo_layer("inner", LOGO_INNER_ORIG, diameter, tier["smooth_scale"])
+    ring_scaled  = _scaled_logo_layer("ring", LOGO_RING_ORIG, diameter, tier["smooth_scale"])
 
     # Rotate the ring around its center.
-    # Note: rotozoom enlarges the bounding rectangle due to rotation, so we center it on (cx, cy)
-    ring_rot = pygame.transform.rotozoom(ring_scaled, angle_deg, 1.0)
+    # Note: rotating enlarges the bounding rectangle, so we center it on (cx, cy)
+    if tier["rotation"] == "rotozoom":
+        ring_rot = pygame.transform.rotozoom(ring_scaled, angle_deg, 1.0)
+    elif tier["rotation"] == "rotate":
+        ring_rot = pygame.transform.rotate(ring_scaled, angle_deg)   # no filtering, much cheaper
+    else:
+        ring_rot = ring_scaled
 
     # Blit order: inner first, then the rotating ring on top
-    screen.blit(inner_scaled, inner_scaled.get_rect(center=(cx, cy)))
-    screen.blit(ring_rot,     ring_rot.get_rect(center=(cx, cy)))
+    surface.blit(inner_scaled, inner_scaled.get_rect(center=(cx, cy)))
+    surface.blit(ring_rot,     ring_rot.get_rect(center=(cx, cy)))
     return
 
-def draw_game():
-    screen.fill(BG_COLOUR)
-
-    # Compute averages
-    leg_avg_vals = [avg(scores[0]), avg(scores[1])]
-    match_avg_vals = match_averages()
+class GameSnapshot(NamedTuple):
+    """Everything a game frame shows, copied on the main thread so the render thread never reads live state."""
+    seq: int
+    taken_at: float
+    width: int
+    height: int
+    layout: dict
+    player_names: tuple
+    active_player: int
+    start_score: int
+    legs_won: tuple
+    leg_totals: tuple
+    leg_averages: tuple
+    match_averages: tuple
+    visible_scores: tuple      # per player, the last visits that fit the rounds table
+    visit_counts: tuple        # per player, visits in this leg
+    current_input: str
+    visit_darts: tuple
+    logo_angle: float
+    sponsor_bar: bool
+    win_chances: Optional[tuple]
+    latency_lines: Optional[list]
+    memory_lines: Optional[list]
+    stats_rows: Optional[tuple]
+    quality: dict               # the QUALITY_TIERS entry to draw with
+
+snapshot_seq = 0
+
+def game_snapshot() -> GameSnapshot:
+    global snapshot_seq
+    snapshot_seq += 1
+    sections = layout["game"]["players"]
+    return GameSnapshot(
+        snapshot_seq, time.perf_counter(), WIDTH, HEIGHT, layout,
+        tuple(player_names), active_player, START_SCORE, tuple(legs_won), tuple(leg_totals),
+        tuple(leg_averages()), tuple(match_averages()),
+        tuple(player_scores[-section["max_lines"]:].tolist() for player_scores, section in zip(scores, sections)),
+        tuple(map(len, scores)),
+        current_input, tuple(visit_darts), quality.logo_angle(LOGO_ANGLE), sponsor_bar_enabled,
+        tuple(win_chance.chances) if win_chance.chances is not None else None,
+        ["Input latency"] + (latency_tracer.summary_lines() or ["no samples yet"]) + [quality.summary_line()]
+        if latency_overlay_visible else None,
+        memory_report_lines() if memory_overlay_visible else None,
+        current_stats_rows() if stats_panel_visible else None,
+        quality.tier,
+    )
 
-    half_width = WIDTH // 2
+def draw_game_frame(surface, snap: GameSnapshot, frame_dt: float):
+    """Draw one game frame from a snapshot; runs on the render thread (or inline in draw_game())."""
+    surface.fill(BG_COLOUR)
+    game_layout = snap.layout["game"]
 
-    # Draw both sides first and get their suggested horizontal line Y
-    left_hy  = draw_player_section(0, 0, half_width,  active_player == 0, leg_avg_vals[0], match_avg_vals[0])
-    right_hy = draw_player_section(1, half_width, half_width, active_player == 1, leg_avg_vals[1], match_avg_vals[1])
+    for p in range(len(snap.player_names)):
+        draw_player_section(surface, snap, p)
 
-    # Use the lower (max) so the line is surely under both "Remaining" numbers
-    hline_y = max(left_hy, right_hy)
+    hline_y = game_layout["hline_y"]
 
     # Draw layered logo with rotation, honoring the 20 px gaps
-    draw_logo_layers(hline_y, LOGO_ANGLE)
+    if game_layout["logo_diameter"] > 0:
+        draw_logo_layers(surface, game_layout, snap.logo_angle, snap.quality)
 
-    bar_top_y = HEIGHT
-    if sponsor_bar_enabled:
-        target_height = max(40, int(SPONSOR_BAR_HEIGHT))
-        if sponsor_ticker.height != target_height:
-            sponsor_ticker.reload()
+    bar_top_y = snap.height
+    if snap.sponsor_bar:
+        if not sponsor_ticker.built or sponsor_ticker.height != game_layout["sponsor_bar_h"]:
+            sponsor_ticker.request_height(game_layout["sponsor_bar_h"])
         sponsor_ticker.update(frame_dt)
-        bar_top_y = HEIGHT - sponsor_ticker.height
-        sponsor_ticker.draw(screen, bar_top_y)
+        bar_top_y = snap.height - sponsor_ticker.height
+        sponsor_ticker.draw(surface, bar_top_y)
+
+    divider_w = game_layout["divider_w"]
 
-    # Center vertical line from the top of the sponsor bar (or bottom of screen) up to the horizontal divider
-    pygame.draw.line(screen, DIVIDER_COLOUR, (half_width, bar_top_y), (half_width, hline_y), 3)
+    # Vertical lines between the player columns, from the top of the sponsor bar (or bottom of screen) up
+    for divider_x in game_layout["divider_xs"]:
+        pygame.draw.line(
+            surface, DIVIDER_COLOUR, (divider_x, bar_top_y), (divider_x, game_layout["divider_top"]), divider_w
+        )
 
     # Horizontal divider across the screen
-    pygame.draw.line(screen, DIVIDER_COLOUR, (0, hline_y), (WIDTH, hline_y), 3)
+    pygame.draw.line(surface, DIVIDER_COLOUR, (0, hline_y), (snap.width, hline_y), divider_w)
 
-    pygame.display.flip()
+    if snap.latency_lines is not None:
+        draw_overlay_box(surface, snap, snap.latency_lines)
+    if snap.memory_lines is not None:
+        draw_overlay_box(surface, snap, snap.memory_lines, right=False)
+    if snap.stats_rows is not None:
+        draw_stats_panel(surface, snap)
+
+def draw_game():
+    """Draw and present a game frame on the calling thread (soak runs and tools)."""
+    with frame_lock:
+        draw_game_frame(screen, game_snapshot(), frame_dt)
+        present_frame()
 
-def commit_throw():
+def commit_throw(finished_on_double: bool = True):
     """Apply current_input for active player with 'bust', Double Out, and leg/match win logic."""
-    global current_input, scores, active_player, history, state, winner_idx, legs_won
+    global current_input
+
+    latency_tracer.commit_started()
+    darts = len(visit_darts) or 3
 
     # Treat empty input as a 0 score
     if current_input == "":
@@ -1177,87 +2495,120 @@ def commit_throw():
         except ValueError:
             value = 0
 
-    # Cap any recorded value at 180
-    if value > 180:
-        value = 180
+    redo_stack.clear()
+    do_visit(value, finished_on_double, darts)
 
-    remaining_before = START_SCORE - sum(scores[active_player])
-    remaining_after = remaining_before - value
+def do_visit(value: int, finished_on_double: bool = True, darts: int = 3):
+    """
+    Play one visit for the active player and push it on the undo stack.
+    Everything undo_action() needs is in the entry, so undoing and redoing
+    never scan the scores, whether the visit won a leg or the match.
+    """
+    global current_input, active_player, state, winner_idx, legs_won
+
+    player = active_player
+    previous_legs_won = tuple(legs_won)
+    remaining_before = START_SCORE - leg_totals[player]
+    new_match, outcome = apply_visit(current_match_state(), value, finished_on_double)
+
+    scores[player].append(outcome.recorded)
+    leg_totals[player] += outcome.recorded
+    history.append((player, outcome.recorded))
+    visit_times.append(round(time.monotonic() - match_started_at, 1))
+    record_visit_stats(player, remaining_before, outcome, darts)
+    undo_stack.append(("visit", value, finished_on_double, darts, player, previous_legs_won,
+                       outcome.leg_won and not outcome.match_won, outcome.match_won))
+    current_input = ""
+    visit_darts.clear()
+    legs_won = list(new_match.legs_won)
 
-    # Double Out rule — cannot leave 1
-    if DOUBLE_OUT_ENABLED and remaining_after == 1:
-        scores[active_player].append(0)   # bust recorded as 0
-        history.append((active_player, 0))
-        current_input = ""
-        active_player = 1 - active_player
+    if outcome.match_won:
+        winner_idx = new_match.winner
+        state = STATE_END
         return
 
-    # Bust: over-scoring
-    if value > remaining_before:
-        scores[active_player].append(0)
-        history.append((active_player, 0))
-        current_input = ""
-        active_player = 1 - active_player
+    if outcome.leg_won:
+        # Start a new leg (alternate starter)
+        start_new_leg()
         return
 
-    # Valid throw (<= remaining, and not leaving 1 under double-out)
-    scores[active_player].append(value)
-    history.append((active_player, value))
+    # Otherwise continue, switch to other player
+    active_player = new_match.active
+
+def swap_starter():
+    """Pass the first throw of the match to the next player (before any input)."""
+    global active_player, leg_starter_idx
+    undo_stack.append(("starter", active_player))
+    active_player = (active_player + 1) % len(player_names)
+    leg_starter_idx = active_player
+
+def undo_action() -> bool:
+    """Take back the most recent action (visit, leg win, match win or starter swap) in O(players)."""
+    global active_player, leg_starter_idx, legs_won, winner_idx, state, current_input
+    if not undo_stack:
+        return False
+    action = undo_stack.pop()
+    redo_stack.append(action)
+    if action[0] == "starter":
+        active_player = leg_starter_idx = action[1]
+        return True
+
+    _, _, _, _, player, previous_legs_won, new_leg_started, match_won = action
+    if match_won:
+        winner_idx = None
+        state = STATE_GAME
+    elif new_leg_started:
+        reopen_finished_leg()
+    history.pop()
+    visit_times.pop()
+    leg_totals[player] -= scores[player].pop()
+    undo_visit_stats()
+    legs_won = list(previous_legs_won)
+    active_player = player
     current_input = ""
+    visit_darts.clear()
+    return True
 
-    if value == remaining_before:
-        # Leg won
-        legs_won[active_player] += 1
-
-        # Match finished?
-        if legs_won[active_player] >= LEGS_TO_WIN:
-            winner_idx = active_player
-            state = STATE_END
-            return
-
-        # Save snapshot of finished leg BEFORE starting new leg
-        finished_legs_stack.append({
-            'scores': copy.deepcopy(scores),
-            'history': history[:],
-            'active_player': active_player,
-            'leg_starter_idx': leg_starter_idx,
-            'winner': active_player
-        })
+def redo_action() -> bool:
+    """Replay the most recently undone action."""
+    global active_player, leg_starter_idx
+    if not redo_stack:
+        return False
+    action = redo_stack.pop()
+    if action[0] == "starter":
+        undo_stack.append(action)
+        active_player = leg_starter_idx = (action[1] + 1) % len(player_names)
+        return True
+    _, value, finished_on_double, darts = action[:4]
+    do_visit(value, finished_on_double, darts)
+    return True
 
-        # Start a new leg (alternate starter)
-        start_new_leg()
+def handle_board_dart(dart):
+    """
+    One dart from the board: shown as the running visit total, committed after
+    the third dart, on a checkout or bust, or when the takeout button (None)
+    ends the visit early.
+    """
+    global current_input
+    if dart is None:
+        if visit_darts:
+            commit_throw()
         return
-
-    # Otherwise continue, switch to other player
-    active_player = 1 - active_player
-
-def undo_last_score():
-    """Remove the most recent recorded score and restore turn to that player. Returns (player,score) or (None,None)."""
-    global history, scores, active_player
-    if not history:
-        return (None, None)
-    last_player, last_score = history.pop()
-    if scores[last_player] and scores[last_player][-1] == last_score:
-        scores[last_player].pop()
-    else:
-        try:
-            idx = len(scores[last_player]) - 1 - scores[last_player][::-1].index(last_score)
-            scores[last_player].pop(idx)
-        except ValueError:
-            pass
-    active_player = last_player
-    return (last_player, last_score)
+    visit_darts.append(dart)
+    total = sum(segment * multiplier for segment, multiplier in visit_darts)
+    current_input = str(total)
+    left = START_SCORE - leg_totals[active_player] - total
+    if left == 0:
+        commit_throw(finished_on_double=dart[1] == 2)
+    elif left < 0 or (DOUBLE_OUT_ENABLED and left == 1) or len(visit_darts) == 3:
+        commit_throw()
 
 def handle_game_keydown(event):
-    global current_input, state, menu_values, active_player, leg_starter_idx
+    global current_input, state, menu_values
+    global latency_overlay_visible, memory_overlay_visible, stats_panel_visible
 
     if event.key == pygame.K_m:
-        menu_values["p1"] = player_names[0]
-        menu_values["p2"] = player_names[1]
-        menu_values["score"] = str(START_SCORE) if START_SCORE in (301, 501) else "301"
-        menu_values["legs"] = str(LEGS_TO_WIN)
-        menu_values["doubleout"] = DOUBLE_OUT_ENABLED
-        menu_values["showsponsors"] = sponsor_bar_enabled
+        menu_values_from_match()
         menu_values["fullscreen"] = current_fullscreen
         state = STATE_MENU
         return
@@ -1265,13 +2616,47 @@ def handle_game_keydown(event):
     if event.key == pygame.K_ESCAPE:
         pygame.quit(); sys.exit()
 
+    # F1: statistics panel
+    if event.key == pygame.K_F1:
+        stats_panel_visible = not stats_panel_visible
+        return
+    # F3: latency overlay, F4: export the latency histogram
+    if event.key == pygame.K_F3:
+        latency_overlay_visible = not latency_overlay_visible
+        return
+    if event.key == pygame.K_F4:
+        export_latency_report()
+        return
+    # F9: memory usage overlay
+    if event.key == pygame.K_F9:
+        memory_overlay_visible = not memory_overlay_visible
+        return
+
     # Choose starter ONLY for the very first leg, before any input/throws
     if event.key == pygame.K_TAB:
         if current_leg_number() == 1 and is_leg_pristine():
-            active_player = 1 - active_player
-            leg_starter_idx = active_player
+            redo_stack.clear()
+            swap_starter()
         return
 
+    # Ctrl+Y: redo (only with nothing typed, the redone visit would replace it)
+    if event.key == pygame.K_y and event.mod & pygame.KMOD_CTRL:
+        if current_input == "" and not visit_darts:
+            redo_action()
+        return
+    if event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL:
+        event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, mod=0, unicode="\b")
+
+    # Backspace takes back a misread board dart; typing replaces the board's darts
+    if visit_darts:
+        if event.key == pygame.K_BACKSPACE:
+            visit_darts.pop()
+            current_input = str(sum(segment * multiplier for segment, multiplier in visit_darts)) if visit_darts else ""
+            return
+        if pygame.K_0 <= event.key <= pygame.K_9:
+            visit_darts.clear()
+            current_input = ""
+
     if pygame.K_0 <= event.key <= pygame.K_9:
         digit = event.key - pygame.K_0
         if len(current_input) < 3:
@@ -1292,115 +2677,3126 @@ def handle_game_keydown(event):
         if current_input != "":
             current_input = current_input[:-1]
         else:
-            # If we're at the very start of a new leg, allow cross-leg undo
-            if is_leg_pristine() and finished_legs_stack:
-                revert_last_finished_leg()
-            else:
-                undo_last_score()
+            # Undo the last action, across leg boundaries as well
+            undo_action()
 
 # region END SCREEN
 
 def draw_end():
-    screen.fill(BG_COLOUR)
-
-    title = "Match Over"
+    with frame_lock:
+        screen.fill(BG_COLOUR)
+        # Informational: remaining scores in the finishing leg snapshot
+        draw_end_result(screen, layout["end"], player_names, winner_idx, legs_won,
+                        [START_SCORE - total for total in leg_totals])
+        present_frame()
+
+def draw_end_result(surface, end_layout, names, winner, won, remaining):
+    """Title, winner, players, legs won and remaining scores (END screen and match reports)."""
+    title = "Match Over" if winner is not None else "Match unfinished"   # imported sheets can stop early
     t_surf = font_title.render(title, True, TEXT_COLOUR)
-    t_rect = t_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 200))
-    screen.blit(t_surf, t_rect)
+    surface.blit(t_surf, t_surf.get_rect(center=end_layout["title_center"]))
 
-    if winner_idx is not None:
-        win_text = f"Winner: {player_names[winner_idx]}"
+    if winner is not None:
+        win_text = f"Winner: {names[winner]}"
         win_surf = font_huge.render(win_text, True, ACCENT_ACTIVE)
-        win_rect = win_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 80))
-        screen.blit(win_surf, win_rect)
+        surface.blit(win_surf, win_surf.get_rect(center=end_layout["winner_center"]))
 
-    player_line = f"{player_names[0]} vs. {player_names[1]}"
+    player_line = " vs. ".join(names)
     player_surf = font_med.render(player_line, True, TEXT_COLOUR)
-    player_rect = player_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 10))
-    screen.blit(player_surf, player_rect)
+    surface.blit(player_surf, player_surf.get_rect(center=end_layout["players_center"]))
 
-    legs_line = f"Legs won:  {legs_won[0]}   |   {legs_won[1]}"
+    legs_line = "Legs won:  " + "   |   ".join(str(w) for w in won)
     legs_surf = font_small.render(legs_line, True, HINT_COLOUR)
-    legs_rect = legs_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 60))
-    screen.blit(legs_surf, legs_rect)
+    surface.blit(legs_surf, legs_surf.get_rect(center=end_layout["legs_center"]))
 
-    # Informational: remaining scores in the finishing leg snapshot
-    rem0 = START_SCORE - sum(scores[0])
-    rem1 = START_SCORE - sum(scores[1])
-    rem_line = f"Remaining:  {rem0}    |    {rem1}"
+    rem_line = "Remaining:  " + "    |    ".join(str(r) for r in remaining)
     rem_surf = font_small.render(rem_line, True, HINT_COLOUR)
-    rem_rect = rem_surf.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 100))
-    screen.blit(rem_surf, rem_rect)
-
-    pygame.display.flip()
+    surface.blit(rem_surf, rem_surf.get_rect(center=end_layout["rem_center"]))
 
 def handle_end_event(event):
-    global state, winner_idx, current_input, menu_values, legs_won
+    global state, menu_values
     if event.type == pygame.KEYDOWN:
         if event.key == pygame.K_ESCAPE:
+            archive_finished_match()
             pygame.quit(); sys.exit()
         if event.key == pygame.K_m:
-            menu_values["p1"] = player_names[0]
-            menu_values["p2"] = player_names[1]
-            menu_values["score"] = str(START_SCORE) if START_SCORE in (301, 501) else "301"
-            menu_values["legs"] = str(LEGS_TO_WIN)
-            menu_values["doubleout"] = DOUBLE_OUT_ENABLED
-            menu_values["showsponsors"] = sponsor_bar_enabled
+            archive_finished_match()
+            menu_values_from_match()
             state = STATE_MENU
             return
-        if event.key == pygame.K_BACKSPACE:
+        if event.key == pygame.K_BACKSPACE or (event.key == pygame.K_z and event.mod & pygame.KMOD_CTRL):
             # Undo the winning throw and resume the final leg
-            last_player, _ = undo_last_score()
-            if last_player is not None:
-                legs_won[last_player] = max(0, legs_won[last_player] - 1)
-            winner_idx = None
-            current_input = ""
-            state = STATE_GAME
+            undo_action()
             return
         if event.key in (pygame.K_RETURN, pygame.K_KP_ENTER):
-            reset_game(START_SCORE, player_names[0], player_names[1], LEGS_TO_WIN, DOUBLE_OUT_ENABLED, sponsor_bar_enabled)
+            archive_finished_match()
+            if tournament is not None:
+                # The next pairing is waiting in the menu instead of a rematch
+                state = STATE_MENU
+                return
+            reset_game(START_SCORE, player_names, LEGS_TO_WIN, DOUBLE_OUT_ENABLED, sponsor_bar_enabled)
+            return
+
+# region MATCH ARCHIVE
+
+def data_path(*parts) -> str:
+    """Writable location next to the script or the .exe (not the PyInstaller temp dir)."""
+    if getattr(sys, "frozen", False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, *parts)
+
+MATCH_ARCHIVE_PATH = data_path("archive", "matches.jsonl")
+match_archived = False     # the finished match on the END screen is already archived
+archived_match_count = 0   # matches moved out of memory into the archive this session
+
+def append_to_archive(records, path: str = None):
+    """Append match records to the archive, one JSON object per line."""
+    path = path or MATCH_ARCHIVE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as handle:
+        handle.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+def read_archive(path: str = None):
+    """Yield every match record in the archive (skipping unreadable lines)."""
+    path = path or MATCH_ARCHIVE_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    print("Skipping corrupt archive line")
+    except FileNotFoundError:
+        return
+
+def _match_record(players, start_score, legs_to_win, double_out, legs, won, winner, source):
+    totals = [0] * len(players)
+    counts = [0] * len(players)
+    for leg in legs:
+        for player, score in leg["visits"]:
+            totals[player] += score
+            counts[player] += 1
+    return {
+        "source": source,
+        "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "players": list(players),
+        "start_score": start_score,
+        "legs_to_win": legs_to_win,
+        "double_out": double_out,
+        "legs": legs,
+        "legs_won": list(won),
+        "winner": winner,
+        "averages": [round(totals[p] / counts[p], 2) if counts[p] else 0.0 for p in range(len(players))],
+    }
+
+def archive_finished_match():
+    """Write the match shown on the END screen to the archive (once)."""
+    global match_archived
+    if match_archived or winner_idx is None:
+        return
+    legs = [
+        {"starter": snap["leg_starter_idx"], "winner": snap["winner"], "visits": [list(v) for v in snap["history"]]}
+        for snap in finished_legs_stack
+    ]
+    legs.append({"starter": leg_starter_idx, "winner": winner_idx, "visits": [list(v) for v in history]})
+    start = 0
+    for leg in legs:
+        # Seconds since the match was set up, one per visit; the scheduler learns match lengths from them
+        leg["times"] = visit_times[start:start + len(leg["visits"])]
+        start += len(leg["visits"])
+    record = _match_record(
+        player_names, START_SCORE, LEGS_TO_WIN, DOUBLE_OUT_ENABLED, legs, legs_won, winner_idx, "live"
+    )
+    try:
+        append_to_archive([record])
+        match_archived = True
+    except OSError as exc:
+        print("Could not archive match:", exc)
+        return
+    record_match_rating(record)
+    record_tournament_result(record)
+    release_archived_match()
+
+def release_archived_match():
+    """
+    Drop the in-memory legs of a match that is safely in the archive. The end
+    screen is being left at this point, so nothing draws them again.
+    """
+    global archived_match_count
+    finished_legs_stack.clear()
+    history.clear()
+    visit_times.clear()
+    undo_stack.clear()
+    redo_stack.clear()
+    stats_journal.clear()
+    for player_scores in scores:
+        del player_scores[:]
+    recount_totals()
+    archived_match_count += 1
+
+# region SCORESHEET IMPORT
+#
+# Paper scoresheets are re-entered as JSON or CSV and replayed through the same
+# bust / Double Out / leg-win rules as commit_throw (apply_visit).
+#
+# JSON: a match object, a list of them, or {"matches": [...]}:
+#   {"players": ["A", "B"], "start_score": 501, "legs_to_win": 3, "double_out": true,
+#    "legs": [{"starter": 0, "visits": [[60, 45, ...], [100, 26, ...]]}, ...],
+#    "winner": 0, "legs_won": [3, 1]}          # winner / legs_won optional, checked if given
+#   "visits" holds one column per player, as written on the sheet.
+#
+# CSV: one row per visit, rows in the order they were thrown:
+#   match,player1,player2,...,start_score,legs_to_win,double_out,leg,player,score
+#   (player1 .. player8 as needed, left empty past a match's last player;
+#   "player" is the 1-based column; the first row of a leg gives its starter)
+
+# Visit totals no three darts can make
+IMPOSSIBLE_VISITS = frozenset((163, 166, 169, 172, 173, 175, 176, 178, 179))
+
+def _parse_bool(value, default: bool = True) -> bool:
+    """Sheet flag; a blank cell (or null) counts as not given."""
+    if isinstance(value, bool):
+        return value
+    if value is None or not str(value).strip():
+        return default
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on")
+
+def _read_json_matches(path: str):
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    if isinstance(data, dict):
+        data = data.get("matches", [data])
+    return data
+
+def _read_csv_matches(path: str):
+    matches = {}
+    with open(path, "r", encoding="utf-8-sig", newline="") as handle:
+        for line_no, row in enumerate(csv.DictReader(handle), start=2):
+            match_id = row["match"]
+            match = matches.get(match_id)
+            if match is None:
+                names = [row.get(f"player{n}") for n in range(1, MAX_PLAYERS + 1)]
+                names = [name for name in names if name and name.strip()]
+                match = matches[match_id] = {
+                    "id": match_id,
+                    "players": names,
+                    "start_score": int(row["start_score"]),
+                    "legs_to_win": int(row["legs_to_win"]),
+                    "double_out": _parse_bool(row.get("double_out", True)),
+                    "legs": [],
+                    "_leg_ids": {},
+                }
+            leg_id = row["leg"]
+            player = int(row["player"]) - 1
+            if not 0 <= player < len(match["players"]):
+                raise ValueError(f"line {line_no}: player {row['player']} is not one of the "
+                                 f"{len(match['players'])} players of match {match_id}")
+            leg_index = match["_leg_ids"].get(leg_id)
+            if leg_index is None:
+                leg_index = match["_leg_ids"][leg_id] = len(match["legs"])
+                match["legs"].append({"starter": player, "visits": [[] for _ in match["players"]]})
+            match["legs"][leg_index]["visits"][player].append(int(row["score"]))
+    for match in matches.values():
+        del match["_leg_ids"]
+    return list(matches.values())
+
+def read_scoresheets(path: str):
+    if path.lower().endswith(".csv"):
+        return _read_csv_matches(path)
+    return _read_json_matches(path)
+
+def replay_scoresheet(match: dict, source: str = "import"):
+    """
+    Replay one scoresheet through the match rules.
+    Returns (archive record, list of inconsistencies found).
+    """
+    issues = []
+    players = [str(name) for name in match["players"]]
+    if not MIN_PLAYERS <= len(players) <= MAX_PLAYERS:
+        raise ValueError(f"{len(players)} players, the scoreboard plays {MIN_PLAYERS}-{MAX_PLAYERS}")
+    start_score = int(match.get("start_score", 301))
+    legs_to_win = max(1, int(match.get("legs_to_win", 2)))
+    double_out = _parse_bool(match.get("double_out", True))
+
+    rules = new_match_state(start_score, legs_to_win, double_out, len(players))
+    legs = []
+    starter = int(match.get("first_starter", 0))
+
+    for leg_no, leg in enumerate(match.get("legs", []), start=1):
+        if rules.winner is not None:
+            issues.append(f"leg {leg_no}: played after the match was already won")
+            break
+        starter = int(leg.get("starter", starter))
+        rules = start_leg(rules, starter)
+        columns = [list(col) for col in leg["visits"]]
+        positions = [0] * len(players)
+        visits = []
+        leg_winner = None
+
+        while positions[rules.active] < len(columns[rules.active]):
+            player = rules.active
+            value = int(columns[player][positions[player]])
+            positions[player] += 1
+            round_no = positions[player]
+
+            if value < 0 or value > MAX_VISIT:
+                issues.append(f"leg {leg_no}, {players[player]} visit {round_no}: {value} is not a valid visit")
+            elif value in IMPOSSIBLE_VISITS:
+                issues.append(f"leg {leg_no}, {players[player]} visit {round_no}: {value} cannot be scored with three darts")
+
+            rules, outcome = apply_visit(rules, value)
+            if outcome.kind == VISIT_BUST and value != 0:
+                issues.append(f"leg {leg_no}, {players[player]} visit {round_no}: {value} is a bust, recorded as 0")
+            visits.append([player, outcome.recorded])
+
+            if outcome.leg_won:
+                leg_winner = player
+                break
+
+        leftover = sum(len(col) - pos for col, pos in zip(columns, positions))
+        if leg_winner is None:
+            left = " / ".join(str(r) for r in rules.remaining)
+            issues.append(f"leg {leg_no}: ends without a checkout (remaining {left})")
+            if leftover:
+                issues.append(f"leg {leg_no}: {leftover} visit(s) not replayed, "
+                              f"{players[rules.active]} has no visit to throw before them")
+        elif leftover:
+            issues.append(f"leg {leg_no}: {leftover} visit(s) written after the checkout")
+
+        legs.append({"starter": starter, "winner": leg_winner, "visits": visits})
+        starter = (starter + 1) % len(players)
+
+    won = list(rules.legs_won)
+    winner = rules.winner
+    if winner is None:
+        issues.append(f"match unfinished: legs {'-'.join(map(str, won))}, {legs_to_win} needed")
+    if "winner" in match and match["winner"] is not None and int(match["winner"]) != winner:
+        issues.append(f"sheet names winner {match['winner']}, rules give {winner}")
+    if "legs_won" in match and [int(x) for x in match["legs_won"]] != won:
+        issues.append(f"sheet says legs {match['legs_won']}, rules give {won}")
+
+    record = _match_record(players, start_score, legs_to_win, double_out, legs, won, winner, source)
+    if issues:
+        record["issues"] = issues
+    return record, issues
+
+def import_scoresheets(paths, archive_path: str = None, dry_run: bool = False):
+    """Batch-import scoresheet files into the archive. Returns the number of matches with issues."""
+    started = time.perf_counter()
+    records = []
+    flagged = 0
+    for path in paths:
+        try:
+            matches = read_scoresheets(path)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"{path}: could not read scoresheets:", exc)
+            flagged += 1
+            continue
+        for number, match in enumerate(matches, start=1):
+            label = f"{os.path.basename(path)}#{match.get('id', number)}"
+            try:
+                record, issues = replay_scoresheet(match, source=f"import:{label}")
+            except (KeyError, IndexError, TypeError, ValueError) as exc:
+                print(f"{label}: malformed scoresheet:", exc)
+                flagged += 1
+                continue
+            if issues:
+                flagged += 1
+                print(f"{label}:")
+                for issue in issues:
+                    print("   ", issue)
+            records.append(record)
+
+    replayed_at = time.perf_counter()
+    if records and not dry_run:
+        append_to_archive(records, archive_path)
+    elapsed = max(replayed_at - started, 1e-9)
+    print(
+        f"Imported {len(records)} match(es), {flagged} with issues, "
+        f"{len(records) / elapsed:.0f} matches/s"
+        + (" (dry run, archive untouched)" if dry_run else f" -> {archive_path or MATCH_ARCHIVE_PATH}")
+    )
+    return flagged
+
+# region MATCH REPORTS
+#
+# One page per archived match: the END-screen result on top, then every leg as
+# the game screen's rounds tables side by side. Pages are drawn off-screen at
+# the reference resolution with the game's layout and fonts (no window, so
+# workers only need pygame.font) in a spawn process pool, one match per job.
+# A page lays itself out from the record alone; it never touches the screen's
+# size, players or layout.
+# Nothing on a page depends on the clock, the machine or the worker, so the
+# same archive always gives the same files.
+
+REPORT_FORMATS = ("png", "pdf")
+REPORT_RESULT_HEIGHT = 600          # reference px for the END-screen block
+REPORT_LEG_TITLE_HEIGHT = 110
+REPORT_LEG_GAP = 40
+REPORT_PDF_PAGE_WIDTH = 595.0       # points (A4 width); the height follows the page
+
+def report_file_stem(index: int, record) -> str:
+    names = "-v-".join(re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-") or "player" for name in record["players"])
+    return f"{index:03d}_{names[:80]}"
+
+def _init_report_worker(dark: bool):
+    """Fonts (at the reference scale) and palette for drawing reports; runs once in every worker."""
+    global UI_SCALE
+    pygame.font.init()
+    with frame_lock:
+        UI_SCALE = 1.0
+        _build_fonts(UI_SCALE)
+    _apply_palette(PALETTE_DARK if dark else PALETTE_LIGHT)
+
+def draw_match_report(record) -> pygame.Surface:
+    """The report page of one archived match; fonts come from _init_report_worker."""
+    names = record["players"]
+    start_score = record["start_score"]
+    legs = record["legs"]
+    # The game's columns as drawn at 1920x1080
+    width = LAYOUT_BASE_WIDTH
+    end_layout = _compute_end_layout(width, REPORT_RESULT_HEIGHT)
+    game_layout = _compute_game_layout(width, LAYOUT_BASE_HEIGHT, len(names))
+    sections = game_layout["players"]
+    table_gap = sections[0]["rows_y"] - sections[0]["header_y"]
+    line_height = sections[0]["line_height"]
+
+    per_leg = []
+    for leg in legs:
+        leg_scores = [[] for _ in names]
+        for player, score in leg["visits"]:
+            leg_scores[player].append(score)
+        per_leg.append(leg_scores)
+    block_heights = [_px(REPORT_LEG_TITLE_HEIGHT) + table_gap + max(map(len, leg_scores)) * line_height
+                     + _px(REPORT_LEG_GAP) for leg_scores in per_leg]
+
+    surface = pygame.Surface((width, REPORT_RESULT_HEIGHT + sum(block_heights)))
+    surface.fill(BG_COLOUR)
+    last_leg = per_leg[-1] if per_leg else [[] for _ in names]
+    draw_end_result(surface, end_layout, names, record.get("winner"), record["legs_won"],
+                    [start_score - sum(scores) for scores in last_leg])
+    avg_line = "Match avg:  " + "    |    ".join(f"{average:.1f}" for average in record["averages"])
+    avg_surf = font_small.render(avg_line, True, HINT_COLOUR)
+    rem_x, rem_y = end_layout["rem_center"]
+    surface.blit(avg_surf, avg_surf.get_rect(center=(rem_x, rem_y + _px(45))))
+
+    y = REPORT_RESULT_HEIGHT
+    for number, (leg, leg_scores, block_h) in enumerate(zip(legs, per_leg, block_heights), start=1):
+        pygame.draw.line(surface, DIVIDER_COLOUR, (0, y), (width, y), game_layout["divider_w"])
+        # Imported sheets can hold a leg that ends without a checkout
+        outcome = "unfinished" if leg["winner"] is None else f"won by {names[leg['winner']]}"
+        title = f"Leg {number}  -  {outcome}, {names[leg['starter']]} to throw first"
+        title_surf = font_med.render(title, True, TEXT_COLOUR)
+        surface.blit(title_surf, (_px(40), y + _px(14)))
+        header_y = y + _px(REPORT_LEG_TITLE_HEIGHT)
+        for player, (section, scores) in enumerate(zip(sections, leg_scores)):
+            average = sum(scores) / len(scores) if scores else 0.0
+            colour = ACCENT_ACTIVE if player == leg["winner"] else TEXT_COLOUR
+            name_surf = font_small.render(f"{names[player]}  (avg {average:.1f})", True, colour)
+            surface.blit(name_surf, (section["col_round_x"], header_y - _px(40)))
+            table = {**section, "header_y": header_y, "rows_y": header_y + table_gap}
+            draw_rounds_table(surface, table, scores, 1, start_score - sum(scores))
+        for x in game_layout["divider_xs"]:
+            pygame.draw.line(surface, DIVIDER_COLOUR, (x, header_y - _px(50)), (x, y + block_h - _px(20)),
+                             game_layout["divider_w"])
+        y += block_h
+    return surface
+
+def write_image_pdf(path: str, surface: pygame.Surface, page_width: float = REPORT_PDF_PAGE_WIDTH):
+    """A one-page PDF holding the surface as a Flate-compressed RGB image (no dates, so byte-stable)."""
+    width, height = surface.get_size()
+    page_height = page_width * height / width
+    image = zlib.compress(pygame.image.tobytes(surface, "RGB"), 9)
+    content = f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q".encode("ascii")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width:.2f} {page_height:.2f}] "
+         f"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>").encode("ascii"),
+        (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} /ColorSpace /DeviceRGB "
+         f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(image)} >>\nstream\n").encode("ascii")
+        + image + b"\nendstream",
+        f"<< /Length {len(content)} >>\nstream\n".encode("ascii") + content + b"\nendstream",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    out += b"".join(f"{offset:010d} 00000 n \n".encode("ascii") for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    with open(path, "wb") as handle:
+        handle.write(out)
+
+def render_match_report(job):
+    """Worker job: (record, output path without extension, formats) -> written paths."""
+    record, stem, formats = job
+    surface = draw_match_report(record)
+    written = []
+    if "png" in formats:
+        pygame.image.save(surface, stem + ".png")
+        written.append(stem + ".png")
+    if "pdf" in formats:
+        write_image_pdf(stem + ".pdf", surface)
+        written.append(stem + ".pdf")
+    return written
+
+def render_match_reports(records, out_dir: str, formats=("png",), workers: int = None, dark: bool = False):
+    """Render a report for each record into out_dir across worker processes; returns the files written."""
+    global UI_SCALE
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(record, os.path.join(out_dir, report_file_stem(index, record)), tuple(formats))
+            for index, record in enumerate(records, start=1)]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        # In this process: the screen gets its own palette, scale and fonts back afterwards
+        with frame_lock:
+            saved_scale = UI_SCALE
+            _init_report_worker(dark)
+            try:
+                return [path for job in jobs for path in render_match_report(job)]
+            finally:
+                _apply_palette(PALETTE_DARK if current_dark_mode else PALETTE_LIGHT)
+                UI_SCALE = saved_scale
+                if layout:
+                    compute_layout()
+    # The workers re-import this module; keep pygame's banner out of the console
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_report_worker, initargs=(dark,)) as pool:
+        return [path for paths in pool.map(render_match_report, jobs) for path in paths]
+
+def export_match_reports(out_dir: str, day: str, formats, workers: int, dark: bool) -> int:
+    """Reports for the archived matches finished on day (YYYY-MM-DD, or "all")."""
+    records = [record for record in read_archive()
+               if day == "all" or record.get("finished_at", "").startswith(day)]
+    if not records:
+        print(f"No archived matches for {day}")
+        return 0
+    started = time.perf_counter()
+    written = render_match_reports(records, out_dir, formats, workers, dark)
+    print(f"Wrote {len(written)} files for {len(records)} matches to {out_dir} "
+          f"in {time.perf_counter() - started:.1f} s")
+    return len(records)
+
+# region TOURNAMENT
+#
+# Knockout, round-robin groups and double elimination over a seeded field.
+# The whole bracket is built up front; recording a result moves the winner
+# (and, in double elimination, the loser) into the slots the match feeds and
+# adds to both players' standing rows, so a result costs O(1) plus a heap push
+# for each match it makes ready, however big the field, and moves the two
+# players within their group's ranking, which is kept sorted (a bisect and a
+# list shift each, no re-sort). Byes resolve
+# themselves as soon as their match is filled. The tournament file holds the
+# setup and the results only; loading replays them through the same path.
+
+TOURNAMENT_FORMATS = ("knockout", "roundrobin", "double")
+BYE = -1
+
+class TournamentMatch:
+    __slots__ = ("id", "stage", "round", "order", "slots", "winner_to", "loser_to", "result")
+
+    def __init__(self, match_id: int, stage: str, round_no: int, order: int):
+        self.id = match_id
+        self.stage = stage          # "group A", "winners", "losers", "final"
+        self.round = round_no       # round within the stage, from 1
+        self.order = order          # above the order of every match that feeds it
+        self.slots = [None, None]   # player index, BYE, or None while undecided
+        self.winner_to = None       # (match id, slot)
+        self.loser_to = None
+        self.result = None          # (winner slot, legs, points, visits)
+
+def knockout_seed_order(size: int):
+    """Seed positions for a bracket of size (a power of two): 1 v 16, 8 v 9, ..."""
+    order = [0]
+    while len(order) < size:
+        n = 2 * len(order)
+        order = [seed for s in order for seed in (s, n - 1 - s)]
+    return order
+
+class Tournament:
+    def __init__(self, fmt: str, players, legs_to_win: int = 2, groups: int = 1):
+        if fmt not in TOURNAMENT_FORMATS:
+            raise ValueError(f"unknown tournament format {fmt!r}")
+        if len(players) < 2:
+            raise ValueError("a tournament needs at least two players")
+        self.format = fmt
+        self.players = list(players)
+        self.legs_to_win = max(1, legs_to_win)
+        self.groups = max(1, min(groups, len(players) // 2)) if fmt == "roundrobin" else 1
+        self.matches = []
+        self.ready = []             # heap of (order, match id); played matches are skipped lazily
+        self.results = []           # in the order they were recorded, for saving
+        self.group_of = [0] * len(players)
+        self.rows = [{"played": 0, "won": 0, "lost": 0, "legs_for": 0, "legs_against": 0, "points": 0, "visits": 0}
+                     for _ in players]
+        self.champion = None
+        if fmt == "roundrobin":
+            self._build_groups()
+        else:
+            self._build_bracket(double=fmt == "double")
+        # Per group: rank keys of its players in standings order
+        self.ranking = [[] for _ in range(self.groups)]
+        for p in range(len(self.players)):
+            self.ranking[self.group_of[p]].append(self._rank_key(p))
+        for keys in self.ranking:
+            keys.sort()
+
+    # ---- structure
+
+    def _new_match(self, stage, round_no, order):
+        match = TournamentMatch(len(self.matches), stage, round_no, order)
+        self.matches.append(match)
+        return match
+
+    def _build_groups(self):
+        members = [[] for _ in range(self.groups)]
+        for seed in range(len(self.players)):
+            row, pos = divmod(seed, self.groups)
+            group = pos if row % 2 == 0 else self.groups - 1 - pos   # snake seeding
+            self.group_of[seed] = group
+            members[group].append(seed)
+        for group, players in enumerate(members):
+            stage = f"group {chr(ord('A') + group)}" if self.groups > 1 else "league"
+            circle = players + ([BYE] if len(players) % 2 else [])
+            half = len(circle) // 2
+            # Circle method: everyone meets everyone once, one match per player per round
+            for round_no in range(1, len(circle)):
+                for a, b in zip(circle[:half], reversed(circle[half:])):
+                    if BYE not in (a, b):
+                        match = self._new_match(stage, round_no, round_no)
+                        self._fill(match.id, 0, a)
+                        self._fill(match.id, 1, b)
+                circle = [circle[0], circle[-1]] + circle[1:-1]
+
+    def _build_bracket(self, double: bool):
+        size = 1
+        while size < len(self.players):
+            size *= 2
+        rounds = size.bit_length() - 1
+        winners = [[self._new_match("winners", r, 2 * r - 1) for _ in range(size >> r)] for r in range(1, rounds + 1)]
+        for r in range(rounds - 1):
+            for i, match in enumerate(winners[r]):
+                match.winner_to = (winners[r + 1][i // 2].id, i % 2)
+        final = winners[-1][0]
+
+        if double:
+            grand_final = self._new_match("final", 1, 2 * rounds + 1)
+            final.winner_to = (grand_final.id, 0)
+            if rounds == 1:
+                final.loser_to = (grand_final.id, 1)
+            else:
+                self._build_losers_bracket(winners, rounds, grand_final)
+            final = grand_final
+
+        order = knockout_seed_order(size)
+        for i, match in enumerate(winners[0]):
+            for slot in (0, 1):
+                seed = order[2 * i + slot]
+                self._fill(match.id, slot, seed if seed < len(self.players) else BYE)
+        self.final_id = final.id
+
+    def _build_losers_bracket(self, winners, rounds: int, grand_final):
+        size = len(winners[0]) * 2
+        previous = []
+        for i in range(size // 4):
+            match = self._new_match("losers", 1, 2)
+            winners[0][2 * i].loser_to = (match.id, 0)
+            winners[0][2 * i + 1].loser_to = (match.id, 1)
+            previous.append(match)
+        losers_round = 1
+        for j in range(1, rounds):
+            # Survivors meet the players just knocked out of winners round j+1 (in reverse, against rematches)
+            losers_round += 1
+            dropped = winners[j]
+            current = []
+            for i, survivor in enumerate(previous):
+                match = self._new_match("losers", losers_round, 2 * j + 2)
+                survivor.winner_to = (match.id, 0)
+                dropped[len(dropped) - 1 - i].loser_to = (match.id, 1)
+                current.append(match)
+            previous = current
+            if j < rounds - 1:
+                losers_round += 1
+                current = []
+                for i in range(len(previous) // 2):
+                    match = self._new_match("losers", losers_round, 2 * j + 3)
+                    previous[2 * i].winner_to = (match.id, 0)
+                    previous[2 * i + 1].winner_to = (match.id, 1)
+                    current.append(match)
+                previous = current
+        previous[0].winner_to = (grand_final.id, 1)
+
+    # ---- results
+
+    def _fill(self, match_id: int, slot: int, player: int):
+        match = self.matches[match_id]
+        match.slots[slot] = player
+        if None in match.slots:
             return
+        if BYE in match.slots:
+            a, b = match.slots
+            winner = b if a == BYE else a
+            match.result = (match.slots.index(winner), None, None, None)
+            self._advance(match, winner, BYE)
+        else:
+            heapq.heappush(self.ready, (match.order, match.id))
+
+    def _advance(self, match, winner: int, loser: int):
+        if match.winner_to is not None:
+            self._fill(*match.winner_to, winner)
+        elif match.stage != "league" and not match.stage.startswith("group"):
+            self.champion = winner
+        if match.loser_to is not None:
+            self._fill(*match.loser_to, loser)
+
+    def record(self, match_id: int, winner_slot: int, legs, points, visits):
+        """
+        Result of a played match: legs won, points scored and visits thrown per
+        slot. Updates both standing rows and the bracket in O(1).
+        """
+        match = self.matches[match_id]
+        if match.result is not None or None in match.slots or BYE in match.slots:
+            raise ValueError(f"match {match_id} cannot take a result")
+        match.result = (winner_slot, tuple(legs), tuple(points), tuple(visits))
+        for slot, player in enumerate(match.slots):
+            keys = self.ranking[self.group_of[player]]
+            del keys[bisect.bisect_left(keys, self._rank_key(player))]
+            row = self.rows[player]
+            row["played"] += 1
+            row["won" if slot == winner_slot else "lost"] += 1
+            row["legs_for"] += legs[slot]
+            row["legs_against"] += legs[1 - slot]
+            row["points"] += points[slot]
+            row["visits"] += visits[slot]
+            bisect.insort(keys, self._rank_key(player))
+        self.results.append([match_id, winner_slot, list(legs), list(points), list(visits)])
+        self._advance(match, match.slots[winner_slot], match.slots[1 - winner_slot])
+
+    def next_match(self) -> Optional[TournamentMatch]:
+        """The earliest match whose players are known and which has no result yet."""
+        while self.ready and self.matches[self.ready[0][1]].result is not None:
+            heapq.heappop(self.ready)
+        return self.matches[self.ready[0][1]] if self.ready else None
+
+    def ready_matches(self):
+        """All playable matches, earliest first."""
+        return [self.matches[match_id] for _, match_id in sorted(self.ready) if self.matches[match_id].result is None]
+
+    def finished(self) -> bool:
+        return self.next_match() is None
+
+    # ---- standings
+
+    def average(self, player: int) -> float:
+        row = self.rows[player]
+        return row["points"] / row["visits"] if row["visits"] else 0.0
+
+    def _rank_key(self, player: int):
+        row = self.rows[player]
+        return (-row["won"], -(row["legs_for"] - row["legs_against"]), -self.average(player), player)
+
+    def standings(self, group: int = None):
+        """Player indices ranked by wins, then leg difference, then average, then seed; O(players)."""
+        if group is not None:
+            keys = self.ranking[group]
+        elif self.groups == 1:
+            keys = self.ranking[0]
+        else:
+            keys = heapq.merge(*self.ranking)
+        return [key[-1] for key in keys]
+
+    def match_label(self, match: TournamentMatch) -> str:
+        if match.stage == "final":
+            return "Grand final"
+        if match.stage == "winners" and match.winner_to is None:
+            return "Final"
+        if self.format == "knockout":
+            return f"Round {match.round}"
+        return f"{match.stage.capitalize()} round {match.round}"
+
+    def standings_lines(self):
+        lines = []
+        for group in range(self.groups):
+            if self.groups > 1:
+                lines.append(f"Group {chr(ord('A') + group)}")
+            for rank, p in enumerate(self.standings(group if self.format == "roundrobin" else None), start=1):
+                row = self.rows[p]
+                lines.append(f"{rank:>3}. {self.players[p]:<24} {row['won']:>3}-{row['lost']:<3} "
+                             f"legs {row['legs_for'] - row['legs_against']:+d}  avg {self.average(p):.1f}")
+        if self.champion is not None and self.champion != BYE:
+            lines.append(f"Champion: {self.players[self.champion]}")
+        return lines
+
+    # ---- file
+
+    def to_dict(self):
+        return {"format": self.format, "players": self.players, "legs_to_win": self.legs_to_win,
+                "groups": self.groups, "results": self.results}
+
+    @classmethod
+    def from_dict(cls, data):
+        tournament = cls(data["format"], data["players"], data.get("legs_to_win", 2), data.get("groups", 1))
+        for match_id, winner_slot, legs, points, visits in data.get("results", []):
+            tournament.record(match_id, winner_slot, legs, points, visits)
+        return tournament
+
+def load_tournament(path: str) -> Tournament:
+    with open(path, "r", encoding="utf-8") as handle:
+        return Tournament.from_dict(json.load(handle))
+
+def save_tournament(tournament: Tournament, path: str):
+    """Write via a temporary file so a crash never leaves half a tournament."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(tournament.to_dict(), handle, ensure_ascii=False, indent=1)
+    os.replace(temp_path, path)
+
+tournament = None           # Tournament when --tournament is given
+tournament_path = None
+tournament_match_id = None  # the tournament match prefilled in the menu / being played
+
+def prefill_tournament_match():
+    """Put the next tournament pairing and its legs into the menu."""
+    global tournament_match_id
+    match = tournament.next_match()
+    if match is None:
+        tournament_match_id = None
+        print("\n".join(["Tournament finished"] + tournament.standings_lines()))
+        return
+    tournament_match_id = match.id
+    for key, player in zip(PLAYER_NAME_KEYS, match.slots):
+        menu_values[key] = tournament.players[player]
+    menu_values["legs"] = str(tournament.legs_to_win)
+    set_menu_player_count(2)
+    print(f"Next tournament match: {tournament.match_label(match)}: "
+          f"{tournament.players[match.slots[0]]} v {tournament.players[match.slots[1]]}")
+
+def record_tournament_result(record):
+    """Feed an archived match into the tournament if it is the pairing that was prefilled."""
+    if tournament is None or tournament_match_id is None:
+        return
+    match = tournament.matches[tournament_match_id]
+    if record["players"] != [tournament.players[p] for p in match.slots]:
+        return   # a friendly between other players, or the names were edited
+    points, visits = [0, 0], [0, 0]
+    for leg in record["legs"]:
+        for player, score in leg["visits"]:
+            points[player] += score
+            visits[player] += 1
+    tournament.record(match.id, record["winner"], record["legs_won"], points, visits)
+    try:
+        save_tournament(tournament, tournament_path)
+    except OSError as exc:
+        print("Could not save the tournament:", exc)
+    prefill_tournament_match()
+
+def benchmark_tournament(players: int = 256, seed: int = 0):
+    """Build and play out each format with random results; prints the cost per recorded result."""
+    rng = random.Random(seed)
+    names = [f"Player {i}" for i in range(1, players + 1)]
+    for fmt, groups in (("knockout", 1), ("double", 1), ("roundrobin", max(1, players // 8)), ("roundrobin", 1)):
+        started = time.perf_counter()
+        tournament = Tournament(fmt, names, 3, groups)
+        built = time.perf_counter()
+        recorded = 0
+        while True:
+            match = tournament.next_match()
+            if match is None:
+                break
+            winner = rng.randint(0, 1)
+            loser_legs = rng.randint(0, 2)
+            legs = (3, loser_legs) if winner == 0 else (loser_legs, 3)
+            visits = [rng.randint(20, 45), rng.randint(20, 45)]
+            tournament.record(match.id, winner, legs, [v * rng.randint(35, 70) for v in visits], visits)
+            tournament.standings(tournament.group_of[match.slots[0]] if fmt == "roundrobin" else None)
+            recorded += 1
+        finished = time.perf_counter()
+        label = fmt + (f" ({groups} groups)" if fmt == "roundrobin" else "")
+        print(f"{label:<24} {players} players: {len(tournament.matches)} matches built in "
+              f"{(built - started) * 1000:.1f} ms, {recorded} results at "
+              f"{(finished - built) / max(1, recorded) * 1e6:.1f} us each (incl. standings)")
+
+# region BOARD SCHEDULER
+#
+# Plans which board plays which tournament match. Match lengths come from the
+# archive: the visits each player needed in the legs they won (or, without
+# any, their points per visit) give the visits a leg takes at a start score,
+# and the recorded visit timestamps give their seconds per visit.
+# Planning is list scheduling: whenever a board is free it takes the ready
+# match with the longest chain of work still depending on it (the match plus
+# the longest path through the matches it feeds, plus its busier player's
+# other matches in round robin), which keeps the critical path moving and,
+# among equals, puts long matches first. A re-plan is O(matches log matches).
+
+DEFAULT_VISIT_AVERAGE = 45.0      # points per visit for players the archive has not seen
+DEFAULT_SECONDS_PER_VISIT = 25.0
+MATCH_CHANGEOVER_S = 90.0         # walk-on, practice darts and bull-up
+MAX_VISIT_GAP_S = 300.0           # longer pauses (breaks, disputes) are not throwing pace
+
+class PlayerPace(NamedTuple):
+    average: float                # points per visit
+    seconds_per_visit: float
+    leg_visits: Optional[float] = None   # own visits per won leg, scaled to a 501 start
+
+class PlannedMatch(NamedTuple):
+    board: int
+    match_id: int
+    start: float
+    end: float
+
+def player_paces(records) -> dict:
+    """Name -> PlayerPace from archived matches; pace needs the visit timestamps (live matches)."""
+    points, visits, seconds, timed, won, won_visits = {}, {}, {}, {}, {}, {}
+    for record in records:
+        names = record.get("players", [])
+        scale = 501 / record.get("start_score", 501)
+        for leg in record.get("legs", []):
+            winner = leg.get("winner")
+            if winner is not None:
+                name = names[winner]
+                won[name] = won.get(name, 0) + 1
+                won_visits[name] = won_visits.get(name, 0.0) + scale * sum(
+                    1 for player, _ in leg["visits"] if player == winner)
+            # The changeover between legs is not throwing pace
+            previous = None
+            times = leg.get("times") or [None] * len(leg["visits"])
+            for (player, score), at in zip(leg["visits"], times):
+                name = names[player]
+                points[name] = points.get(name, 0) + score
+                visits[name] = visits.get(name, 0) + 1
+                if at is not None and previous is not None and 0 < at - previous <= MAX_VISIT_GAP_S:
+                    seconds[name] = seconds.get(name, 0.0) + at - previous
+                    timed[name] = timed.get(name, 0) + 1
+                previous = at
+    return {
+        name: PlayerPace(points[name] / visits[name] if points[name] else DEFAULT_VISIT_AVERAGE,
+                         seconds[name] / timed[name] if timed.get(name) else DEFAULT_SECONDS_PER_VISIT,
+                         won_visits[name] / won[name] if won.get(name) else None)
+        for name in visits
+    }
+
+def expected_legs(legs_to_win: int, p: float) -> float:
+    """Expected legs in a first-to-legs_to_win match where one side wins each leg with probability p."""
+    q = 1.0 - p
+    total = 0.0
+    for lost in range(legs_to_win):
+        ways = math.comb(legs_to_win - 1 + lost, lost)
+        total += (legs_to_win + lost) * ways * (p ** legs_to_win * q ** lost + q ** legs_to_win * p ** lost)
+    return total
+
+def estimate_match_seconds(a: PlayerPace, b: PlayerPace, legs_to_win: int, start_score: int) -> float:
+    # A leg ends when the quicker finisher checks out, the other having thrown about as many visits;
+    # a player's won legs say how quick they are, their scoring average stands in without any
+    finish = [pace.leg_visits * start_score / 501 if pace.leg_visits else start_score / max(pace.average, 1.0)
+              for pace in (a, b)]
+    leg_visits = 2 * min(finish)
+    p = a.average ** 2 / (a.average ** 2 + b.average ** 2)
+    return (MATCH_CHANGEOVER_S
+            + expected_legs(legs_to_win, p) * leg_visits * (a.seconds_per_visit + b.seconds_per_visit) / 2)
+
+def tournament_durations(tournament, paces: dict, start_score: int = 501):
+    """
+    Estimated seconds for every match; undecided players count as the field's
+    average pace, and a match against a bye takes no time.
+    """
+    field = [paces.get(name) for name in tournament.players]
+    known = [pace for pace in field if pace is not None]
+    observed = [pace.leg_visits for pace in known if pace.leg_visits]
+    default = PlayerPace(
+        sum(pace.average for pace in known) / len(known) if known else DEFAULT_VISIT_AVERAGE,
+        sum(pace.seconds_per_visit for pace in known) / len(known) if known else DEFAULT_SECONDS_PER_VISIT,
+        sum(observed) / len(observed) if observed else None,
+    )
+    field = [pace or default for pace in field]
+    durations = []
+    for match in tournament.matches:
+        if BYE in match.slots:
+            durations.append(0.0)
+            continue
+        a, b = (field[p] if p is not None else default for p in match.slots)
+        durations.append(estimate_match_seconds(a, b, tournament.legs_to_win, start_score))
+    return durations
+
+def plan_boards(tournament, durations, boards_free_at, running=None, now: float = 0.0):
+    """
+    Plan the rest of the tournament. boards_free_at: when each board is next
+    free; running: match id -> expected end for matches being played (their
+    players and the matches they feed wait for them). A match against a bye
+    needs no board: it is done the moment its other player is known. Returns
+    the planned matches in start order and the planned finish of the last one.
+    """
+    running = running or {}
+    matches = tournament.matches
+    pending = [m.id for m in matches if m.result is None]
+    successors = {}
+    waiting_on = {}
+    for match_id in pending:
+        match = matches[match_id]
+        for target in (match.winner_to, match.loser_to):
+            if target is not None:
+                successors.setdefault(match_id, []).append(target[0])
+                waiting_on[target[0]] = waiting_on.get(target[0], 0) + 1
+
+    # Longest chain of work from each match to the end of the tournament; order is topological
+    chain = {}
+    for match_id in sorted(pending, key=lambda i: -matches[i].order):
+        chain[match_id] = durations[match_id] + max((chain[s] for s in successors.get(match_id, ())), default=0.0)
+    def players(match_id):
+        return [p for p in matches[match_id].slots if p is not None and p != BYE]
+    load = {}
+    for match_id in pending:
+        if match_id not in running:
+            for player in players(match_id):
+                load[player] = load.get(player, 0.0) + durations[match_id]
+    def priority(match_id):
+        busiest = max((load.get(p, 0.0) for p in players(match_id)), default=0.0)
+        return chain[match_id] + busiest - durations[match_id]
+
+    player_free = {}
+    finishing = []                 # (end, match id) of running and planned matches
+    for match_id, end in running.items():
+        heapq.heappush(finishing, (end, match_id))
+        for player in matches[match_id].slots:
+            player_free[player] = end
+    available = []
+    def release(match_id, at):
+        if BYE in matches[match_id].slots:
+            heapq.heappush(finishing, (at, match_id))
+        else:
+            heapq.heappush(available, (-priority(match_id), match_id))
+    for match_id in pending:
+        if match_id not in running and not waiting_on.get(match_id):
+            release(match_id, now)
+    boards = [(max(now, free_at), board) for board, free_at in enumerate(boards_free_at)]
+    heapq.heapify(boards)
+
+    plan = []
+    makespan = max(running.values(), default=now)
+    while boards and (available or finishing):
+        t, board = heapq.heappop(boards)
+        while finishing and finishing[0][0] <= t:
+            done_at, done = heapq.heappop(finishing)
+            for successor in successors.get(done, ()):
+                waiting_on[successor] -= 1
+                if not waiting_on[successor]:
+                    release(successor, done_at)
+        blocked = []
+        chosen = None
+        while available:
+            entry = heapq.heappop(available)
+            if all(player_free.get(p, t) <= t for p in players(entry[1])):
+                chosen = entry[1]
+                break
+            blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(available, entry)
+        if chosen is None:
+            # Nothing this board can start yet: try again when a match or a player is next done
+            later = [finishing[0][0]] if finishing else []
+            later += [player_free[p] for _, i in blocked for p in players(i) if player_free.get(p, t) > t]
+            if not later:
+                break
+            heapq.heappush(boards, (min(later), board))
+            continue
+        end = t + durations[chosen]
+        plan.append(PlannedMatch(board, chosen, t, end))
+        heapq.heappush(finishing, (end, chosen))
+        for player in players(chosen):
+            player_free[player] = end
+        heapq.heappush(boards, (end, board))
+        makespan = max(makespan, end)
+    return plan, makespan
+
+def print_board_schedule(tournament, boards: int, start_score: int):
+    """Planned board, clock time and estimated length of every remaining match."""
+    paces = player_paces(read_archive())
+    durations = tournament_durations(tournament, paces, start_score)
+    plan, makespan = plan_boards(tournament, durations, [0.0] * boards)
+    now = time.time()
+    for entry in plan:
+        match = tournament.matches[entry.match_id]
+        names = " v ".join("?" if p is None else "bye" if p == BYE else tournament.players[p] for p in match.slots)
+        print(f"{time.strftime('%H:%M', time.localtime(now + entry.start))}  board {entry.board + 1:>2}  "
+              f"{tournament.match_label(match):<22} {names}  (~{(entry.end - entry.start) / 60:.0f} min)")
+    print(f"Estimated finish: {time.strftime('%H:%M', time.localtime(now + makespan))}")
+
+def simulate_tournament_day(tournament, durations, actual, boards: int, rng, planned: bool = True):
+    """
+    Play a tournament on the given boards: matches take their actual seconds,
+    the planner only sees the estimates. planned=False starts ready matches
+    in bracket order instead. Returns (makespan, re-plan times in seconds).
+    """
+    strength = [rng.uniform(30, 80) for _ in tournament.players]
+    board_free = [0.0] * boards
+    running = {}                   # match id -> (board, end)
+    replans = []
+    now = 0.0
+    while True:
+        free = [b for b in range(boards) if board_free[b] <= now]
+        if free:
+            started = []
+            if planned:
+                t0 = time.perf_counter()
+                plan, _ = plan_boards(tournament, durations, board_free,
+                                      {i: end for i, (_, end) in running.items()}, now)
+                replans.append(time.perf_counter() - t0)
+                started = [(entry.board, entry.match_id) for entry in plan if entry.start <= now and entry.board in free]
+            else:
+                busy = {p for i in running for p in tournament.matches[i].slots}
+                for match in tournament.ready_matches():
+                    if not free:
+                        break
+                    if match.id not in running and not busy.intersection(match.slots):
+                        started.append((free.pop(0), match.id))
+                        busy.update(match.slots)
+            for board, match_id in started:
+                running[match_id] = (board, now + actual[match_id])
+                board_free[board] = now + actual[match_id]
+        if not running:
+            return now, replans
+        now = min(end for _, end in running.values())
+        for match_id in sorted(i for i, (_, end) in running.items() if end <= now):
+            del running[match_id]
+            a, b = tournament.matches[match_id].slots
+            winner = 0 if rng.random() < strength[a] / (strength[a] + strength[b]) else 1
+            legs = [tournament.legs_to_win] * 2
+            legs[1 - winner] = rng.randint(0, tournament.legs_to_win - 1)
+            tournament.record(match_id, winner, legs, [0, 0], [0, 0])
+
+def benchmark_scheduler(days: int = 20, seed: int = 0):
+    """Synthetic tournament days: planned vs bracket-order board assignment, and re-plan cost."""
+    rng = random.Random(seed)
+    setups = (("knockout", 128, 1, 8), ("knockout", 256, 1, 16), ("double", 128, 1, 12),
+              ("roundrobin", 96, 16, 12), ("roundrobin", 64, 8, 8))
+    replans = []
+    for day in range(days):
+        fmt, players, groups, boards = setups[day % len(setups)]
+        names = [f"Player {i}" for i in range(1, players + 1)]
+        paces = {name: PlayerPace(rng.uniform(30, 80), rng.uniform(15, 35)) for name in names}
+        legs = rng.choice((2, 3))
+        template = Tournament(fmt, names, legs, groups)
+        durations = tournament_durations(template, paces)
+        actual = [d * rng.lognormvariate(0, 0.25) for d in durations]
+        day_seed = rng.random()
+        planned, times = simulate_tournament_day(Tournament(fmt, names, legs, groups), durations, actual,
+                                                 boards, random.Random(day_seed))
+        in_order, _ = simulate_tournament_day(Tournament(fmt, names, legs, groups), durations, actual,
+                                              boards, random.Random(day_seed), planned=False)
+        replans.extend(times)
+        # No schedule beats the board time per board or the longest chain of matches feeding each other
+        longest = [0.0] * len(template.matches)
+        for match in sorted(template.matches, key=lambda m: m.order):
+            if match.result is None:
+                longest[match.id] += actual[match.id]
+            for target in (match.winner_to, match.loser_to):
+                if target is not None:
+                    longest[target[0]] = max(longest[target[0]], longest[match.id])
+        bound = max(sum(actual[m.id] for m in template.matches if m.result is None) / boards, max(longest))
+        print(f"day {day + 1:>2}: {fmt:<10} {players:>3} players, {len(template.matches):>3} matches, "
+              f"{boards:>2} boards: planned {planned / 3600:5.2f} h, bracket order {in_order / 3600:5.2f} h, "
+              f"lower bound {bound / 3600:5.2f} h, worst re-plan {max(times) * 1000:5.1f} ms")
+    replans.sort()
+    print(f"{len(replans)} re-plans: p50 {replans[len(replans) // 2] * 1000:.2f} ms, "
+          f"p99 {replans[int(len(replans) * 0.99)] * 1000:.2f} ms, max {replans[-1] * 1000:.2f} ms")
+
+# region PLAYER RATINGS
+#
+# Elo ratings over the match archive. Every pair of players in a match is one
+# Elo game whose result is a blend of their share of the legs between them and
+# their share of the two averages, so 3-0 moves ratings more than 3-2. All
+# pairs are scored from the ratings before the match, which makes an update
+# O(players^2), i.e. constant, per match. Ratings live in one array of doubles
+# indexed through a name table, and are saved next to the archive together
+# with the archive's size; when that no longer matches (imports, another copy
+# of the archive) they are rebuilt from the whole history.
+
+RATING_START = 1500.0
+RATING_K = 32.0                 # per match; split over the opponents in multi-player matches
+RATING_SCALE = 400.0
+RATING_AVERAGE_WEIGHT = 0.25    # the rest of a pair's result is its share of the legs
+
+def rating_pairs(record):
+    """(i, j, result for i, K) for every pair of players in an archived match."""
+    won = record["legs_won"]
+    averages = record.get("averages") or [0.0] * len(won)
+    k = RATING_K / max(1, len(won) - 1)
+    for i in range(len(won)):
+        for j in range(i + 1, len(won)):
+            legs = won[i] + won[j]
+            leg_share = won[i] / legs if legs else 0.5
+            avg_total = averages[i] + averages[j]
+            avg_share = averages[i] / avg_total if avg_total else 0.5
+            yield i, j, (1 - RATING_AVERAGE_WEIGHT) * leg_share + RATING_AVERAGE_WEIGHT * avg_share, k
+
+class RatingBook:
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.ratings = array("d")
+        self.played = array("l")
+        self.archive_size = 0    # bytes of archive these ratings include
+
+    def player(self, name: str) -> int:
+        idx = self.index.get(name)
+        if idx is None:
+            idx = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.ratings.append(RATING_START)
+            self.played.append(0)
+        return idx
+
+    def rating(self, name: str) -> Optional[float]:
+        idx = self.index.get(name)
+        return self.ratings[idx] if idx is not None else None
+
+    def record(self, record):
+        """Update the ratings of one finished match's players; unfinished (imported) matches are skipped."""
+        if record.get("winner") is None:
+            return
+        players = [self.player(name) for name in record["players"]]
+        deltas = [0.0] * len(players)
+        for i, j, result, k in rating_pairs(record):
+            expected = 1.0 / (1.0 + 10.0 ** ((self.ratings[players[j]] - self.ratings[players[i]]) / RATING_SCALE))
+            deltas[i] += k * (result - expected)
+            deltas[j] -= k * (result - expected)
+        for idx, delta in zip(players, deltas):
+            self.ratings[idx] += delta
+            self.played[idx] += 1
+
+    def ranked(self):
+        return sorted(range(len(self.names)), key=lambda idx: (-self.ratings[idx], self.names[idx]))
+
+    def to_dict(self):
+        return {"archive_size": self.archive_size, "names": self.names,
+                "ratings": [round(r, 3) for r in self.ratings], "played": list(self.played)}
+
+    @classmethod
+    def from_dict(cls, data):
+        book = cls()
+        book.names = list(data["names"])
+        book.index = {name: idx for idx, name in enumerate(book.names)}
+        book.ratings = array("d", data["ratings"])
+        book.played = array("l", data["played"])
+        book.archive_size = data.get("archive_size", 0)
+        return book
+
+def rebuild_ratings(records) -> RatingBook:
+    """
+    Ratings from scratch over a whole history, feeding the matches to
+    RatingBook.record() in order: about 5 us a match, so 50,000 take a quarter
+    of a second. Reading the records costs as much as the updates, so
+    batching the updates in NumPy was no faster.
+    """
+    book = RatingBook()
+    for record in records:
+        book.record(record)
+    return book
+
+player_ratings = RatingBook()
+
+def ratings_path() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(MATCH_ARCHIVE_PATH)), "ratings.json")
+
+def _archive_size() -> int:
+    try:
+        return os.path.getsize(MATCH_ARCHIVE_PATH)
+    except OSError:
+        return 0
+
+def save_ratings():
+    player_ratings.archive_size = _archive_size()
+    path = ratings_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(player_ratings.to_dict(), handle, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+    except OSError as exc:
+        print("Could not save ratings:", exc)
+
+def load_ratings():
+    """Ratings for the archive; rebuilt (and saved) if the archive changed behind their back."""
+    global player_ratings
+    try:
+        with open(ratings_path(), "r", encoding="utf-8") as handle:
+            book = RatingBook.from_dict(json.load(handle))
+        if book.archive_size == _archive_size():
+            player_ratings = book
+            return
+    except FileNotFoundError:
+        if not _archive_size():
+            return
+    except (OSError, ValueError, KeyError) as exc:
+        print("Could not read ratings, rebuilding:", exc)
+    started = time.perf_counter()
+    player_ratings = rebuild_ratings(read_archive())
+    print(f"Rebuilt ratings of {len(player_ratings.names)} players "
+          f"in {time.perf_counter() - started:.2f} s")
+    save_ratings()
+
+def record_match_rating(record):
+    """O(1) rating update for a freshly archived match."""
+    player_ratings.record(record)
+    save_ratings()
+
+def print_ratings():
+    for rank, idx in enumerate(player_ratings.ranked(), start=1):
+        print(f"{rank:>4}. {player_ratings.names[idx]:<32} {player_ratings.ratings[idx]:7.1f}"
+              f"  ({player_ratings.played[idx]} matches)")
+
+def benchmark_ratings(matches: int = 50_000, players: int = 400, seed: int = 0):
+    """Synthetic history: how long a full rebuild takes, per match and in total."""
+    rng = random.Random(seed)
+    strength = [rng.gauss(55, 12) for _ in range(players)]
+    records = []
+    for _ in range(matches):
+        field = rng.sample(range(players), 2 if rng.random() < 0.9 else rng.randint(3, 5))
+        averages = [max(10.0, rng.gauss(strength[p], 8)) for p in field]
+        won = [0] * len(field)
+        won[max(range(len(field)), key=lambda i: averages[i] * rng.uniform(0.8, 1.2))] = 3
+        for i in range(len(field)):
+            if not won[i]:
+                won[i] = rng.randint(0, 2)
+        records.append({"players": [f"Player {p}" for p in field], "legs_won": won, "averages": averages,
+                        "winner": won.index(3)})
+    started = time.perf_counter()
+    rebuilt = rebuild_ratings(records)
+    rebuild = time.perf_counter() - started
+    print(f"{matches} matches, {players} players: rebuild {rebuild:.2f} s "
+          f"({rebuild / matches * 1e6:.1f} us/match), top rating {rebuilt.ratings[rebuilt.ranked()[0]]:.1f}")
+
+# region LATENCY TRACING
+
+# Histogram bucket upper edges in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 3, 4, 6, 8, 10, 12, 14, 17, 20, 25, 33, 40, 50, 67, 83, 100, 150, 200, 300, 500, 1000)
+LATENCY_RECENT_SAMPLES = 2048
+LATENCY_COMMIT_KEYS = (pygame.K_RETURN, pygame.K_KP_ENTER)
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent = deque(maxlen=LATENCY_RECENT_SAMPLES)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.recent.append(ms)
+        self.total += 1
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct: float) -> float:
+        """Percentile over the most recent samples (exact, not bucketed)."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+    def to_dict(self):
+        edges = [*LATENCY_BUCKETS_MS, None]
+        return {
+            "samples": self.total,
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "histogram": [{"le_ms": edge, "count": count} for edge, count in zip(edges, self.counts)],
+        }
+
+class LatencyTracer:
+    """
+    Input-to-photon latency: from the moment pygame.event.get() hands main()
+    a KEYDOWN until the flip()/update() that shows its effect has returned.
+    Game frames come from the render thread, so there a key counts as shown
+    once a frame drawn from a snapshot taken after it is presented.
+
+    Keys are recorded as "key"; commit_throw() relabels the Enter that committed
+    a visit as "commit" so Enter-to-new-score is reported on its own. Board
+    darts are recorded as "dart", from the moment the reader thread got them;
+    a visit the board commits gets a "commit" sample of its own.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+        self.pending = []       # [kind, received_at, snapshot seq] for inputs not yet on screen
+        self.current = None     # the sample of the key currently being handled
+        self.current_key = None
+
+    def key_received(self, received_at: float, key: int = None):
+        self.current = ["key", received_at, None]
+        self.current_key = key
+        self.pending.append(self.current)
+
+    def dart_received(self, received_at: float):
+        """A dart from the board, timed from when the reader thread got its bytes."""
+        self.current = None
+        self.pending.append(["dart", received_at, None])
+
+    def snapshot_taken(self, seq: int):
+        """The keys handled so far are in game snapshot seq."""
+        for entry in self.pending:
+            if entry[2] is None:
+                entry[2] = seq
+
+    def commit_started(self):
+        """A visit is being committed: by the Enter being handled, or else by the board."""
+        if self.current is not None and self.current_key in LATENCY_COMMIT_KEYS:
+            self.current[0] = "commit"
+        elif self.pending:
+            # No key of ours started it; with nothing pending (soak runs, tools) there is nothing to time
+            self.pending.append(["commit", time.perf_counter(), None])
+        self.current = None
+
+    def frame_presented(self, seq: int = None):
+        """A frame is on screen: drawn on this thread (seq None) or from game snapshot seq."""
+        if not self.pending:
+            return
+        now = time.perf_counter()
+        waiting = []
+        for entry in self.pending:
+            kind, received_at, entry_seq = entry
+            if seq is not None and (entry_seq is None or entry_seq > seq):
+                waiting.append(entry)
+                continue
+            histogram = self.histograms.get(kind)
+            if histogram is None:
+                histogram = self.histograms[kind] = LatencyHistogram()
+            histogram.add((now - received_at) * 1000.0)
+        self.pending = waiting
+        if not waiting:
+            self.current = None
+
+    def summary_lines(self):
+        lines = []
+        for kind in sorted(self.histograms):
+            histogram = self.histograms[kind]
+            lines.append(
+                f"{kind}: p50 {histogram.percentile(50):.1f} ms  "
+                f"p99 {histogram.percentile(99):.1f} ms  n={histogram.total}"
+            )
+        return lines
+
+    def export(self, path: str):
+        data = {kind: hist.to_dict() for kind, hist in sorted(self.histograms.items())}
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
+        print(f"Latency report written to {path}")
+
+latency_tracer = LatencyTracer()
+latency_overlay_visible = False
+
+def draw_overlay_box(surface, snap, lines, right: bool = True):
+    """Diagnostic text box in a bottom corner of the game screen, above the sponsor bar."""
+    surfs = [font_small.render(line, True, TEXT_COLOUR) for line in lines]
+    pad = _px(10)
+    box_w = max(surf.get_width() for surf in surfs) + 2 * pad
+    box_h = sum(surf.get_height() for surf in surfs) + 2 * pad
+
+    bottom = snap.height - _px(20)
+    if snap.sponsor_bar:
+        bottom -= sponsor_ticker.height
+    box = pygame.Rect(0, 0, box_w, box_h)
+    if right:
+        box.bottomright = (snap.width - _px(20), bottom)
+    else:
+        box.bottomleft = (_px(20), bottom)
+    pygame.draw.rect(surface, BOX_BG, box, border_radius=snap.layout["radius"])
+    pygame.draw.rect(surface, BOX_BORDER, box, snap.layout["border"], border_radius=snap.layout["radius"])
+
+    y = box.y + pad
+    for surf in surfs:
+        surface.blit(surf, (box.x + pad, y))
+        y += surf.get_height()
+
+def export_latency_report(path: str = None):
+    if path is None:
+        path = f"latency_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    latency_tracer.export(path)
+
+def post_menu_start_keys():
+    """Queue the Tab presses that move the menu focus to Start, then Enter."""
+    order = menu_widget_keys()
+    tabs = (order.index("start") - order.index(active_input_key)) % len(order)
+    for key, unicode in [(pygame.K_TAB, "\t")] * tabs + [(pygame.K_RETURN, "\r")]:
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0))
+
+class KeyInjector:
+    """
+    Posts synthetic KEYDOWN events at a fixed rate so latency can be measured
+    without a keyboard (combine with --headless). Starts the match from the
+    menu with keys, types random visits followed by Enter, and presses Enter
+    on the end screen to start the next match. Everything goes through the
+    event queue, so --record captures the whole session.
+    """
+
+    def __init__(self, total_keys: int, rate_hz: float, seed: int = 0):
+        self.remaining = total_keys
+        self.interval = 1.0 / max(1.0, rate_hz)
+        self.next_at = time.perf_counter()
+        self.queue = deque()
+        self.rng = random.Random(seed)
+        post_menu_start_keys()
+
+    def _post_key(self, key, unicode=""):
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0, scancode=0))
+
+    def pump(self) -> bool:
+        """Post the keys that are due; returns False once every key has been sent."""
+        now = time.perf_counter()
+        while self.remaining > 0 and now >= self.next_at:
+            if state == STATE_END:
+                self._post_key(pygame.K_RETURN)
+            else:
+                if not self.queue:
+                    visit = str(self.rng.randint(0, 100))
+                    self.queue.extend((pygame.K_0 + int(ch), ch) for ch in visit)
+                    self.queue.append((pygame.K_RETURN, "\r"))
+                self._post_key(*self.queue.popleft())
+            self.remaining -= 1
+            self.next_at += self.interval
+        return self.remaining > 0
+
+# region WIN CHANCE
+#
+# Live match-win probabilities: the rest of the match is simulated many times
+# at once with NumPy arrays (one row per simulated match) in a worker process,
+# so the render loop only ever polls a future. The model is deliberately
+# simple: each visit either checks out (per-player success rate, harder from
+# further out) or scores a value drawn from that player's own earlier visits.
+
+WIN_CHANCE_SIMULATIONS = 20_000
+WIN_CHANCE_MAX_VISITS = 400           # per simulated match; unfinished ones are ignored
+WIN_CHANCE_MIN_SAMPLES = 12           # below this, the prior visits fill the pool
+WIN_CHANCE_PRIOR_VISITS = (26, 41, 45, 60, 45, 60, 81, 85, 100, 57, 41, 60)
+BOGEY_CHECKOUTS = frozenset((159, 162, 163, 165, 166, 168, 169))
+
+def can_check_out(remaining: int, double_out: bool) -> bool:
+    """Whether one visit can finish from this remaining score."""
+    if double_out:
+        return 2 <= remaining <= 170 and remaining not in BOGEY_CHECKOUTS
+    return 1 <= remaining <= MAX_VISIT and remaining not in IMPOSSIBLE_VISITS
+
+def simulate_win_chances(match: tuple, pools, checkout_rates, simulations: int, seed: int):
+    """
+    Monte Carlo estimate of each player's chance to win the match from `match`
+    (a MatchState as a plain tuple). `pools` holds each player's scoring
+    visits, `checkout_rates` their chance to finish when a checkout is on.
+    Runs in the win-chance worker process; returns a list of probabilities.
+    """
+    # Imported here so the scoreboard itself starts without NumPy
+    import numpy as np
+
+    start_score, legs_to_win, double_out, remaining, legs_won, active, leg_starter, winner = match
+    players = len(remaining)
+    if winner is not None:
+        return [1.0 if p == winner else 0.0 for p in range(players)]
+
+    rng = np.random.default_rng(seed)
+    rows = np.arange(simulations)
+
+    pool_sizes = np.array([len(pool) for pool in pools])
+    pool_table = np.zeros((players, pool_sizes.max()), dtype=np.int32)
+    for p, pool in enumerate(pools):
+        pool_table[p, :len(pool)] = pool
+    rates = np.asarray(checkout_rates, dtype=np.float64)
+
+    # Checkout odds by remaining score: 0 where no checkout is on, and lower
+    # for the long three-dart finishes than for a single double
+    finish_odds = np.zeros(start_score + 1)
+    for r in range(start_score + 1):
+        if can_check_out(r, double_out):
+            finish_odds[r] = 1.0 if r <= 40 or r == 50 else (0.6 if r <= 100 else 0.25)
+
+    rem = np.tile(np.asarray(remaining, dtype=np.int32), (simulations, 1))
+    legs = np.tile(np.asarray(legs_won, dtype=np.int32), (simulations, 1))
+    turn = np.full(simulations, active, dtype=np.int32)
+    starter = np.full(simulations, leg_starter, dtype=np.int32)
+    winners = np.full(simulations, -1, dtype=np.int32)
+
+    live = rows
+    for _ in range(WIN_CHANCE_MAX_VISITS):
+        if live.size == 0:
+            break
+        who = turn[live]
+        before = rem[live, who]
+
+        checkout = rng.random(live.size) < rates[who] * finish_odds[before]
+        visit = pool_table[who, (rng.random(live.size) * pool_sizes[who]).astype(np.int32)]
+        after = before - visit
+        bust = (after <= 0) | ((after == 1) & double_out)
+        rem[live, who] = np.where(checkout, 0, np.where(bust, before, after))
+        turn[live] = (who + 1) % players
+
+        # Leg won: either the match is over or the next leg starts
+        finished = live[checkout]
+        leg_winner = who[checkout]
+        legs[finished, leg_winner] += 1
+        match_over = legs[finished, leg_winner] >= legs_to_win
+        winners[finished[match_over]] = leg_winner[match_over]
+
+        next_leg = finished[~match_over]
+        starter[next_leg] = (starter[next_leg] + 1) % players
+        turn[next_leg] = starter[next_leg]
+        rem[next_leg] = start_score
+
+        live = live[winners[live] < 0]
+
+    counts = np.bincount(winners[winners >= 0], minlength=players)
+    total = counts.sum()
+    if total == 0:
+        return [1.0 / players] * players
+    return (counts / total).tolist()
+
+def observed_visit_stats(start_score: int, double_out: bool, legs, players: int):
+    """
+    Per-player scoring pools and checkout rates from the legs played so far
+    (`legs` yields per-player score lists). Visits thrown with a checkout on
+    count towards the checkout rate, the others go into the scoring pool.
+    """
+    pools = [[] for _ in range(players)]
+    attempts = [0] * players
+    successes = [0] * players
+    for leg_scores in legs:
+        for p, visits in enumerate(leg_scores):
+            remaining = start_score
+            for visit in visits:
+                if can_check_out(remaining, double_out):
+                    attempts[p] += 1
+                    successes[p] += visit == remaining
+                else:
+                    pools[p].append(visit)
+                remaining -= visit
+
+    for p in range(players):
+        missing = WIN_CHANCE_MIN_SAMPLES - len(pools[p])
+        if missing > 0:
+            pools[p].extend(WIN_CHANCE_PRIOR_VISITS[:missing])
+    # Smoothed towards a 25% checkout rate until there are enough attempts
+    rates = [(successes[p] + 1) / (attempts[p] + 4) for p in range(players)]
+    return pools, rates
+
+class WinChanceEstimator:
+    """
+    Keeps at most one simulation running in a single-worker process pool.
+    request() is cheap and may be called every frame: a new job is only
+    queued when the match state changed, a queued job that has not started
+    yet is replaced by the newer one, and a result that arrives for an older
+    match state is dropped.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.simulations = WIN_CHANCE_SIMULATIONS
+        self.executor = None
+        self.running = None         # (generation, future)
+        self.queued = None          # (generation, job args) waiting for the worker
+        self.generation = 0
+        self.requested_state = None
+        self.chances = None         # latest result; kept on screen until the next one lands
+
+    def _submit(self, generation, job):
+        if self.executor is None:
+            # The worker re-imports this module; keep pygame's banner out of the console
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(self.shutdown)
+        self.running = (generation, self.executor.submit(simulate_win_chances, *job))
+
+    def request(self):
+        """Queue a simulation of the scoreboard's match if it changed."""
+        if not self.enabled:
+            return
+        match = current_match_state()
+        if match == self.requested_state:
+            return
+        self.requested_state = match
+        self.generation += 1
+
+        pools, rates = observed_visit_stats(
+            START_SCORE, DOUBLE_OUT_ENABLED,
+            [snap['scores'] for snap in finished_legs_stack] + [scores], len(scores))
+        job = (tuple(match), pools, rates, self.simulations, self.generation)
+        if self.running is None:
+            self._submit(self.generation, job)
+        else:
+            self.queued = (self.generation, job)
+
+    def poll(self):
+        """Pick up a finished simulation without blocking."""
+        if self.running is None or not self.running[1].done():
+            return
+        generation, future = self.running
+        self.running = None
+        try:
+            chances = future.result()
+        except Exception as exc:
+            print(f"Win chance simulation failed: {exc}")
+            self.enabled = False
+            return
+        # Results for an older state, or another match's players, are dropped
+        if generation == self.generation and len(chances) == len(scores):
+            self.chances = chances
+        if self.queued is not None:
+            self._submit(*self.queued)
+            self.queued = None
+
+    def reset(self):
+        """New match: forget its chances and anything still waiting for the old one."""
+        self.generation += 1
+        self.queued = None
+        self.requested_state = None
+        self.chances = None
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+win_chance = WinChanceEstimator()
+
+# region MEMORY
+
+memory_overlay_visible = False
+SOAK_SAMPLE_EVERY = 10            # matches between memory samples
+SOAK_ALLOWED_GROWTH = 2 * MIB     # after warm-up, on top of the surface budgets
+
+def tracked_memory_bytes() -> int:
+    """Python heap (when tracemalloc is on) plus the pixel memory the caches and ticker hold."""
+    heap = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    surfaces = sum(cache.nbytes for cache in SURFACE_CACHES)
+    return heap + surfaces + surface_bytes(sponsor_ticker.segment_surface)
+
+def memory_report_lines():
+    lines = ["Memory"]
+    for cache in SURFACE_CACHES:
+        lines.append(
+            f"{cache.name}: {cache.nbytes / MIB:.1f} / {cache.budget / MIB:.0f} MiB  "
+            f"{len(cache)} surfaces, {cache.evictions} evicted"
+        )
+    lines.append(f"ticker strip: {surface_bytes(sponsor_ticker.segment_surface) / MIB:.1f} MiB")
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"python heap: {current / MIB:.1f} MiB (peak {peak / MIB:.1f})")
+    lines.append(f"matches archived: {archived_match_count}")
+    return lines
+
+def run_soak(matches: int, seed: int = 0) -> bool:
+    """
+    Play `matches` random matches back to back through reset_game, drawing
+    every visit and archiving every result, and check that tracked memory
+    stops growing once the first tenth of the matches has warmed the caches.
+    Every match gets new player names (2-4 players) and every 25th flips the
+    theme, so the caches and layouts keep changing. Returns True if memory stayed bounded.
+    """
+    global current_input
+    rng = random.Random(seed)
+    tracemalloc.start()
+    samples = []
+    started = time.perf_counter()
+
+    for n in range(matches):
+        if n % 25 == 24:
+            apply_theme(not current_dark_mode)
+        names = [f"Player {p + 1}/{n} {rng.randint(0, 9999)}" for p in range(rng.randint(MIN_PLAYERS, 4))]
+        reset_game(rng.choice((301, 501)), names, rng.randint(1, 3), True, True)
+        while state == STATE_GAME:
+            remaining = START_SCORE - leg_totals[active_player]
+            if remaining <= 40 and rng.random() < 0.4:
+                current_input = str(remaining)
+            else:
+                current_input = str(rng.choice((26, 41, 45, 60, 81, 85, 100, 140, 180)))
+            commit_throw()
+            draw_game()
+        draw_end()
+        archive_finished_match()
+
+        if n % SOAK_SAMPLE_EVERY == SOAK_SAMPLE_EVERY - 1:
+            samples.append(tracked_memory_bytes())
+            print(f"match {n + 1:4d}: {samples[-1] / MIB:7.2f} MiB tracked")
+
+    elapsed = time.perf_counter() - started
+    print("\n".join(memory_report_lines()))
+    tracemalloc.stop()
+    if len(samples) < 2:
+        print(f"{matches} matches in {elapsed:.1f} s; too few samples to judge growth")
+        return True
+
+    warm = samples[max(1, len(samples) // 10) - 1]
+    growth = max(samples) - warm
+    bounded = growth <= SOAK_ALLOWED_GROWTH
+    print(f"{matches} matches in {elapsed:.1f} s; growth after warm-up {growth / MIB:.2f} MiB "
+          f"({'bounded' if bounded else 'NOT bounded'}, limit {SOAK_ALLOWED_GROWTH / MIB:.0f} MiB)")
+    return bounded
+
+# region FRAME STREAM
+#
+# Optional HTTP endpoint (--stream-port) for network media players on hall TVs:
+#   /             a page showing the stream
+#   /stream.mjpg  multipart MJPEG stream of the scoreboard
+#   /frame.jpg    the latest frame as JPEG, /frame.png as PNG
+# The main loop only copies the finished frame, and only when a viewer is
+# connected, the encoder is idle and the frame had time to spare; scaling,
+# change detection and encoding run on the encoder thread. The server listens
+# on this PC's address in the network it routes through (--stream-bind picks
+# another, e.g. 0.0.0.0 for every interface or 127.0.0.1 for this PC only).
+
+STREAM_MAX_FPS = 15
+STREAM_KEEPALIVE_S = 5.0        # resend an unchanged picture this often so players don't time out
+STREAM_FRAME_FRESH_S = 1.0      # /frame.jpg answers at once with a picture confirmed this recently
+STREAM_WAKE_EVENT = pygame.event.custom_type()  # wakes the idle menu loop for a new viewer
+STREAM_FRAME_BUDGET_S = 1 / 60  # never let capturing push a frame over this
+STREAM_BOUNDARY = "gsszoframe"
+
+def local_network_address() -> str:
+    """This PC's address on the network it routes through (nothing is sent); loopback when offline."""
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        probe.connect(("10.255.255.255", 1))
+        return probe.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+    finally:
+        probe.close()
+
+class FrameStreamer:
+    def __init__(self, port: int, width: int, address: str = None):
+        self.port = port
+        self.width = width
+        self.address = address          # None: local_network_address()
+        self.server = None
+        self.viewers = 0
+        self.want_snapshot = False
+        self.condition = threading.Condition()
+        self.jpeg = None                # latest published frame
+        self.sequence = 0
+        self.latest_surface = None      # scaled copy behind self.jpeg, for /frame.png
+        self.confirmed_at = None        # when a capture last matched (or replaced) self.jpeg
+
+        self.job = None                 # captured frame waiting for the encoder
+        self.job_ready = threading.Event()
+        self.interval = 1 / STREAM_MAX_FPS
+        self.next_capture = 0.0
+        self.copy_cost = 0.0
+        self.last_crc = None
+        self.stats = {"captured": 0, "skipped": 0, "unchanged": 0, "encoded": 0}
+        self.stopping = False
+
+    def start(self):
+        if self.address is None:
+            self.address = local_network_address()
+        server = http.server.ThreadingHTTPServer((self.address, self.port), _StreamRequestHandler)
+        server.daemon_threads = True
+        server.streamer = self
+        self.server = server
+        self.port = server.server_address[1]    # the one picked for port 0
+        threading.Thread(target=server.serve_forever, name="stream-http", daemon=True).start()
+        threading.Thread(target=self._encode_loop, name="stream-encoder", daemon=True).start()
+        print(f"Streaming the scoreboard on http://{self.address}:{self.port}/")
+
+    def stop(self):
+        """Close the server and end the encoder thread."""
+        self.stopping = True
+        self.job_ready.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def offer(self, surface: pygame.Surface, frame_work_s: float):
+        """Called after each presented frame; copies it for the encoder when one is wanted."""
+        if not self.viewers and not self.want_snapshot:
+            return
+        now = time.perf_counter()
+        if now < self.next_capture:
+            return
+        if self.job is not None or frame_work_s + self.copy_cost > STREAM_FRAME_BUDGET_S:
+            # Encoder still busy or no time left in this frame: skip it
+            self.stats["skipped"] += 1
+            return
+        self.job = surface.copy()
+        self.copy_cost = time.perf_counter() - now
+        self.next_capture = now + self.interval
+        self.stats["captured"] += 1
+        self.job_ready.set()
+
+    def _encode_loop(self):
+        while True:
+            self.job_ready.wait()
+            self.job_ready.clear()
+            if self.stopping:
+                return
+            started = time.perf_counter()
+            surface = self.job
+            if self.width and surface.get_width() > self.width:
+                height = max(1, surface.get_height() * self.width // surface.get_width())
+                surface = pygame.transform.smoothscale(surface, (self.width, height))
+
+            crc = zlib.crc32(pygame.image.tobytes(surface, "RGB"))
+            if crc == self.last_crc:
+                self.stats["unchanged"] += 1
+                with self.condition:
+                    self.confirmed_at = time.perf_counter()
+                    self.condition.notify_all()
+            else:
+                buffer = io.BytesIO()
+                pygame.image.save(surface, buffer, "frame.jpg")
+                self.last_crc = crc
+                self.stats["encoded"] += 1
+                with self.condition:
+                    self.latest_surface = surface
+                    self.jpeg = buffer.getvalue()
+                    self.sequence += 1
+                    self.confirmed_at = time.perf_counter()
+                    self.condition.notify_all()
+
+            self.want_snapshot = False
+            self.job = None
+            # Adaptive rate: spend at most half of the time encoding
+            self.interval = max(1 / STREAM_MAX_FPS, 2 * (time.perf_counter() - started))
+
+    def request_frame(self):
+        """Ask the main loop for a frame even if it is idle (blocked in the menu)."""
+        self.want_snapshot = True
+        try:
+            pygame.event.post(pygame.event.Event(STREAM_WAKE_EVENT))
+        except pygame.error:
+            pass
+
+    def wait_frame(self, seen_sequence: int, timeout: float):
+        """Latest (sequence, jpeg) once it differs from seen_sequence or the timeout passes."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != seen_sequence and self.jpeg, timeout)
+            return self.sequence, self.jpeg
+
+    def current_frame(self, timeout: float):
+        """
+        (jpeg, surface) of the picture on screen now. A picture confirmed within
+        STREAM_FRAME_FRESH_S comes back at once; otherwise a capture is asked
+        for and awaited (an unchanged screen confirms the last picture without
+        encoding it again). (None, None) if nothing was encoded in time.
+        """
+        with self.condition:
+            def fresh():
+                return (self.jpeg is not None
+                        and time.perf_counter() - self.confirmed_at <= STREAM_FRAME_FRESH_S)
+            if not fresh():
+                self.request_frame()
+                self.condition.wait_for(fresh, timeout)
+            return self.jpeg, self.latest_surface
+
+class _StreamRequestHandler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_bytes(self, content_type: str, payload: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        streamer = self.server.streamer
+        path = self.path.split("?", 1)[0]
+        if path == "/":
+            page = ("<!doctype html><title>GSSZO Darts Counter</title>"
+                    "<body style='margin:0;background:#000'>"
+                    "<img src='/stream.mjpg' style='width:100vw;height:100vh;object-fit:contain'>")
+            self._send_bytes("text/html; charset=utf-8", page.encode("utf-8"))
+        elif path == "/stream.mjpg":
+            self._stream(streamer)
+        elif path in ("/frame.jpg", "/frame.png"):
+            jpeg, surface = streamer.current_frame(2.0)
+            if jpeg is None:
+                self.send_error(503, "No frame yet")
+            elif path == "/frame.jpg":
+                self._send_bytes("image/jpeg", jpeg)
+            else:
+                buffer = io.BytesIO()
+                pygame.image.save(surface, buffer, "frame.png")
+                self._send_bytes("image/png", buffer.getvalue())
+        else:
+            self.send_error(404)
+
+    def _stream(self, streamer):
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={STREAM_BOUNDARY}")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        with streamer.condition:
+            streamer.viewers += 1
+        streamer.request_frame()
+        try:
+            seen = -1
+            while True:
+                # A slow viewer simply gets the newest frame next; older ones are skipped.
+                # Nothing new within the keepalive period: the last frame goes out again.
+                sequence, jpeg = streamer.wait_frame(seen, STREAM_KEEPALIVE_S)
+                if jpeg is None:
+                    continue
+                seen = sequence
+                self.wfile.write(
+                    f"--{STREAM_BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                    f"Content-Length: {len(jpeg)}\r\n\r\n".encode("ascii")
+                )
+                self.wfile.write(jpeg)
+                self.wfile.write(b"\r\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+            pass
+        finally:
+            with streamer.condition:
+                streamer.viewers -= 1
+
+frame_streamer = None    # FrameStreamer when --stream-port is given
+
+def offer_stream_frame(frame_started: float):
+    """Hand the frame just presented to the streamer; frame_started is when its work began."""
+    if frame_streamer is not None:
+        frame_streamer.offer(screen, time.perf_counter() - frame_started)
+
+# region DARTBOARD INPUT
+#
+# Electronic boards that report every dart over a serial line (--dartboard).
+# The board sends one dart per line: "T20", "D16", "S5" or "5", "SB"/"25",
+# "DB"/"BULL"/"50" and "MISS"/"0"; "NEXT" is the takeout button, which ends
+# the visit early. A reader thread parses the lines and appends darts to a
+# deque (append/popleft are atomic, so neither side takes a lock); the main
+# loop drains it once per frame and builds visits with handle_board_dart().
+
+DART_QUEUE_MAX = 256            # darts waiting for the main loop; older ones are dropped
+DART_READ_TIMEOUT_S = 0.2       # reads return this often so the thread can stop and reconnect
+DART_RECONNECT_S = 2.0
+DART_TAKEOUT_TOKENS = ("NEXT", "TAKEOUT")
+DART_MULTIPLIER_PREFIXES = {"S": 1, "D": 2, "T": 3}
+DART_SPECIAL_TOKENS = {
+    "MISS": (0, 0), "M": (0, 0), "0": (0, 0),
+    "SB": (25, 1), "OB": (25, 1), "25": (25, 1),
+    "DB": (25, 2), "BULL": (25, 2), "50": (25, 2),
+}
+
+def parse_dart(token: str):
+    """One board message -> (segment, multiplier); None for the takeout button. Raises ValueError."""
+    token = token.strip().upper()
+    if token in DART_TAKEOUT_TOKENS:
+        return None
+    if token in DART_SPECIAL_TOKENS:
+        return DART_SPECIAL_TOKENS[token]
+    multiplier = DART_MULTIPLIER_PREFIXES.get(token[:1], 0)
+    number = token[1:] if multiplier else token
+    multiplier = multiplier or 1
+    if number == "25" and multiplier <= 2:   # "S25" / "D25" for the bull
+        return 25, multiplier
+    if not number.isdigit() or not 1 <= int(number) <= 20:
+        raise ValueError(f"not a dart: {token!r}")
+    return int(number), multiplier
+
+def dart_label(dart) -> str:
+    segment, multiplier = dart
+    if multiplier == 0:
+        return "MISS"
+    if segment == 25:
+        return "DB" if multiplier == 2 else "SB"
+    return "SDT"[multiplier - 1] + str(segment)
+
+def _open_serial_source(device: str, baud: int):
+    import serial   # pyserial
+    return serial.Serial(device, baud, timeout=DART_READ_TIMEOUT_S)
+
+class _TtySource:
+    """Raw POSIX tty (or pty) read with termios, for systems without pyserial."""
+
+    def __init__(self, device: str, baud: int):
+        import termios
+        self.fd = os.open(device, os.O_RDONLY | os.O_NOCTTY)
+        attrs = termios.tcgetattr(self.fd)
+        attrs[0] = 0                                    # iflag: no input translation
+        attrs[2] |= termios.CLOCAL | termios.CREAD
+        attrs[3] = 0                                    # lflag: raw, no echo
+        speed = getattr(termios, f"B{baud}", None)
+        if speed is not None:
+            attrs[4] = attrs[5] = speed
+        attrs[6][termios.VMIN] = 0                      # read() returns after VTIME with whatever arrived
+        attrs[6][termios.VTIME] = int(DART_READ_TIMEOUT_S * 10)
+        termios.tcsetattr(self.fd, termios.TCSANOW, attrs)
+
+    def read(self, size: int) -> bytes:
+        return os.read(self.fd, size)
+
+    def close(self):
+        os.close(self.fd)
+
+DARTBOARD_DRIVERS = {
+    "serial": _open_serial_source,
+    "tty": _TtySource,
+}
+
+def default_dartboard_driver() -> str:
+    return "serial" if importlib.util.find_spec("serial") is not None else "tty"
+
+class DartboardReader:
+    def __init__(self, device: str, driver: str = "auto", baud: int = 9600):
+        self.device = device
+        self.driver = default_dartboard_driver() if driver == "auto" else driver
+        self.baud = baud
+        self.queue = deque(maxlen=DART_QUEUE_MAX)   # (received_at, dart or None)
+        self.parsed = 0
+        self.rejected = 0
+        self.connected = False
+        self.stopped = False
+
+    def start(self):
+        threading.Thread(target=self._run, name="dartboard", daemon=True).start()
+
+    def stop(self):
+        self.stopped = True
+
+    def drain(self):
+        darts = []
+        while True:
+            try:
+                darts.append(self.queue.popleft())
+            except IndexError:
+                return darts
+
+    def _run(self):
+        reported = None
+        while not self.stopped:
+            try:
+                source = DARTBOARD_DRIVERS[self.driver](self.device, self.baud)
+            except (OSError, ImportError, ValueError) as exc:
+                if str(exc) != reported:
+                    print(f"Dartboard {self.device}: could not open ({self.driver}):", exc)
+                    reported = str(exc)
+                time.sleep(DART_RECONNECT_S)
+                continue
+            reported = None
+            self.connected = True
+            try:
+                self._read_lines(source)
+            except OSError as exc:
+                print(f"Dartboard {self.device}: disconnected:", exc)
+            finally:
+                self.connected = False
+                source.close()
+
+    def _read_lines(self, source):
+        pending = b""
+        while not self.stopped:
+            chunk = source.read(64)
+            if not chunk:
+                continue
+            received_at = time.perf_counter()
+            pending += chunk.replace(b"\r", b"\n")
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    dart = parse_dart(line.decode("ascii", "replace"))
+                except ValueError:
+                    self.rejected += 1
+                    continue
+                self.parsed += 1
+                self.queue.append((received_at, dart))
+
+dartboard = None   # DartboardReader when --dartboard or --dartboard-selftest is given
+
+def pump_dartboard() -> bool:
+    """Hand the darts that arrived since the last frame to the game (others are dropped)."""
+    if dartboard is None or not dartboard.queue:
+        return False
+    for received_at, dart in dartboard.drain():
+        if state != STATE_GAME:
+            continue
+        latency_tracer.dart_received(received_at)
+        if session_recorder is not None:
+            session_recorder.record_dart(dart)
+        handle_board_dart(dart)
+    return True
+
+class DartboardSimulator:
+    """
+    --dartboard-selftest: plays the board through a pseudo-terminal, so the
+    reader thread, parser and visit building run exactly as with a real board.
+    Starts the match from the menu and presses Enter on the end screen to
+    start the next one, with keys, so --record captures the whole session.
+    """
+
+    DARTS = ("T20", "20", "S20", "T19", "19", "D16", "5", "1", "SB", "DB", "MISS", "D20", "T18")
+
+    def __init__(self, total_darts: int, rate_hz: float, seed: int = 0):
+        import pty
+        self.master, slave = pty.openpty()
+        self.device = os.ttyname(slave)
+        self.slave = slave   # kept open so the reader's reconnects never see a hang-up
+        self.remaining = total_darts
+        self.sent = 0
+        self.interval = 1.0 / max(1.0, rate_hz)
+        self.next_at = time.perf_counter()
+        self.rng = random.Random(seed)
+        post_menu_start_keys()
+
+    def _next_dart(self) -> str:
+        """A random dart, or (half the time) the double that finishes when one is on."""
+        left = START_SCORE - leg_totals[active_player] - sum(s * m for s, m in visit_darts)
+        if self.rng.random() < 0.5:
+            if left == 50:
+                return "DB"
+            if left <= 40 and left % 2 == 0:
+                return f"D{left // 2}"
+        return self.rng.choice(self.DARTS)
+
+    def pump(self) -> bool:
+        """Send the darts that are due; returns False once every dart has been read back."""
+        now = time.perf_counter()
+        while self.remaining > 0 and now >= self.next_at:
+            if state == STATE_END:
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode="\r", mod=0, scancode=0))
+            else:
+                os.write(self.master, self._next_dart().encode("ascii") + b"\r\n")
+                self.sent += 1
+            self.remaining -= 1
+            self.next_at += self.interval
+        return self.remaining > 0 or dartboard.parsed + dartboard.rejected < self.sent or bool(dartboard.queue)
+
+# region RENDER THREAD
+#
+# During a match the main thread only handles input, updates the state and
+# takes a GameSnapshot; the render thread draws snapshots into off-screen
+# buffers and the main thread puts the newest finished one on the display.
+# There are three buffers (one being drawn, one finished, one being shown), so
+# neither thread waits for the other's frames; the lock only guards index
+# swaps. frame_lock makes a menu or end-screen draw, or a relayout, on the
+# main thread wait for the frame in flight, which is the only overlap left.
+# SDL wants the display itself (flip, set_mode, events) on the main thread.
+
+GAME_FRAME_INTERVAL_S = 1 / 60          # snapshots for animation at full quality; input takes one at once
+GAME_IDLE_POLL_S = 0.1                  # longest sleep in a match (dartboard, win chance) when nothing animates
+RENDER_DONE_EVENT = pygame.event.custom_type()   # wakes the main loop to present a finished frame
+
+class RenderWorker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.snapshot = None        # newest GameSnapshot; replaced whole, never mutated
+        self.buffers = [None, None, None]
+        self.free = [0, 1, 2]
+        self.ready = None           # (buffer index, snapshot seq) of the newest finished frame
+        self.render_ms = LatencyHistogram()
+        self.last_render_ms = 0.0   # draw time of the newest finished frame
+        self.last_taken_at = None
+
+    def start(self):
+        threading.Thread(target=self._run, name="render", daemon=True).start()
+
+    def publish(self, snapshot: GameSnapshot):
+        self.snapshot = snapshot
+        self.wake.set()
+
+    def _run(self):
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            snap = self.snapshot
+            with self.lock:
+                index = self.free.pop()
+            target = self.buffers[index]
+            if target is None or target.get_size() != (snap.width, snap.height):
+                target = self.buffers[index] = pygame.Surface((snap.width, snap.height)).convert()
+            # Animations advance by the time between the snapshots actually drawn
+            # (capped, so coming back to a match does not jump the ticker)
+            frame_dt = min(0.1, snap.taken_at - self.last_taken_at) if self.last_taken_at is not None else 0.0
+            self.last_taken_at = snap.taken_at
+            started = time.perf_counter()
+            try:
+                with frame_lock:
+                    draw_game_frame(target, snap, frame_dt)
+                self.last_render_ms = (time.perf_counter() - started) * 1000.0
+                self.render_ms.add(self.last_render_ms)
+                with self.lock:
+                    if self.ready is not None:
+                        self.free.append(self.ready[0])   # never shown, superseded
+                    self.ready = (index, snap.seq)
+                pygame.event.post(pygame.event.Event(RENDER_DONE_EVENT))
+            except pygame.error:
+                if not pygame.get_init() or not pygame.display.get_init():
+                    return   # the main thread shut pygame down mid-frame
+                raise
+
+    def present(self, surface):
+        """Copy the newest finished frame onto surface; returns its snapshot seq, or None if there is none."""
+        with self.lock:
+            ready, self.ready = self.ready, None
+        if ready is None:
+            return None
+        index, seq = ready
+        frame = self.buffers[index]
+        shown = frame.get_size() == surface.get_size()   # frames from before a resize are dropped
+        if shown:
+            surface.blit(frame, (0, 0))
+        with self.lock:
+            self.free.append(index)
+        return seq if shown else None
+
+render_worker = RenderWorker()
+
+# region QUALITY GOVERNOR
+#
+# Boards range from old netbooks to NUCs, so the game screen steps through
+# quality tiers by itself. Every presented frame reports what it cost (render
+# thread draw plus present); every QUALITY_WINDOW_S the p90 of those costs is
+# compared with the tier's frame budget. Stepping down needs two slow windows
+# in a row, stepping up needs several fast ones against the finer tier's
+# budget and QUALITY_UPGRADE_HOLD_S since the last change, so the tier does not
+# flap around a threshold; a tier given up soon after it was tried waits twice
+# as long before the next try. Two windows in a row slower than
+# QUALITY_RESPONSIVE_MS drop straight to the last tier: keeping input
+# responsive comes before polish. The last tier has nothing moving, so in auto
+# mode it keeps drawing at its rate to have frames to judge a finer tier by,
+# and a board that ended up there last run starts one tier finer and earns it
+# again.
+
+QUALITY_TIERS = (
+    # rotation: how the logo ring turns (None: it stands still); angle_step: its angle
+    # is rounded to this many degrees; animation_hz: snapshot rate for logo and ticker
+    {"name": "full", "smooth_scale": True, "rotation": "rotozoom", "angle_step": 0.0,
+     "animation_hz": round(1 / GAME_FRAME_INTERVAL_S)},
+    {"name": "reduced", "smooth_scale": True, "rotation": "rotozoom", "angle_step": 3.0, "animation_hz": 30},
+    {"name": "low", "smooth_scale": False, "rotation": "rotate", "angle_step": 6.0, "animation_hz": 15},
+    {"name": "minimal", "smooth_scale": False, "rotation": None, "angle_step": 0.0, "animation_hz": 10},
+)
+QUALITY_NAMES = tuple(tier["name"] for tier in QUALITY_TIERS)
+QUALITY_WINDOW_S = 2.0
+QUALITY_MIN_FRAMES = 10            # fewer frames in a window say nothing (idle screen)
+QUALITY_DOWN_AT = 0.75             # p90 above this share of the tier's frame budget is slow...
+QUALITY_DOWN_WINDOWS = 2           # ...for this many windows in a row
+QUALITY_UP_AT = 0.5                # p90 below this share of the finer tier's budget is fast...
+QUALITY_UP_WINDOWS = 5             # ...for this many windows in a row
+QUALITY_UPGRADE_HOLD_S = 20.0
+QUALITY_UPGRADE_HOLD_MAX_S = 600.0
+QUALITY_RESPONSIVE_MS = 50.0
+
+class QualityGovernor:
+    def __init__(self):
+        self.auto = True
+        self.level = 0
+        self.window = []            # frame costs (ms) of the current window
+        self.window_started = None
+        self.slow_windows = 0
+        self.fast_windows = 0
+        self.stalled_windows = 0    # windows in a row slower than QUALITY_RESPONSIVE_MS
+        self.changed_at = 0.0
+        self.upgrade_hold = QUALITY_UPGRADE_HOLD_S
+        self.raised = False         # the last change was to a finer tier
+        self.changes = []           # (perf_counter time, tier name, window p90 ms)
+        self.path = None            # where the chosen tier is kept between runs
+
+    @property
+    def tier(self) -> dict:
+        return QUALITY_TIERS[self.level]
+
+    def animation_interval(self, ticker: bool) -> float:
+        """Seconds until the next animation snapshot (inf when nothing on screen moves and nothing is measured)."""
+        if not ticker and self.tier["rotation"] is None and not self.auto:
+            return math.inf
+        return 1.0 / self.tier["animation_hz"]
+
+    def logo_angle(self, angle: float) -> float:
+        step = self.tier["angle_step"]
+        return round(angle / step) * step % 360.0 if step else angle
+
+    def observe(self, cost_ms: float, now: float):
+        """One presented game frame and what it cost."""
+        if not self.auto:
+            return
+        if self.window_started is None:
+            self.window_started = now
+        self.window.append(cost_ms)
+        if now - self.window_started >= QUALITY_WINDOW_S:
+            self._evaluate(now)
+
+    def _evaluate(self, now: float):
+        window, self.window, self.window_started = self.window, [], now
+        if len(window) < QUALITY_MIN_FRAMES:
+            return
+        window.sort()
+        p90 = window[int(len(window) * 0.9)]
+        budget = 1000.0 / self.tier["animation_hz"]
+        last = len(QUALITY_TIERS) - 1
+        self.stalled_windows = self.stalled_windows + 1 if p90 > QUALITY_RESPONSIVE_MS else 0
+        if self.stalled_windows >= QUALITY_DOWN_WINDOWS and self.level < last:
+            self.set_level(last, p90, now)
+            return
+        self.slow_windows = self.slow_windows + 1 if p90 > QUALITY_DOWN_AT * budget else 0
+        finer = QUALITY_TIERS[self.level - 1] if self.level else None
+        fast = finer is not None and p90 < QUALITY_UP_AT * 1000.0 / finer["animation_hz"]
+        self.fast_windows = self.fast_windows + 1 if fast else 0
+        if self.slow_windows >= QUALITY_DOWN_WINDOWS and self.level < last:
+            self.set_level(self.level + 1, p90, now)
+        elif self.fast_windows >= QUALITY_UP_WINDOWS and now - self.changed_at >= self.upgrade_hold:
+            self.set_level(self.level - 1, p90, now)
+
+    def set_level(self, level: int, p90: float = None, now: float = None):
+        now = time.perf_counter() if now is None else now
+        if level > self.level:
+            # A tier given up soon after it was tried waits longer before the next try
+            if self.raised and now - self.changed_at < self.upgrade_hold:
+                self.upgrade_hold = min(2 * self.upgrade_hold, QUALITY_UPGRADE_HOLD_MAX_S)
+            else:
+                self.upgrade_hold = QUALITY_UPGRADE_HOLD_S
+        self.raised = level < self.level
+        self.level = level
+        self.slow_windows = self.fast_windows = self.stalled_windows = 0
+        self.changed_at = now
+        self.changes.append((now, self.tier["name"], p90))
+        logo_scale_cache.clear()    # layers are scaled per tier
+        if p90 is not None:
+            print(f"Render quality: {self.tier['name']} (frame p90 {p90:.1f} ms)")
+            self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as handle:
+                json.dump({"tier": self.tier["name"], "chosen_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                           "frame_p90_ms": round(self.changes[-1][2] or 0.0, 2)}, handle)
+        except OSError as exc:
+            print("Could not save the render quality:", exc)
+
+    def start(self, setting: str, path: str):
+        """
+        --quality: a tier name pins it; "auto" starts from the tier this board
+        settled on last time, or one finer than the last tier, which must be
+        earned again.
+        """
+        self.path = path
+        if setting != "auto":
+            self.auto = False
+            self.level = QUALITY_NAMES.index(setting)
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                self.level = min(QUALITY_NAMES.index(json.load(handle)["tier"]), len(QUALITY_TIERS) - 2)
+        except (OSError, ValueError, KeyError):
+            self.level = 0
+
+    def summary_line(self) -> str:
+        mode = "auto" if self.auto else "fixed"
+        return f"quality: {self.tier['name']} ({mode}, {len(self.changes)} changes)"
+
+quality = QualityGovernor()
+
+RENDER_BENCH_DISPLAYS = ((1920, 1080), (2560, 1440), (3840, 2160))
+RENDER_BENCH_HEIGHTS = (0, 1080, 720)
+
+def benchmark_render(frames: int = 120, seed: int = 0):
+    """Game frame draw and upscale times for each display size at native and internal render heights."""
+    global RENDER_HEIGHT, current_input
+    rng = random.Random(seed)
+    window = pygame.display.get_surface()
+    saved_height = RENDER_HEIGHT
+    print(f"{frames} frames per case, upscale filter {RENDER_FILTER}, quality {quality.tier['name']}")
+    for display_size in RENDER_BENCH_DISPLAYS:
+        fake_display = pygame.Surface(display_size, 0, window)
+        for height in RENDER_BENCH_HEIGHTS:
+            if height >= display_size[1]:
+                continue
+            RENDER_HEIGHT = height
+            configure_render_target(fake_display)
+            compute_layout()
+            reset_game(501, ["Player 1", "Player 2"], 3, True, True)
+            for _ in range(6):
+                current_input = str(rng.choice((26, 41, 45, 60, 81, 85, 100, 140)))
+                commit_throw()
+            draw_costs, upscale_costs = [], []
+            for _ in range(frames):
+                started = time.perf_counter()
+                draw_game_frame(screen, game_snapshot(), GAME_FRAME_INTERVAL_S)
+                drawn = time.perf_counter()
+                if screen is not display_surface:
+                    upscale_frame(screen, display_surface)
+                draw_costs.append((drawn - started) * 1000.0)
+                upscale_costs.append((time.perf_counter() - drawn) * 1000.0)
+            totals = sorted(d + u for d, u in zip(draw_costs, upscale_costs))
+            draw_costs.sort()
+            upscale_costs.sort()
+            label = f"{WIDTH}x{HEIGHT}" if height else "native"
+            print(f"{display_size[0]}x{display_size[1]} {label:>10}: draw p50 {draw_costs[frames // 2]:6.2f} ms, "
+                  f"upscale p50 {upscale_costs[frames // 2]:6.2f} ms, "
+                  f"total p50 {totals[frames // 2]:6.2f} ms, p90 {totals[int(frames * 0.9)]:6.2f} ms")
+    RENDER_HEIGHT = saved_height
+    configure_render_target(window)
+    compute_layout()
+
+# region SESSION RECORDING
+#
+# --record FILE writes every event the menu / game / end handlers receive to a
+# JSONL file: a header line, one line per event ({"f": frame, "t": seconds,
+# "type": ..., plus the event's fields}) and, on exit, a "final" line with the
+# match state and frame-time percentiles. Board darts are recorded as "Dart"
+# lines with the frame they were handed to the game on. --replay FILE feeds
+# such a session back through the real main loop, headless, in real time or as
+# fast as possible, then compares the final state and reports the frame times.
+
+SESSION_FORMAT_VERSION = 1
+RECORDED_EVENT_TYPES = (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION,
+                        pygame.VIDEORESIZE, pygame.QUIT)
+RECORDED_EVENT_NAMES = {pygame.event.event_name(t): t for t in RECORDED_EVENT_TYPES}
+RECORDED_DART = "Dart"
+RECORDED_EVENT_FIELDS = ("key", "unicode", "mod", "scancode", "pos", "rel", "buttons", "button", "size", "w", "h")
+
+frame_times = LatencyHistogram()   # work per main-loop frame (drawing + presenting), in ms
+
+def session_summary():
+    """Everything a replay must reproduce, as plain JSON data."""
+    return {
+        "state": state,
+        "players": list(player_names),
+        "start_score": START_SCORE,
+        "legs_to_win": LEGS_TO_WIN,
+        "double_out": DOUBLE_OUT_ENABLED,
+        "legs_won": list(legs_won),
+        "active_player": active_player,
+        "leg_starter": leg_starter_idx,
+        "winner": winner_idx,
+        "scores": [list(player_scores) for player_scores in scores],
+        "finished_legs": len(finished_legs_stack),
+        "archived": archived_match_count,
+        "menu": dict(menu_values),
+    }
+
+def frame_time_summary():
+    return {
+        "frames": frame_times.total,
+        "p50_ms": round(frame_times.percentile(50), 3),
+        "p99_ms": round(frame_times.percentile(99), 3),
+        "max_ms": round(frame_times.max_ms, 3),
+        "quality": quality.tier["name"],
+        "quality_changes": [[name, round(p90, 2) if p90 is not None else None] for _, name, p90 in quality.changes],
+    }
+
+class SessionRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = open(path, "w", encoding="utf-8")
+        self.started = time.perf_counter()
+        self.count = 0
+        self.frame = 0
+        self._write({"version": SESSION_FORMAT_VERSION, "size": [WIDTH, HEIGHT],
+                     "fullscreen": current_fullscreen, "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        atexit.register(self.finish)
+
+    def _write(self, record):
+        self.handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def record(self, frame: int, events):
+        self.frame = frame
+        now = time.perf_counter() - self.started
+        for event in events:
+            if event.type not in RECORDED_EVENT_TYPES:
+                continue
+            record = {"f": frame, "t": round(now, 4), "type": pygame.event.event_name(event.type)}
+            for field in RECORDED_EVENT_FIELDS:
+                if hasattr(event, field):
+                    value = getattr(event, field)
+                    record[field] = list(value) if isinstance(value, tuple) else value
+            self._write(record)
+            self.count += 1
+
+    def record_dart(self, dart):
+        """A board dart handed to the game in the current frame (None: takeout button)."""
+        self._write({"f": self.frame, "t": round(time.perf_counter() - self.started, 4), "type": RECORDED_DART,
+                     "dart": list(dart) if dart is not None else None})
+        self.count += 1
+
+    def finish(self):
+        if self.handle.closed:
+            return
+        self._write({"final": session_summary(), "frame_times": frame_time_summary(), "events": self.count})
+        self.handle.close()
+        print(f"Recorded {self.count} events to {self.path}")
+
+class ReplayedDartboard:
+    """Stands in for the DartboardReader on --replay: the recorded darts, on their recorded frames."""
+
+    def __init__(self):
+        self.queue = deque()
+        self.parsed = 0
+        self.rejected = 0
+
+    def drain(self):
+        darts = list(self.queue)
+        self.queue.clear()
+        return darts
+
+class SessionReplayer:
+    """Posts a recorded session's events back into the pygame queue."""
+
+    def __init__(self, path: str, realtime: bool):
+        self.realtime = realtime
+        self.header = {}
+        self.final = None
+        self.events = deque()
+        with open(path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "version" in record:
+                    self.header = record
+                elif "final" in record:
+                    self.final = record
+                else:
+                    self.events.append(record)
+        has_darts = any(record["type"] == RECORDED_DART for record in self.events)
+        self.board = ReplayedDartboard() if has_darts else None
+        self.started = None
+        self.frame = None
+
+    def _post(self, record):
+        if record["type"] == RECORDED_DART:
+            dart = record["dart"]
+            self.board.queue.append((time.perf_counter(), tuple(dart) if dart is not None else None))
+            self.board.parsed += 1
+            return
+        fields = {k: v for k, v in record.items() if k not in ("f", "t", "type")}
+        for name in ("pos", "rel", "size"):
+            if name in fields:
+                fields[name] = tuple(fields[name])
+        pygame.event.post(pygame.event.Event(RECORDED_EVENT_NAMES[record["type"]], **fields))
+
+    def pump(self):
+        """Post the events that are due: by timestamp in real time, else one recorded frame per loop."""
+        if not self.events:
+            return
+        if self.started is None:
+            self.started = time.perf_counter()
+        if self.realtime:
+            elapsed = time.perf_counter() - self.started
+            while self.events and self.events[0]["t"] <= elapsed:
+                self._post(self.events.popleft())
+        else:
+            frame = self.events[0]["f"]
+            while self.events and self.events[0]["f"] == frame:
+                self._post(self.events.popleft())
+
+    def next_due_ms(self):
+        """Milliseconds until the next event (real time only), for bounded waits in the menu."""
+        if not self.realtime or not self.events or self.started is None:
+            return 0
+        return max(1, int((self.events[0]["t"] - (time.perf_counter() - self.started)) * 1000))
+
+    def done(self) -> bool:
+        return not self.events and not (self.board is not None and self.board.queue)
+
+    def finish(self, budget_ms: float = None) -> int:
+        """Compare against the recording; returns the process exit code."""
+        ours = frame_time_summary()
+        print(f"Replayed {ours['frames']} frames: p50 {ours['p50_ms']:.2f} ms  "
+              f"p99 {ours['p99_ms']:.2f} ms  max {ours['max_ms']:.2f} ms")
+        failed = False
+        if self.final is None:
+            print("Recording has no final state (the session did not exit cleanly); state not checked")
+        else:
+            recorded = self.final.get("frame_times", {})
+            if recorded:
+                print(f"Recorded  {recorded['frames']} frames: p50 {recorded['p50_ms']:.2f} ms  "
+                      f"p99 {recorded['p99_ms']:.2f} ms  max {recorded['max_ms']:.2f} ms")
+            expected, actual = self.final["final"], session_summary()
+            mismatched = [key for key in expected if expected[key] != actual.get(key)]
+            for key in mismatched:
+                print(f"  final {key}: recorded {expected[key]!r}, replayed {actual.get(key)!r}")
+            if mismatched:
+                failed = True
+            else:
+                print("Final state matches the recording")
+        if budget_ms is not None and ours["p99_ms"] > budget_ms:
+            print(f"Frame time p99 {ours['p99_ms']:.2f} ms is over the {budget_ms:.2f} ms budget")
+            failed = True
+        return 1 if failed else 0
+
+session_recorder = None   # SessionRecorder when --record is given
 
 # region MAIN LOOP
 
+# Event types no screen reacts to; they are dropped by SDL instead of waking the loop
+UNUSED_EVENT_TYPES = [
+    getattr(pygame, name) for name in (
+        "KEYUP", "MOUSEBUTTONUP", "MOUSEWHEEL",
+        "JOYAXISMOTION", "JOYBALLMOTION", "JOYHATMOTION", "JOYBUTTONDOWN", "JOYBUTTONUP",
+        "JOYDEVICEADDED", "JOYDEVICEREMOVED",
+        "CONTROLLERAXISMOTION", "CONTROLLERBUTTONDOWN", "CONTROLLERBUTTONUP",
+        "CONTROLLERDEVICEADDED", "CONTROLLERDEVICEREMOVED", "CONTROLLERDEVICEREMAPPED",
+        "FINGERMOTION", "FINGERDOWN", "FINGERUP", "MULTIGESTURE",
+        "AUDIODEVICEADDED", "AUDIODEVICEREMOVED",
+        "DROPFILE", "DROPTEXT", "DROPBEGIN", "DROPCOMPLETE",
+        "WINDOWMOVED", "WINDOWENTER", "WINDOWLEAVE",
+    )
+    if hasattr(pygame, name)
+]
+
+# Events that mean the window contents were lost and the menu must be repainted
+EXPOSE_EVENT_TYPES = tuple(
+    getattr(pygame, name) for name in ("VIDEOEXPOSE", "WINDOWEXPOSED", "WINDOWRESTORED")
+    if hasattr(pygame, name)
+)
+
+def allow_events_for_state(current_state):
+    """Only let the event types the given screen handles into the queue."""
+    pygame.event.set_blocked(UNUSED_EVENT_TYPES)
+    allowed = [pygame.QUIT, pygame.KEYDOWN, pygame.VIDEORESIZE, STREAM_WAKE_EVENT, RENDER_DONE_EVENT,
+               *EXPOSE_EVENT_TYPES]
+    if current_state == STATE_MENU:
+        # Clicks and hover highlights are only used by the menu
+        allowed += [pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION]
+        pygame.event.set_allowed(allowed)
+    else:
+        pygame.event.set_allowed(allowed)
+        pygame.event.set_blocked([pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION])
+
+def wait_for_events(timeout_ms: int = 0):
+    """Sleep until at least one allowed event arrives (or timeout_ms passes), then drain the queue."""
+    first = pygame.event.wait(timeout_ms) if timeout_ms > 0 else pygame.event.wait()
+    events = pygame.event.get()
+    return events if first.type == pygame.NOEVENT else [first] + events
+
+# region STARTUP
+
+class StartupTrace:
+    """Timestamps of the startup phases, printed once the first frame is on screen."""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.marks = [("module import", time.perf_counter())]
+
+    def mark(self, phase: str):
+        if self.enabled:
+            self.marks.append((phase, time.perf_counter()))
+
+    def finish(self):
+        if not self.enabled:
+            return
+        self.mark("first frame")
+        print("Startup timeline (ms):")
+        previous = _STARTUP_T0
+        for phase, stamp in self.marks:
+            print(f"  {phase:<16} +{(stamp - previous) * 1000:7.1f}   @ {(stamp - _STARTUP_T0) * 1000:7.1f}")
+            previous = stamp
+        self.enabled = False
+
+startup_trace = StartupTrace(False)
+
+def init_app():
+    """Bring up only the pygame subsystems the scoreboard uses and open the window once."""
+    # pygame.init() would also start the mixer, joystick and other unused subsystems
+    pygame.display.init()
+    pygame.font.init()
+    startup_trace.mark("pygame init")
+
+    _set_window_icon()
+    pygame.display.set_caption("GSSZO Darts Counter")
+    startup_trace.mark("window icon")
+
+    apply_display_mode(True, force=True)
+    startup_trace.mark("display mode")
+
+    load_logo_assets()
+    startup_trace.mark("logo assets")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="GSSZO Darts Counter")
+    parser.add_argument("--pack-assets", action="store_true",
+                        help="decode all images into the raw-pixel asset bundle and exit")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="print a timestamped breakdown of the startup phases")
+    parser.add_argument("--import", dest="import_files", metavar="FILE", nargs="+",
+                        help="replay JSON/CSV scoresheets through the rules into the archive and exit")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="with --import: only check the scoresheets, do not write the archive")
+    parser.add_argument("--archive", metavar="PATH",
+                        help=f"match archive file (default: {MATCH_ARCHIVE_PATH})")
+    parser.add_argument("--bench-rules", metavar="N", type=int, nargs="?", const=1_000_000,
+                        help="benchmark N rules-kernel transitions (default 1,000,000) and exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="render to an off-screen dummy display (for measurements)")
+    parser.add_argument("--latency-log", metavar="PATH",
+                        help="write the input latency histogram to PATH on exit")
+    parser.add_argument("--inject-keys", metavar="N", type=int, default=0,
+                        help="start a match and feed it N synthetic keypresses, then exit")
+    parser.add_argument("--inject-rate", metavar="HZ", type=float, default=20.0,
+                        help="synthetic keypresses per second for --inject-keys (default: 20)")
+    parser.add_argument("--stream-port", metavar="PORT", type=int,
+                        help="serve the scoreboard as an MJPEG/PNG stream over HTTP on PORT")
+    parser.add_argument("--stream-bind", metavar="ADDRESS",
+                        help="address the stream listens on (default: this PC's local network address; "
+                             "0.0.0.0 for all interfaces, 127.0.0.1 for this PC only)")
+    parser.add_argument("--stream-width", metavar="PX", type=int, default=1280,
+                        help="scale streamed frames down to this width (default: 1280, 0 = full size)")
+    parser.add_argument("--dartboard", metavar="DEVICE",
+                        help="read darts from an electronic board on a serial port (e.g. /dev/ttyUSB0, COM3)")
+    parser.add_argument("--dartboard-driver", choices=("auto", *DARTBOARD_DRIVERS), default="auto",
+                        help="serial = pyserial, tty = raw POSIX tty; auto uses pyserial when installed")
+    parser.add_argument("--dartboard-baud", metavar="BAUD", type=int, default=9600,
+                        help="serial speed of the dartboard (default: 9600)")
+    parser.add_argument("--dartboard-selftest", metavar="N", type=int, default=0,
+                        help="start a match, throw N simulated darts through a pseudo-terminal board, then exit")
+    parser.add_argument("--reports", metavar="DIR",
+                        help="render a report page for each archived match of --report-date into DIR and exit")
+    parser.add_argument("--report-date", metavar="YYYY-MM-DD", default=time.strftime("%Y-%m-%d"),
+                        help='with --reports: the day to report on, or "all" (default: today)')
+    parser.add_argument("--report-format", choices=REPORT_FORMATS, nargs="+", default=["png"],
+                        help="with --reports: output formats (default: png)")
+    parser.add_argument("--report-workers", metavar="N", type=int,
+                        help="with --reports: worker processes (default: one per CPU)")
+    parser.add_argument("--report-dark", action="store_true",
+                        help="with --reports: use the dark theme instead of the printable light one")
+    parser.add_argument("--ratings", action="store_true",
+                        help="print the player ratings from the archive and exit")
+    parser.add_argument("--rebuild-ratings", action="store_true",
+                        help="recompute the player ratings from the whole archive")
+    parser.add_argument("--bench-ratings", metavar="MATCHES", type=int, nargs="?", const=50_000,
+                        help="rate a synthetic history one match at a time and by batched rebuild, "
+                             "then exit (default 50000)")
+    parser.add_argument("--tournament", metavar="FILE",
+                        help="play the tournament in FILE: the menu is prefilled with each next match "
+                             "and results are recorded (created with --tournament-format/--tournament-players)")
+    parser.add_argument("--tournament-format", choices=TOURNAMENT_FORMATS,
+                        help="with --tournament: create a new tournament of this format")
+    parser.add_argument("--tournament-players", metavar="NAME", nargs="+",
+                        help="with --tournament-format: the players, best seed first")
+    parser.add_argument("--tournament-legs", metavar="N", type=int, default=2,
+                        help="with --tournament-format: legs to win each match (default: 2)")
+    parser.add_argument("--tournament-groups", metavar="N", type=int, default=1,
+                        help="with --tournament-format roundrobin: number of groups (default: 1)")
+    parser.add_argument("--tournament-seed-by-rating", action="store_true",
+                        help="with --tournament-format: seed the players by rating instead of the given order")
+    parser.add_argument("--tournament-standings", action="store_true",
+                        help="with --tournament: print the standings and exit")
+    parser.add_argument("--tournament-schedule", metavar="BOARDS", type=int,
+                        help="with --tournament: plan the remaining matches on BOARDS boards using match "
+                             "lengths learned from the archive, print the plan and exit")
+    parser.add_argument("--bench-tournament", metavar="N", type=int, nargs="?", const=256,
+                        help="play out N-player tournaments of each format with random results and exit (default 256)")
+    parser.add_argument("--bench-scheduler", metavar="DAYS", type=int, nargs="?", const=20,
+                        help="simulate DAYS synthetic tournament days on several boards, compare planned and "
+                             "bracket-order board assignment and time the re-plans, then exit (default 20)")
+    parser.add_argument("--quality", choices=("auto",) + QUALITY_NAMES, default="auto",
+                        help="render quality tier; auto (default) steps between them by measured frame times "
+                             "and starts where it settled last time")
+    parser.add_argument("--render-height", metavar="PX", type=int, default=0,
+                        help="draw at this internal height (e.g. 1080 on a 4K display) and upscale each frame "
+                             "to the window (default: 0 = native resolution)")
+    parser.add_argument("--render-filter", choices=("auto", "smooth", "nearest"), default="auto",
+                        help="with --render-height: upscale filter; auto repeats pixels at whole-number factors "
+                             "(e.g. 1080 on 4K) and scales smoothly otherwise (default: auto)")
+    parser.add_argument("--bench-render", metavar="FRAMES", type=int, nargs="?", const=120,
+                        help="time game frames at native and internal render heights for 1080p, 1440p and "
+                             "4K displays, then exit (default 120 frames per case)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record every input event of this session (with timestamps) to FILE")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recorded session headlessly, then check the final state and frame times")
+    parser.add_argument("--replay-speed", choices=("max", "realtime"), default="max",
+                        help="with --replay: as fast as possible (default) or at the recorded pace")
+    parser.add_argument("--replay-budget", metavar="MS", type=float,
+                        help="with --replay: fail if the p99 frame time is above MS")
+    parser.add_argument("--soak", metavar="N", type=int,
+                        help="play N simulated matches headlessly, check memory stays bounded and exit")
+    parser.add_argument("--win-chance", metavar="N", type=int, nargs="?", const=WIN_CHANCE_SIMULATIONS,
+                        help=f"show live win chances from N simulated match endings "
+                             f"(default {WIN_CHANCE_SIMULATIONS:,}; needs NumPy)")
+    return parser.parse_args(argv)
+
 def main():
-    global state, active_input_key
+    global state, active_input_key, MATCH_ARCHIVE_PATH, frame_streamer, session_recorder, dartboard
+    global tournament, tournament_path, RENDER_HEIGHT, RENDER_FILTER
+
+    args = parse_args()
+    if args.pack_assets:
+        count = pack_asset_bundle()
+        print(f"Packed {count} images into {ASSET_BUNDLE_PATH}")
+        return
+    if args.bench_rules:
+        benchmark_rules(args.bench_rules)
+        return
+    if args.bench_tournament:
+        benchmark_tournament(args.bench_tournament)
+        return
+    if args.bench_scheduler:
+        benchmark_scheduler(args.bench_scheduler)
+        return
+    if args.bench_ratings:
+        benchmark_ratings(args.bench_ratings)
+        return
+    if args.archive:
+        MATCH_ARCHIVE_PATH = args.archive
+    if args.import_files:
+        flagged = import_scoresheets(args.import_files, dry_run=args.dry_run)
+        sys.exit(1 if flagged else 0)
+    if args.rebuild_ratings and os.path.exists(ratings_path()):
+        os.remove(ratings_path())
+    if args.ratings or args.rebuild_ratings or args.tournament_seed_by_rating:
+        load_ratings()
+    if args.ratings:
+        print_ratings()
+        return
+    if args.reports:
+        reported = export_match_reports(args.reports, args.report_date, args.report_format,
+                                        args.report_workers, args.report_dark)
+        sys.exit(0 if reported else 1)
+    if args.tournament:
+        try:
+            if args.tournament_format:
+                players = args.tournament_players or []
+                if args.tournament_seed_by_rating:
+                    players = sorted(players, key=lambda name: -(player_ratings.rating(name) or RATING_START))
+                tournament = Tournament(args.tournament_format, players,
+                                        args.tournament_legs, args.tournament_groups)
+                save_tournament(tournament, args.tournament)
+            else:
+                tournament = load_tournament(args.tournament)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            print(f"{args.tournament}: could not set up the tournament:", exc)
+            sys.exit(1)
+        tournament_path = args.tournament
+        if args.tournament_standings:
+            print("\n".join(tournament.standings_lines()))
+            return
+        if args.tournament_schedule:
+            print_board_schedule(tournament, max(1, args.tournament_schedule), START_SCORE)
+            return
 
+    replayer = None
+    if args.replay:
+        try:
+            replayer = SessionReplayer(args.replay, args.replay_speed == "realtime")
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"{args.replay}: could not read session:", exc)
+            sys.exit(1)
+
+    startup_trace.enabled = args.startup_trace
+    RENDER_HEIGHT = max(0, args.render_height)
+    RENDER_FILTER = args.render_filter
+    if args.headless or args.soak or args.replay or args.bench_render:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+    if args.bench_render:
+        MATCH_ARCHIVE_PATH = os.path.join(tempfile.mkdtemp(prefix="gsszo_"), "matches.jsonl")
+        init_app()
+        benchmark_render(max(10, args.bench_render))
+        pygame.quit()
+        return
+    if (args.soak or args.replay) and not args.archive:
+        # Keep simulated and replayed matches out of the real archive
+        MATCH_ARCHIVE_PATH = os.path.join(tempfile.mkdtemp(prefix="gsszo_"), "matches.jsonl")
+    if args.soak:
+        init_app()
+        bounded = run_soak(args.soak)
+        pygame.quit()
+        sys.exit(0 if bounded else 1)
+    if args.latency_log:
+        atexit.register(export_latency_report, args.latency_log)
+    if args.win_chance:
+        if importlib.util.find_spec("numpy") is None:
+            print("Win chance overlay needs NumPy; running without it")
+        else:
+            win_chance.enabled = True
+            win_chance.simulations = max(100, args.win_chance)
+    load_ratings()
+    quality.start(args.quality, os.path.join(os.path.dirname(os.path.abspath(MATCH_ARCHIVE_PATH)),
+                                             "render_quality.json"))
+    init_app()
+    if tournament is not None:
+        prefill_tournament_match()
+    sponsor_ticker.start_watching()
+    render_worker.start()
+    if args.stream_port:
+        frame_streamer = FrameStreamer(args.stream_port, args.stream_width, args.stream_bind)
+        frame_streamer.start()
+
+    injector = None
+    if args.inject_keys > 0:
+        injector = KeyInjector(args.inject_keys, args.inject_rate)
+    elif args.dartboard_selftest > 0:
+        try:
+            injector = DartboardSimulator(args.dartboard_selftest, args.inject_rate)
+        except (ImportError, OSError) as exc:
+            print("Dartboard self-test needs pseudo-terminals (Linux/macOS):", exc)
+            sys.exit(1)
+        dartboard = DartboardReader(injector.device, "tty")
+        dartboard.start()
+    if replayer is not None and replayer.board is not None:
+        dartboard = replayer.board
+    if args.dartboard and dartboard is None:
+        dartboard = DartboardReader(args.dartboard, args.dartboard_driver, args.dartboard_baud)
+        dartboard.start()
+
+    if replayer is not None:
+        size = replayer.header.get("size")
+        if size and not replayer.header.get("fullscreen", True):
+            # Mouse positions in the recording refer to its window size
+            apply_window_size(*size)
+    if args.record:
+        session_recorder = SessionRecorder(args.record)
+
+    try:
+        run_main_loop(injector, replayer)
+    except SystemExit:
+        if replayer is None:
+            raise
+        sys.exit(replayer.finish(args.replay_budget))
+
+def run_main_loop(injector=None, replayer=None):
+    global LOGO_ANGLE, frame_dt
+
+    events_state = None
+    frame = 0
+    last_snapshot_at = next_snapshot_at = time.perf_counter()
+    deferred_events = []   # events that arrived while the window was being resized
     while True:
+        frame += 1
+        if state != STATE_GAME:
+            pump_dartboard()   # drop darts thrown while no match is running
+        if (injector is not None and not injector.pump()
+                and not pygame.event.peek(pygame.KEYDOWN) and not latency_tracer.pending):
+            print("\n".join(latency_tracer.summary_lines()))
+            pygame.quit(); sys.exit()
+        if replayer is not None:
+            if replayer.done() and not pygame.event.peek(RECORDED_EVENT_TYPES):
+                sys.exit()
+            replayer.pump()
+
+        if pending_resize is not None:
+            if not settle_window_resize():
+                # Still resizing: only follow the size, everything else waits for the relayout
+                for event in wait_for_events(RESIZE_POLL_MS):
+                    if event.type == pygame.VIDEORESIZE:
+                        if session_recorder is not None:
+                            session_recorder.record(frame, [event])
+                        handle_window_resize(event)
+                    elif event.type not in (RENDER_DONE_EVENT, STREAM_WAKE_EVENT):
+                        deferred_events.append(event)
+                continue
+            for event in deferred_events:
+                pygame.event.post(event)
+            deferred_events.clear()
+            if state == STATE_MENU:
+                invalidate_menu()
+
+        if state != events_state:
+            allow_events_for_state(state)
+            if state == STATE_MENU:
+                invalidate_menu()
+            events_state = state
+
+        frame_started = time.perf_counter()
         if state == STATE_MENU:
-            rects = draw_menu()
-            for event in pygame.event.get():
+            # The menu is idle until something happens, so block instead of polling
+            rects = refresh_menu()
+            latency_tracer.frame_presented()
+            frame_times.add((time.perf_counter() - frame_started) * 1000.0)
+            offer_stream_frame(frame_started)
+            startup_trace.finish()
+            events = wait_for_events(replayer.next_due_ms() if replayer is not None else 0)
+            received_at = time.perf_counter()
+            if session_recorder is not None:
+                session_recorder.record(frame, events)
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    latency_tracer.key_received(received_at)
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
+                if event.type in EXPOSE_EVENT_TYPES:
+                    invalidate_menu()
                 handle_window_resize(event)
                 handle_menu_event(event, rects)
 
         elif state == STATE_GAME:
-            # Update rotation angle based on elapsed time since last tick
-            dt = clock.get_time() / 1000  # seconds
-            global LOGO_ANGLE, frame_dt
-            frame_dt = dt
-            rot_dir = 1 if active_player == 0 else -1
-            LOGO_ANGLE = (LOGO_ANGLE + rot_dir * LOGO_ROT_SPEED_DEG * dt) % 360.0
-
-            for event in pygame.event.get():
+            # Sleep until a key arrives, the render thread finishes a frame or
+            # the next animation snapshot is due; never behind a frame being drawn
+            if replayer is not None and not replayer.realtime:
+                events = pygame.event.get()
+            else:
+                # A still screen (pinned minimal quality, no ticker) has no snapshot due; still poll the dartboard
+                due_ms = max(1, int(min(GAME_IDLE_POLL_S, next_snapshot_at - time.perf_counter()) * 1000))
+                if replayer is not None and replayer.next_due_ms():
+                    due_ms = min(due_ms, replayer.next_due_ms())
+                events = wait_for_events(due_ms)
+            received_at = frame_started = time.perf_counter()
+            if session_recorder is not None:
+                session_recorder.record(frame, events)
+            changed = False
+            for event in events:
                 if event.type == pygame.QUIT:
                     pygame.quit(); sys.exit()
                 handle_window_resize(event)
                 if event.type == pygame.KEYDOWN:
+                    latency_tracer.key_received(received_at, event.key)
                     handle_game_keydown(event)
-
-            draw_game()
+                changed = changed or event.type != RENDER_DONE_EVENT
+            changed = pump_dartboard() or changed
+
+            if state == STATE_GAME and (changed or received_at >= next_snapshot_at):
+                # Update rotation angle based on elapsed time since the last snapshot
+                frame_dt = min(0.1, received_at - last_snapshot_at)
+                rot_dir = 1 if active_player == 0 else -1
+                if quality.tier["rotation"] is not None:
+                    LOGO_ANGLE = (LOGO_ANGLE + rot_dir * LOGO_ROT_SPEED_DEG * frame_dt) % 360.0
+                last_snapshot_at = received_at
+                next_snapshot_at = received_at + quality.animation_interval(sponsor_bar_enabled)
+
+                win_chance.poll()
+                win_chance.request()
+                snapshot = game_snapshot()
+                latency_tracer.snapshot_taken(snapshot.seq)
+                render_worker.publish(snapshot)
+            # Show the newest frame the render thread finished, if there is one
+            present_started = time.perf_counter()
+            presented = render_worker.present(screen)
+            if presented is not None:
+                present_frame()
+                latency_tracer.frame_presented(presented)
+                presented_at = time.perf_counter()
+                frame_times.add((presented_at - frame_started) * 1000.0)
+                # The render thread shares the CPU (and the GIL), so a frame costs its draw plus present
+                quality.observe(render_worker.last_render_ms + (presented_at - present_started) * 1000.0, presented_at)
+                offer_stream_frame(frame_started)
+            continue   # paced by the waits above, not by clock.tick()
 
         elif state == STATE_END:
             draw_end()
-            for event in pygame.event.get():
+            latency_tracer.frame_presented()
+            frame_times.add((time.perf_counter() - frame_started) * 1000.0)
+            offer_stream_frame(frame_started)
+            events = pygame.event.get()
+            received_at = time.perf_counter()
+            if session_recorder is not None:
+                session_recorder.record(frame, events)
+            for event in events:
+                if event.type == pygame.KEYDOWN:
+                    latency_tracer.key_received(received_at)
                 if event.type == pygame.QUIT:
+                    archive_finished_match()
                     pygame.quit(); sys.exit()
                 handle_window_resize(event)
                 handle_end_event(event)
 
-        clock.tick(60)
+        # A max-speed replay runs unthrottled
+        clock.tick(0 if replayer is not None and not replayer.realtime else 60)
 
 if __name__ == "__main__":
+    # Needed by the win-chance worker process in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
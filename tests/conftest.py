@@ -0,0 +1,31 @@
+import os
+import sys
+
+# Headless: set before pygame opens anything
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.fixture(scope="session")
+def display():
+    """The app window on the dummy video driver, opened once for the whole run."""
+    app.init_app()
+    return app.screen
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """A fresh match archive so tests never touch the real one."""
+    path = tmp_path / "matches.jsonl"
+    monkeypatch.setattr(app, "MATCH_ARCHIVE_PATH", str(path))
+    monkeypatch.setattr(app, "player_ratings", app.RatingBook())
+    return path
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running soak or end-to-end test (deselect with -m 'not slow')")
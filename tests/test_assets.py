@@ -0,0 +1,59 @@
+import zlib
+
+import gsszo_darts_counter as app
+
+
+def _entry_for(path):
+    data = path.read_bytes()
+    stat = path.stat()
+    return {"src_size": stat.st_size, "src_mtime_ns": stat.st_mtime_ns, "src_crc32": zlib.crc32(data)}
+
+
+def test_bundle_entry_survives_new_mtime(tmp_path):
+    source = tmp_path / "logo.png"
+    source.write_bytes(b"\x89PNG fake pixels")
+    entry = _entry_for(source)
+    # A onefile build extracts the same bytes with a new mtime on every start
+    entry["src_mtime_ns"] -= 10_000_000_000
+    assert app.AssetBundle._source_unchanged(str(source), entry)
+
+
+def test_bundle_entry_stale_when_contents_change(tmp_path):
+    source = tmp_path / "logo.png"
+    source.write_bytes(b"\x89PNG fake pixels")
+    entry = _entry_for(source)
+    source.write_bytes(b"\x89PNG fake pixelz")
+    entry["src_mtime_ns"] -= 10_000_000_000
+    assert not app.AssetBundle._source_unchanged(str(source), entry)
+
+    source.write_bytes(b"\x89PNG other size")
+    assert not app.AssetBundle._source_unchanged(str(source), entry)
+
+
+def test_bundle_entry_without_crc_needs_matching_mtime(tmp_path):
+    source = tmp_path / "logo.png"
+    source.write_bytes(b"\x89PNG fake pixels")
+    entry = _entry_for(source)
+    del entry["src_crc32"]
+    assert app.AssetBundle._source_unchanged(str(source), entry)
+    entry["src_mtime_ns"] += 1
+    assert not app.AssetBundle._source_unchanged(str(source), entry)
+
+
+def test_bundle_trusted_in_frozen_build(tmp_path, monkeypatch):
+    source = tmp_path / "logo.png"
+    source.write_bytes(b"\x89PNG fake pixels")
+    entry = {"src_size": 1, "src_mtime_ns": 0}
+    monkeypatch.setattr(app.sys, "frozen", True, raising=False)
+    assert app.AssetBundle._source_unchanged(str(source), entry)
+
+
+def test_packed_bundle_loads_after_touch(tmp_path, display):
+    bundle_path = tmp_path / "assets.bundle"
+    assert app.pack_asset_bundle(str(bundle_path)) > 0
+    bundle = app.AssetBundle(str(bundle_path))
+    icon = app.resource_path(app.os.path.join("assets", "gsszo_logo_32x32.png"))
+    entry = bundle.entries[app._bundle_key(icon)]
+    entry["src_mtime_ns"] += 1      # as if freshly extracted
+    surface = bundle.load(icon)
+    assert surface is not None and surface.get_size() == (entry["w"], entry["h"])
@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.mark.parametrize("token, dart", [
+    ("T20", (20, 3)), ("d16", (16, 2)), ("S5", (5, 1)), ("5", (5, 1)), (" 20 ", (20, 1)),
+    ("SB", (25, 1)), ("25", (25, 1)), ("S25", (25, 1)), ("DB", (25, 2)), ("BULL", (25, 2)),
+    ("50", (25, 2)), ("D25", (25, 2)), ("MISS", (0, 0)), ("0", (0, 0)),
+    ("NEXT", None), ("takeout", None),
+])
+def test_parse_dart_accepts_board_tokens(token, dart):
+    assert app.parse_dart(token) == dart
+
+
+@pytest.mark.parametrize("token", ["", "T21", "T25", "X5", "D0", "21", "TT20", "20x", "-5", "\x00"])
+def test_parse_dart_rejects_malformed_lines(token):
+    with pytest.raises(ValueError):
+        app.parse_dart(token)
+
+
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs pseudo-terminals")
+def test_reader_round_trip_through_a_pty():
+    master, slave = os.openpty()
+    reader = app.DartboardReader(os.ttyname(slave), "tty")
+    reader.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not reader.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Mixed line endings, a line split across writes and one bad token
+        os.write(master, b"T20\r\nD1")
+        os.write(master, b"6\nbogus\r\nNEXT\rSB\n")
+        while reader.parsed + reader.rejected < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [dart for _, dart in reader.drain()] == [(20, 3), (16, 2), None, (25, 1)]
+        assert reader.rejected == 1
+    finally:
+        reader.stop()
+        os.close(master)
+        os.close(slave)
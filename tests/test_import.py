@@ -0,0 +1,77 @@
+import pytest
+
+import gsszo_darts_counter as app
+
+CSV_HEADER = "match,player1,player2,player3,player4,start_score,legs_to_win,double_out,leg,player,score\n"
+
+
+def write_csv(tmp_path, rows):
+    path = tmp_path / "sheet.csv"
+    path.write_text(CSV_HEADER + "".join(row + "\n" for row in rows), encoding="utf-8")
+    return str(path)
+
+
+def test_csv_with_three_players_replays_like_the_scoreboard(tmp_path):
+    rows = [
+        "m1,Ann,Bob,Cid,,101,1,true,1,1,60",
+        "m1,Ann,Bob,Cid,,101,1,true,1,2,45",
+        "m1,Ann,Bob,Cid,,101,1,true,1,3,99",
+        "m1,Ann,Bob,Cid,,101,1,true,1,1,41",
+    ]
+    (match,) = app.read_scoresheets(write_csv(tmp_path, rows))
+    assert match["players"] == ["Ann", "Bob", "Cid"]
+    assert match["legs"][0]["visits"] == [[60, 41], [45], [99]]
+
+    record, issues = app.replay_scoresheet(match)
+    assert issues == []
+    assert record["players"] == ["Ann", "Bob", "Cid"]
+    assert record["winner"] == 0 and record["legs_won"] == [1, 0, 0]
+
+
+def test_csv_two_player_sheets_still_read(tmp_path):
+    path = tmp_path / "old.csv"
+    path.write_text("match,player1,player2,start_score,legs_to_win,double_out,leg,player,score\n"
+                    "m1,Ann,Bob,101,1,true,1,2,101\n", encoding="utf-8")
+    (match,) = app.read_scoresheets(str(path))
+    assert match["players"] == ["Ann", "Bob"]
+    record, issues = app.replay_scoresheet(match)
+    assert issues == [] and record["winner"] == 1
+
+
+def test_csv_player_outside_the_match_is_rejected(tmp_path):
+    rows = ["m1,Ann,Bob,,,101,1,true,1,3,60"]
+    with pytest.raises(ValueError, match="player 3"):
+        app.read_scoresheets(write_csv(tmp_path, rows))
+
+
+def test_import_flags_a_match_with_too_many_players(tmp_path, archive):
+    sheet = tmp_path / "sheet.json"
+    players = [f"P{i}" for i in range(app.MAX_PLAYERS + 1)]
+    sheet.write_text(app.json.dumps({"players": players, "start_score": 101, "legs_to_win": 1,
+                                     "legs": [{"visits": [[101]] + [[] for _ in players[1:]]}]}))
+    assert app.import_scoresheets([str(sheet)]) == 1
+    assert not archive.exists()
+
+
+def test_import_into_an_archive_in_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sheet = write_csv(tmp_path, ["m1,Ann,Bob,,,101,1,true,1,2,101"])
+    assert app.import_scoresheets([sheet], archive_path="matches.jsonl") == 0
+    assert [record["winner"] for record in app.read_archive("matches.jsonl")] == [1]
+
+
+def test_blank_double_out_cell_means_double_out(tmp_path):
+    # 101 - 100 leaves 1, a bust with double out, a score without
+    rows = ["m1,Ann,Bob,,,101,1,,1,1,100"]
+    (match,) = app.read_scoresheets(write_csv(tmp_path, rows))
+    assert match["double_out"] is True
+    record, _ = app.replay_scoresheet(match)
+    assert record["legs"][0]["visits"] == [[0, 0]]
+
+
+def test_visits_left_when_a_column_runs_out_are_reported():
+    match = {"players": ["Ann", "Bob"], "start_score": 501, "legs_to_win": 1,
+             "legs": [{"starter": 0, "visits": [[60], [45, 45, 45]]}]}
+    record, issues = app.replay_scoresheet(match)
+    assert record["legs"][0]["visits"] == [[0, 60], [1, 45]]
+    assert "leg 1: 2 visit(s) not replayed, Ann has no visit to throw before them" in issues
@@ -0,0 +1,43 @@
+import pygame
+
+import gsszo_darts_counter as app
+
+
+def test_enter_commit_relabels_its_own_key():
+    tracer = app.LatencyTracer()
+    tracer.key_received(1.0, pygame.K_KP_ENTER)
+    tracer.commit_started()
+    assert [entry[0] for entry in tracer.pending] == ["commit"]
+
+
+def test_board_commit_leaves_typing_sample_alone():
+    tracer = app.LatencyTracer()
+    tracer.key_received(1.0, pygame.K_6)        # typed, not yet on screen
+    tracer.dart_received(1.1)
+    tracer.commit_started()                    # the board's third dart commits the visit
+    assert [entry[0] for entry in tracer.pending] == ["key", "dart", "commit"]
+
+
+def test_commit_after_enter_already_tagged_gets_its_own_sample():
+    tracer = app.LatencyTracer()
+    tracer.key_received(1.0, pygame.K_RETURN)
+    tracer.commit_started()
+    tracer.commit_started()                    # a board commit before the frame is shown
+    assert [entry[0] for entry in tracer.pending] == ["commit", "commit"]
+
+
+def test_commit_without_traced_input_records_nothing():
+    tracer = app.LatencyTracer()
+    tracer.commit_started()
+    assert tracer.pending == []
+
+
+def test_samples_close_when_their_snapshot_is_presented():
+    tracer = app.LatencyTracer()
+    tracer.key_received(app.time.perf_counter(), pygame.K_RETURN)
+    tracer.commit_started()
+    tracer.snapshot_taken(7)
+    tracer.frame_presented(6)
+    assert len(tracer.pending) == 1
+    tracer.frame_presented(7)
+    assert tracer.pending == [] and tracer.histograms["commit"].total == 1
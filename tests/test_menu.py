@@ -0,0 +1,43 @@
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.fixture
+def window_size(display, monkeypatch):
+    """Lay the app out for a window of the given size; the real window comes back afterwards."""
+    def resize(width, height):
+        app.configure_render_target(pygame.Surface((width, height), 0, display))
+        app.compute_layout()
+    yield resize
+    app.configure_render_target(pygame.display.get_surface())
+    app.compute_layout()
+
+
+@pytest.mark.parametrize("size", [(1920, 1080), (1280, 720), (1366, 768), (1024, 768), (3840, 2160)])
+@pytest.mark.parametrize("players", range(app.MIN_PLAYERS, app.MAX_PLAYERS + 1))
+def test_settings_panel_never_covers_menu_widgets(size, players, window_size, monkeypatch):
+    monkeypatch.setitem(app.menu_values, "players", str(players))
+    window_size(*size)
+    menu = app.layout["menu"]
+    for key, damage in menu["damage"].items():
+        assert not damage.colliderect(menu["panel"]), key
+        assert 0 <= damage.left and damage.right <= app.WIDTH, key
+
+
+def test_closing_the_panel_repaints_what_it_covered(window_size, monkeypatch):
+    monkeypatch.setitem(app.menu_values, "players", "8")
+    window_size(1920, 1080)
+    monkeypatch.setattr(app, "settings_menu_open", False)
+    app.invalidate_menu()
+    app.refresh_menu()
+    before = app.screen.copy()
+    app.settings_menu_open = True
+    app.refresh_menu()
+    app.settings_menu_open = False
+    app.refresh_menu()
+    width, height = app.screen.get_size()
+    changed = [(x, y) for x in range(0, width, 7) for y in range(0, height, 7)
+               if before.get_at((x, y)) != app.screen.get_at((x, y))]
+    assert changed == []
@@ -0,0 +1,71 @@
+import json
+import math
+
+import gsszo_darts_counter as app
+
+
+def feed(governor, cost_ms, windows, start=0.0, fps=30):
+    """windows of QUALITY_WINDOW_S at fps frames costing cost_ms; returns the time after them."""
+    now = start
+    # A window is judged on the first frame past its end, which then opens the next one
+    for _ in range(round(windows * app.QUALITY_WINDOW_S * fps) + 1):
+        now += 1.001 / fps
+        governor.observe(cost_ms, now)
+    return now
+
+
+def test_one_stalled_window_does_not_drop_to_the_last_tier():
+    governor = app.QualityGovernor()
+    now = feed(governor, 80.0, 1)
+    now = feed(governor, 5.0, 1, now)
+    assert governor.tier["name"] == "full"
+
+    feed(governor, 80.0, app.QUALITY_DOWN_WINDOWS, now)
+    assert governor.tier["name"] == "minimal"
+
+
+def test_still_last_tier_keeps_sampling_and_steps_up():
+    governor = app.QualityGovernor()
+    governor.level = len(app.QUALITY_TIERS) - 1
+    interval = governor.animation_interval(ticker=False)
+    assert interval == 1.0 / governor.tier["animation_hz"]
+
+    feed(governor, 5.0, app.QUALITY_UP_WINDOWS + 1, app.QUALITY_UPGRADE_HOLD_S, fps=1 / interval)
+    assert governor.tier["name"] == "low"
+
+    pinned = app.QualityGovernor()
+    pinned.start("minimal", None)
+    assert pinned.animation_interval(ticker=False) == math.inf
+
+
+def test_a_tier_given_up_right_away_waits_longer():
+    governor = app.QualityGovernor()
+    governor.level = 2
+    now = feed(governor, 5.0, app.QUALITY_UP_WINDOWS, app.QUALITY_UPGRADE_HOLD_S)
+    assert governor.tier["name"] == "reduced"
+    now = feed(governor, 40.0, app.QUALITY_DOWN_WINDOWS, now)
+    assert governor.tier["name"] == "low"
+    assert governor.upgrade_hold == 2 * app.QUALITY_UPGRADE_HOLD_S
+
+    # Fast again, but not for long enough
+    now = feed(governor, 5.0, app.QUALITY_UP_WINDOWS + 2, now)
+    assert governor.tier["name"] == "low"
+    feed(governor, 5.0, app.QUALITY_UP_WINDOWS + 8, now)
+    assert governor.tier["name"] == "reduced"
+
+
+def test_a_saved_last_tier_is_not_trusted(tmp_path):
+    path = tmp_path / "quality.json"
+    governor = app.QualityGovernor()
+    governor.path = str(path)
+    governor.level = len(app.QUALITY_TIERS) - 2
+    feed(governor, 80.0, app.QUALITY_DOWN_WINDOWS)
+    assert json.loads(path.read_text())["tier"] == "minimal"
+
+    restarted = app.QualityGovernor()
+    restarted.start("auto", str(path))
+    assert restarted.tier["name"] == "low"
+
+    path.write_text(json.dumps({"tier": "reduced"}))
+    restarted.start("auto", str(path))
+    assert restarted.tier["name"] == "reduced"
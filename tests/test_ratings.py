@@ -0,0 +1,61 @@
+import json
+import random
+
+import pytest
+
+import gsszo_darts_counter as app
+
+
+def history(matches=300, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(matches):
+        field = rng.sample(range(12), rng.choice((2, 2, 2, 3, 4)))
+        won = [rng.randint(0, 2) for _ in field]
+        winner = rng.randrange(len(field))
+        won[winner] = 3
+        records.append({"players": [f"P{p}" for p in field], "legs_won": won,
+                        "averages": [rng.uniform(30, 70) for _ in field], "winner": winner})
+    return records
+
+
+def test_rebuild_equals_recording_one_by_one():
+    records = history()
+    book = app.RatingBook()
+    for record in records:
+        book.record(record)
+    rebuilt = app.rebuild_ratings(records)
+    assert rebuilt.names == book.names
+    assert list(rebuilt.ratings) == pytest.approx(list(book.ratings))
+    assert list(rebuilt.played) == list(book.played)
+    assert sum(rebuilt.ratings) == pytest.approx(app.RATING_START * len(rebuilt.names))
+
+
+def test_unfinished_matches_are_not_rated():
+    book = app.RatingBook()
+    book.record({"players": ["Ann", "Bob"], "legs_won": [0, 0], "averages": [40.0, 50.0], "winner": None})
+    assert book.rating("Ann") is None and book.names == []
+    book.record({"players": ["Ann", "Bob"], "legs_won": [3, 1], "averages": [40.0, 50.0], "winner": 0})
+    assert list(book.played) == [1, 1] and book.rating("Ann") > app.RATING_START
+
+
+def test_ratings_are_rebuilt_when_the_archive_changed(archive, capsys):
+    records = history(20)
+    app.append_to_archive(records[:10])
+    app.load_ratings()
+    assert "Rebuilt ratings" in capsys.readouterr().out
+    saved = json.loads(open(app.ratings_path(), encoding="utf-8").read())
+    assert saved["archive_size"] == archive.stat().st_size
+
+    # Same size: the saved ratings are used as they are
+    app.player_ratings = app.RatingBook()
+    app.load_ratings()
+    assert "Rebuilt" not in capsys.readouterr().out
+    assert app.player_ratings.names == saved["names"]
+
+    # Matches added behind the ratings' back (another copy of the archive, an import)
+    app.append_to_archive(records[10:])
+    app.load_ratings()
+    assert "Rebuilt ratings" in capsys.readouterr().out
+    expected = app.rebuild_ratings(records)
+    assert list(app.player_ratings.ratings) == pytest.approx(list(expected.ratings))
@@ -0,0 +1,49 @@
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.fixture
+def display_of(display, monkeypatch):
+    """Render for a (fake) display of the given size; the real window comes back afterwards."""
+    def resize(width, height, render_height, render_filter="auto"):
+        monkeypatch.setattr(app, "RENDER_HEIGHT", render_height)
+        monkeypatch.setattr(app, "RENDER_FILTER", render_filter)
+        app.configure_render_target(pygame.Surface((width, height), 0, display))
+        app.compute_layout()
+        app.reset_game(501, ["Ann", "Bob"], 2)
+        app.draw_game_frame(app.screen, app.game_snapshot(), 0.0)
+        app.present_frame()
+        return app.display_surface
+    yield resize
+    monkeypatch.undo()
+    app.configure_render_target(pygame.display.get_surface())
+    app.compute_layout()
+
+
+def test_game_frame_drawn_at_the_render_height_and_upscaled_whole(display_of):
+    shown = display_of(3840, 2160, 1080)
+    assert app.screen.get_size() == (1920, 1080) and (app.WIDTH, app.HEIGHT) == (1920, 1080)
+    assert shown.get_size() == (3840, 2160)
+    # Factor 2 under "auto": every pixel repeated exactly, as the nearest filter does
+    expected = pygame.transform.scale(app.screen, (3840, 2160))
+    assert pygame.image.tobytes(shown, "RGB") == pygame.image.tobytes(expected, "RGB")
+    assert app.render_pos((3000, 1500)) == (1500, 750)
+
+
+def test_fractional_factor_is_smoothed_under_auto(display_of):
+    shown = display_of(2560, 1440, 1080)
+    assert app.screen.get_size() == (1920, 1080)
+    expected = pygame.transform.smoothscale(app.screen, (2560, 1440))
+    assert pygame.image.tobytes(shown, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+    shown = display_of(2560, 1440, 1080, "nearest")
+    expected = pygame.transform.scale(app.screen, (2560, 1440))
+    assert pygame.image.tobytes(shown, "RGB") == pygame.image.tobytes(expected, "RGB")
+
+
+def test_displays_no_taller_than_the_render_height_draw_natively(display_of):
+    shown = display_of(1920, 1080, 1080)
+    assert app.screen is shown and (app.WIDTH, app.HEIGHT) == (1920, 1080)
+    assert app.render_pos((700, 300)) == (700, 300)
@@ -0,0 +1,46 @@
+import threading
+
+import gsszo_darts_counter as app
+
+
+def test_relayout_waits_for_the_frame_in_flight(display, archive, monkeypatch):
+    drawing = threading.Event()
+    release = threading.Event()
+    real_draw = app.draw_game_frame
+
+    def slow_draw(surface, snap, frame_dt):
+        drawing.set()
+        release.wait(5)
+        real_draw(surface, snap, frame_dt)
+
+    monkeypatch.setattr(app, "draw_game_frame", slow_draw)
+    app.reset_game(301, ["A", "B"], 2)
+    worker = app.RenderWorker()
+    worker.start()
+    worker.publish(app.game_snapshot())
+    assert drawing.wait(5)
+
+    relaid = threading.Event()
+    threading.Thread(target=lambda: (app.compute_layout(), relaid.set()), daemon=True).start()
+    assert not relaid.wait(0.2), "relayout ran while a frame was being drawn"
+    release.set()
+    assert relaid.wait(5)
+
+
+def test_main_thread_draws_exclude_the_render_thread(display, archive, monkeypatch):
+    seen = []
+    real_draw_end_result = app.draw_end_result
+
+    def checking_draw(*args):
+        acquired = []
+        probe = threading.Thread(target=lambda: acquired.append(app.frame_lock.acquire(blocking=False)))
+        probe.start()
+        probe.join()
+        seen.append(acquired[0])
+        real_draw_end_result(*args)
+
+    monkeypatch.setattr(app, "draw_end_result", checking_draw)
+    app.reset_game(101, ["A", "B"], 1)
+    app.draw_end()
+    assert seen == [False]
+
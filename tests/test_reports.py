@@ -0,0 +1,54 @@
+import json
+import os
+import subprocess
+import sys
+
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gsszo_darts_counter.py")
+
+# The second leg stops before anyone checks out
+UNFINISHED_SHEET = {"players": ["Ann", "Bob"], "start_score": 101, "legs_to_win": 2, "double_out": True,
+                    "legs": [{"starter": 0, "visits": [[60, 41], [20]]},
+                             {"starter": 1, "visits": [[20], [60]]}]}
+
+
+def run_app(tmp_path, *args):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    return subprocess.run([sys.executable, APP, *args], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_report_of_an_imported_unfinished_match(tmp_path):
+    sheet = tmp_path / "sheet.json"
+    sheet.write_text(json.dumps([UNFINISHED_SHEET]), encoding="utf-8")
+    archive = str(tmp_path / "matches.jsonl")
+    imported = run_app(tmp_path, "--archive", archive, "--import", str(sheet))
+    assert "1 with issues" in imported.stdout, imported.stdout + imported.stderr
+
+    reports = run_app(tmp_path, "--archive", archive, "--reports", "out", "--report-date", "all",
+                      "--report-workers", "1")
+    assert reports.returncode == 0, reports.stdout + reports.stderr
+    assert os.listdir(tmp_path / "out") == ["001_Ann-v-Bob.png"]
+
+
+@pytest.mark.parametrize("screen_dark, report_dark", [(True, False), (False, True)])
+def test_in_process_reports_leave_the_screen_alone(display, tmp_path, screen_dark, report_dark):
+    was_dark = app.current_dark_mode
+    try:
+        app.apply_theme(screen_dark)
+        app.reset_game(501, ["A", "B", "C"], 1)
+        screen_state = (app.WIDTH, app.HEIGHT, list(app.player_names), app.UI_SCALE, app.BG_COLOUR, app.TEXT_COLOUR)
+        record, _ = app.replay_scoresheet(UNFINISHED_SHEET)
+
+        written = app.render_match_reports([record], str(tmp_path), workers=1, dark=report_dark)
+
+        assert written == [str(tmp_path / "001_Ann-v-Bob.png")]
+        assert pygame.image.load(written[0]).get_width() == app.LAYOUT_BASE_WIDTH
+        assert (app.WIDTH, app.HEIGHT, app.player_names, app.UI_SCALE, app.BG_COLOUR, app.TEXT_COLOUR) == screen_state
+        assert len(app.layout["game"]["players"]) == 3
+    finally:
+        app.apply_theme(was_dark)
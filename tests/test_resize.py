@@ -0,0 +1,47 @@
+import time
+
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.fixture
+def windowed(display, monkeypatch):
+    app.apply_display_mode(False)
+    monkeypatch.setattr(app, "RESIZE_SETTLE_S", 0.05)
+    yield
+    app.apply_display_mode(True, force=True)
+
+
+def test_resize_burst_relayouts_once_after_it_settles(windowed, monkeypatch):
+    layouts = []
+    real_compute_layout = app.compute_layout
+
+    def counting_compute_layout():
+        layouts.append((app.WIDTH, app.HEIGHT))
+        real_compute_layout()
+
+    monkeypatch.setattr(app, "compute_layout", counting_compute_layout)
+    pygame.event.clear()
+    for step in range(40):
+        pygame.event.post(pygame.event.Event(pygame.VIDEORESIZE, w=700 + step * 5, h=500 + step * 3,
+                                             size=(700 + step * 5, 500 + step * 3)))
+    for event in pygame.event.get(pygame.VIDEORESIZE):
+        app.handle_window_resize(event)
+
+    assert app.pending_resize is not None
+    assert app.settle_window_resize() is False       # still dragging: only the stretched preview
+    assert layouts == []
+
+    time.sleep(0.06)
+    assert app.settle_window_resize() is True
+    assert layouts == [(895, 617)]
+    assert app.pending_resize is None
+    assert pygame.display.get_surface().get_size() == (895, 617)
+
+
+def test_resize_is_ignored_in_fullscreen(display):
+    app.apply_display_mode(True, force=True)
+    app.handle_window_resize(pygame.event.Event(pygame.VIDEORESIZE, w=640, h=480, size=(640, 480)))
+    assert app.pending_resize is None
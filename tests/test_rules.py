@@ -0,0 +1,148 @@
+import random
+
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+def reference_visit(state, value, finished_on_double=True):
+    """The rules as commit_throw applied them before the kernel, on plain mutable state."""
+    state = {key: list(val) if isinstance(val, list) else val for key, val in state.items()}
+    value = min(app.MAX_VISIT, max(0, value))
+    player = state["active"]
+    players = len(state["remaining"])
+    after = state["remaining"][player] - value
+    busted = value > state["remaining"][player] or (
+        state["double_out"] and (after == 1 or (after == 0 and not finished_on_double)))
+    if busted:
+        state["active"] = (player + 1) % players
+        return state, (player, 0, app.VISIT_BUST, False, False)
+    if after:
+        state["remaining"][player] = after
+        state["active"] = (player + 1) % players
+        return state, (player, value, app.VISIT_OK, False, False)
+    state["legs_won"][player] += 1
+    if state["legs_won"][player] >= state["legs_to_win"]:
+        state["remaining"][player] = 0
+        state["winner"] = player
+        return state, (player, value, app.VISIT_CHECKOUT, True, True)
+    state["starter"] = state["active"] = (state["starter"] + 1) % players
+    state["remaining"] = [state["start_score"]] * players
+    return state, (player, value, app.VISIT_CHECKOUT, True, False)
+
+
+def as_reference(match):
+    return {
+        "start_score": match.start_score, "legs_to_win": match.legs_to_win, "double_out": match.double_out,
+        "remaining": list(match.remaining), "legs_won": list(match.legs_won), "active": match.active,
+        "starter": match.leg_starter, "winner": match.winner,
+    }
+
+
+def random_visit(rng, remaining):
+    """Mostly scoring visits, with checkouts, leave-1s, over-scores and junk mixed in."""
+    roll = rng.random()
+    if roll < 0.25 and remaining <= 170:
+        return remaining
+    if roll < 0.3:
+        return remaining - 1
+    if roll < 0.35:
+        return remaining + rng.randint(1, 40)
+    if roll < 0.38:
+        return rng.choice((-5, 181, 999))
+    return rng.randint(0, 180)
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_apply_visit_matches_reference_rules(seed):
+    rng = random.Random(seed)
+    for _ in range(40):
+        players = rng.randint(app.MIN_PLAYERS, app.MAX_PLAYERS)
+        match = app.new_match_state(rng.choice((101, 301, 501)), rng.randint(1, 4), rng.random() < 0.7,
+                                    players, rng.randrange(players))
+        expected = as_reference(match)
+        while match.winner is None:
+            value = random_visit(rng, match.remaining[match.active])
+            on_double = rng.random() < 0.8
+            match, outcome = app.apply_visit(match, value, on_double)
+            expected, expected_outcome = reference_visit(expected, value, on_double)
+            assert tuple(outcome) == expected_outcome
+            assert as_reference(match) == expected
+            assert sum(match.legs_won) <= players * (match.legs_to_win - 1) + 1
+
+
+def test_bust_and_double_out_rules():
+    match = app.new_match_state(101, 2, True)._replace(remaining=(41, 101))
+    after, outcome = app.apply_visit(match, 40)
+    assert outcome.kind == app.VISIT_BUST and outcome.recorded == 0
+    assert after.remaining == (41, 101) and after.active == 1
+
+    after, outcome = app.apply_visit(match, 41, finished_on_double=False)
+    assert outcome.kind == app.VISIT_BUST
+
+    after, outcome = app.apply_visit(match._replace(double_out=False), 40)
+    assert outcome.kind == app.VISIT_OK and after.remaining == (1, 101)
+
+    after, outcome = app.apply_visit(match, 60)
+    assert outcome.kind == app.VISIT_BUST and after.remaining == (41, 101)
+
+
+def test_leg_and_match_transitions_with_four_players():
+    match = app.new_match_state(101, 2, True, players=4, starter=2)
+    match = match._replace(remaining=(101, 101, 40, 101))
+    match, outcome = app.apply_visit(match, 40)
+    assert outcome.leg_won and not outcome.match_won
+    assert match.legs_won == (0, 0, 1, 0)
+    assert match.remaining == (101,) * 4 and match.active == match.leg_starter == 3
+
+    match = match._replace(remaining=(101, 101, 20, 101), active=2)
+    match, outcome = app.apply_visit(match, 20)
+    assert outcome.match_won and match.winner == 2
+    assert match.legs_won == (0, 0, 2, 0) and match.remaining == (101, 101, 0, 101)
+
+
+KEYPAD_DIGITS = [pygame.K_0 + digit for digit in range(10)]
+
+
+def press(key):
+    app.handle_game_keydown(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_keypad_sequences_follow_the_kernel(seed, display, archive):
+    """Digits, Backspace, Tab and Enter on the scoreboard give the same match as apply_visit."""
+    rng = random.Random(seed)
+    for _ in range(6):
+        players = rng.randint(app.MIN_PLAYERS, app.MAX_PLAYERS)
+        app.reset_game(rng.choice((101, 301)), [f"P{i}" for i in range(players)], rng.randint(1, 3),
+                       rng.random() < 0.7, False)
+        expected = app.current_match_state()
+        while app.state == app.STATE_GAME:
+            roll = rng.random()
+            if roll < 0.05:
+                swapped = app.current_leg_number() == 1 and app.is_leg_pristine()
+                press(pygame.K_TAB)
+                if swapped:
+                    starter = (expected.active + 1) % players
+                    expected = expected._replace(active=starter, leg_starter=starter)
+            elif roll < 0.15 and app.current_input:
+                typed = app.current_input
+                press(pygame.K_BACKSPACE)
+                assert app.current_input == typed[:-1]
+            elif roll < 0.6 and len(app.current_input) < 3:
+                remaining = expected.remaining[expected.active]
+                if not app.current_input and remaining <= 60 and rng.random() < 0.5:
+                    for char in str(remaining):
+                        press(pygame.K_0 + int(char))
+                else:
+                    press(rng.choice(KEYPAD_DIGITS))
+                assert int(app.current_input) <= app.MAX_VISIT
+            else:
+                value = int(app.current_input or 0)
+                press(pygame.K_RETURN)
+                expected, _ = app.apply_visit(expected, value)
+                assert app.current_input == ""
+                assert app.current_match_state() == expected
+        assert expected.winner == app.winner_idx
+        assert app.legs_won[app.winner_idx] == app.LEGS_TO_WIN
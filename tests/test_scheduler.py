@@ -0,0 +1,66 @@
+import pytest
+
+import gsszo_darts_counter as app
+
+
+def leg(winner, visits, times=None):
+    entry = {"starter": 0, "winner": winner, "visits": visits}
+    if times is not None:
+        entry["times"] = times
+    return entry
+
+
+def test_changeover_between_legs_is_not_throwing_pace():
+    # 200 s between the last visit of one leg and the first of the next
+    record = {"players": ["A", "B"], "start_score": 501, "legs": [
+        leg(0, [[0, 60], [1, 60]], [0.0, 20.0]),
+        leg(1, [[1, 60], [0, 60]], [220.0, 240.0]),
+    ]}
+    paces = app.player_paces([record])
+    assert paces["B"].seconds_per_visit == pytest.approx(20.0)
+    assert paces["A"].seconds_per_visit == pytest.approx(20.0)
+
+
+def test_won_legs_give_visits_per_leg_scaled_to_501():
+    # A checks out 301 in 5 visits, B's unfinished leg says nothing about B
+    visits = [[0, 100], [1, 20], [0, 100], [1, 20], [0, 60], [1, 20], [0, 21], [1, 20], [0, 20]]
+    record = {"players": ["A", "B"], "start_score": 301, "legs": [leg(0, visits), leg(None, [[1, 20], [0, 20]])]}
+    paces = app.player_paces([record])
+    assert paces["A"].leg_visits == pytest.approx(5 * 501 / 301)
+    assert paces["B"].leg_visits is None
+
+
+def test_estimate_uses_observed_visits_per_leg():
+    # A averages 40 but finishes 501 in 12 visits: a one-leg match is 24 visits, not 2 * 501 / 40
+    a = app.PlayerPace(40.0, 20.0, 12.0)
+    b = app.PlayerPace(30.0, 20.0)
+    assert app.estimate_match_seconds(a, b, 1, 501) == pytest.approx(app.MATCH_CHANGEOVER_S + 24 * 20.0)
+    assert app.estimate_match_seconds(a._replace(leg_visits=None), b, 1, 501) == pytest.approx(
+        app.MATCH_CHANGEOVER_S + 2 * 501 / 40 * 20.0)
+    # Observed legs scale with the start score
+    assert app.estimate_match_seconds(a, b, 1, 301) == pytest.approx(
+        app.MATCH_CHANGEOVER_S + 2 * 12 * 301 / 501 * 20.0)
+
+
+def test_byes_take_no_time_and_no_board(archive, capsys):
+    # Six players in a bracket of eight: two byes, which reappear in the losers bracket
+    cup = app.Tournament("double", [f"P{i}" for i in range(6)])
+    byes = [m.id for m in cup.matches if m.result is None and app.BYE in m.slots]
+    assert byes                                     # "losers round 1" matches waiting for a loser
+    durations = app.tournament_durations(cup, {})
+    assert all(durations[i] == 0.0 for i in byes)
+
+    plan, makespan = app.plan_boards(cup, durations, [0.0] * 8)
+    real = [m.id for m in cup.matches if m.result is None and app.BYE not in m.slots]
+    assert sorted(entry.match_id for entry in plan) == sorted(real)
+
+    # With boards to spare the day is as long as its longest chain of matches
+    def chain(match_id):
+        match = cup.matches[match_id]
+        return durations[match_id] + max((chain(target[0]) for target in (match.winner_to, match.loser_to)
+                                          if target is not None), default=0.0)
+    assert makespan == pytest.approx(max(chain(i) for i in real if cup.matches[i].round == 1))
+
+    app.print_board_schedule(cup, 4, 501)
+    out = capsys.readouterr().out
+    assert "P5 v ?" not in out and len(out.splitlines()) == len(real) + 1
@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gsszo_darts_counter.py")
+
+
+def run_app(tmp_path, *args):
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    return subprocess.run([sys.executable, APP, *args], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def archived_matches(path):
+    """Archive records without the wall-clock fields a replay cannot reproduce."""
+    records = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            record = json.loads(line)
+            record.pop("finished_at", None)
+            for leg in record["legs"]:
+                leg.pop("times", None)
+            records.append(record)
+    return records
+
+
+@pytest.mark.slow
+def test_recorded_session_replays_to_the_same_match(tmp_path):
+    recorded = run_app(tmp_path, "--headless", "--record", "session.jsonl", "--inject-keys", "400",
+                       "--inject-rate", "400", "--archive", str(tmp_path / "recorded" / "matches.jsonl"))
+    assert recorded.returncode == 0, recorded.stdout + recorded.stderr
+
+    replayed = run_app(tmp_path, "--replay", "session.jsonl",
+                       "--archive", str(tmp_path / "replayed" / "matches.jsonl"))
+    assert replayed.returncode == 0, replayed.stdout + replayed.stderr
+    assert "Final state matches the recording" in replayed.stdout
+
+    expected = archived_matches(tmp_path / "recorded" / "matches.jsonl")
+    assert expected, "the recorded session should finish at least one match"
+    assert archived_matches(tmp_path / "replayed" / "matches.jsonl") == expected
+
+
+@pytest.mark.slow
+def test_replay_reports_a_different_outcome(tmp_path):
+    recorded = run_app(tmp_path, "--headless", "--record", "session.jsonl", "--inject-keys", "60",
+                       "--inject-rate", "400", "--archive", str(tmp_path / "recorded" / "matches.jsonl"))
+    assert recorded.returncode == 0, recorded.stdout + recorded.stderr
+    lines = (tmp_path / "session.jsonl").read_text(encoding="utf-8").splitlines()
+    final = json.loads(lines[-1])
+    final["final"]["legs_won"] = [9] * len(final["final"]["legs_won"])
+    lines[-1] = json.dumps(final)
+    (tmp_path / "session.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    replayed = run_app(tmp_path, "--replay", "session.jsonl",
+                       "--archive", str(tmp_path / "replayed" / "matches.jsonl"))
+    assert replayed.returncode == 1
+    assert "final legs_won" in replayed.stdout
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(not hasattr(os, "openpty"), reason="needs pseudo-terminals")
+def test_recorded_board_session_replays_to_the_same_match(tmp_path):
+    recorded = run_app(tmp_path, "--headless", "--record", "session.jsonl", "--dartboard-selftest", "150",
+                       "--inject-rate", "200", "--archive", str(tmp_path / "recorded" / "matches.jsonl"))
+    assert recorded.returncode == 0, recorded.stdout + recorded.stderr
+    assert '"type": "Dart"' in (tmp_path / "session.jsonl").read_text(encoding="utf-8")
+
+    replayed = run_app(tmp_path, "--replay", "session.jsonl",
+                       "--archive", str(tmp_path / "replayed" / "matches.jsonl"))
+    assert replayed.returncode == 0, replayed.stdout + replayed.stderr
+    assert "Final state matches the recording" in replayed.stdout
+
+    expected = archived_matches(tmp_path / "recorded" / "matches.jsonl")
+    assert expected, "the board session should finish at least one match"
+    assert archived_matches(tmp_path / "replayed" / "matches.jsonl") == expected
@@ -0,0 +1,14 @@
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.mark.slow
+def test_soak_memory_stays_flat(display, archive, capsys):
+    """Back-to-back matches through the real draw and archive paths must not keep growing memory."""
+    matches = 100          # the theme flips every 25th match, so it ends where it started
+    assert app.run_soak(matches)
+    output = capsys.readouterr().out
+    assert f"{matches} matches in" in output and "bounded" in output
+    assert "too few samples" not in output
+    assert sum(1 for _ in open(archive, encoding="utf-8")) == matches
@@ -0,0 +1,54 @@
+import os
+import time
+
+import pytest
+
+import gsszo_darts_counter as app
+
+
+@pytest.fixture
+def sponsor_files(display, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "SPONSOR_LIST_PATH", str(tmp_path / "sponsors.txt"))
+    monkeypatch.setattr(app, "ORGANIZERS_LIST_PATH", str(tmp_path / "organizers.txt"))
+    monkeypatch.setattr(app, "SPONSOR_LOGO_DIR", str(tmp_path / "logos"))
+    monkeypatch.setattr(app, "SPONSOR_POLL_INTERVAL", 0.02)
+    app.compute_layout()
+    return tmp_path
+
+
+def write_sponsors(path, names, stamp):
+    path.write_text("".join(name + "\n" for name in names), encoding="utf-8")
+    os.utime(path, ns=(stamp, stamp))
+
+
+def wait_for_strip(ticker, check):
+    deadline = time.monotonic() + 5.0
+    while time.monotonic() < deadline:
+        ticker.update(0.0)
+        if ticker.segment_surface is not None and check():
+            return
+        time.sleep(0.01)
+    pytest.fail("the watcher did not install a new strip")
+
+
+def test_edited_sponsor_list_swaps_in_keeping_the_scroll_anchor(sponsor_files):
+    sponsors = sponsor_files / "sponsors.txt"
+    write_sponsors(sponsors, ["Alpha Kft", "Bravo Bt", "Charlie Zrt"], 1_000_000_000)
+    ticker = app.SponsorTicker()
+    ticker.start_watching()
+    try:
+        wait_for_strip(ticker, lambda: ("sponsor", "Charlie Zrt") in ticker.entry_x)
+        # 7 px into Bravo at the left screen edge
+        bravo = ticker.entry_x[("sponsor", "Bravo Bt")]
+        ticker.scroll_offset = -(bravo + 7)
+        old_width = ticker.segment_width
+
+        write_sponsors(sponsors, ["A new sponsor with a long name", "Alpha Kft", "Bravo Bt", "Charlie Zrt"],
+                       2_000_000_000)
+        wait_for_strip(ticker, lambda: ticker.segment_width != old_width)
+
+        assert ("sponsor", "A new sponsor with a long name") in ticker.entry_x
+        assert ticker.scroll_offset == -(ticker.entry_x[("sponsor", "Bravo Bt")] + 7)
+    finally:
+        ticker.stop_watching()
+    assert ticker._thread is None
@@ -0,0 +1,114 @@
+import http.client
+import threading
+import time
+
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+class Board:
+    """Stands in for the main loop: offers the picture on screen every few ms."""
+
+    def __init__(self, streamer):
+        self.streamer = streamer
+        self.picture = self.painted((0, 80, 0))
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def painted(colour):
+        picture = pygame.Surface((320, 180))
+        picture.fill(colour)
+        return picture
+
+    def _run(self):
+        while self.running:
+            self.streamer.offer(self.picture, 0.0)
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def board(display):
+    streamer = app.FrameStreamer(0, 160, "127.0.0.1")
+    streamer.start()
+    board = Board(streamer)
+    yield board
+    board.running = False
+    board.thread.join()
+    streamer.stop()
+
+
+def get(streamer, path):
+    connection = http.client.HTTPConnection("127.0.0.1", streamer.port, timeout=5)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, response.getheader("Content-Type"), response.read()
+
+
+def test_single_frames_of_a_still_screen_come_back_at_once(board):
+    streamer = board.streamer
+    status, content_type, jpeg = get(streamer, "/frame.jpg")
+    assert (status, content_type) == (200, "image/jpeg") and jpeg[:2] == b"\xff\xd8"
+
+    started = time.perf_counter()
+    for _ in range(5):
+        assert get(streamer, "/frame.jpg")[2] == jpeg
+    assert time.perf_counter() - started < 1.0
+
+    status, content_type, png = get(streamer, "/frame.png")
+    assert (status, content_type) == (200, "image/png") and png[:4] == b"\x89PNG"
+    # Scaled to the stream width on the encoder thread
+    assert streamer.latest_surface.get_size() == (160, 90)
+
+
+def test_unchanged_pictures_are_not_encoded_again(board):
+    streamer = board.streamer
+    get(streamer, "/frame.jpg")
+    # Stale: the next request asks for a capture, which only confirms the same picture
+    with streamer.condition:
+        streamer.confirmed_at -= app.STREAM_FRAME_FRESH_S + 1.0
+    started = time.perf_counter()
+    assert get(streamer, "/frame.jpg")[0] == 200
+    assert time.perf_counter() - started < 1.0
+    assert streamer.stats["encoded"] == 1 and streamer.stats["unchanged"] >= 1
+    assert streamer.sequence == 1
+
+
+def test_busy_encoder_or_frame_over_budget_skips_the_frame(display):
+    streamer = app.FrameStreamer(0, 0)
+    streamer.viewers = 1
+    picture = pygame.Surface((64, 36))
+    streamer.offer(picture, app.STREAM_FRAME_BUDGET_S * 2)
+    streamer.job = picture                  # the encoder has not picked the last one up
+    streamer.offer(picture, 0.0)
+    assert streamer.stats == {"captured": 0, "skipped": 2, "unchanged": 0, "encoded": 0}
+
+
+def test_mjpeg_stream_sends_each_new_picture(board):
+    streamer = board.streamer
+    connection = http.client.HTTPConnection("127.0.0.1", streamer.port, timeout=5)
+    connection.request("GET", "/stream.mjpg")
+    response = connection.getresponse()
+    assert response.getheader("Content-Type") == f"multipart/x-mixed-replace; boundary={app.STREAM_BOUNDARY}"
+
+    def next_part():
+        assert response.fp.readline() == f"--{app.STREAM_BOUNDARY}\r\n".encode("ascii")
+        assert response.fp.readline() == b"Content-Type: image/jpeg\r\n"
+        length = int(response.fp.readline().split(b":")[1])
+        assert response.fp.readline() == b"\r\n"
+        jpeg = response.fp.read(length)
+        assert response.fp.readline() == b"\r\n"
+        return jpeg
+
+    first = next_part()
+    assert first[:2] == b"\xff\xd8" and streamer.viewers == 1
+    board.picture = Board.painted((200, 0, 0))
+    started = time.perf_counter()
+    second = next_part()
+    # The new picture, well before the keepalive would resend the old one
+    assert second != first and time.perf_counter() - started < app.STREAM_KEEPALIVE_S / 2
+    assert streamer.stats["encoded"] == 2
+    connection.close()
@@ -0,0 +1,162 @@
+import itertools
+import random
+
+import pytest
+
+import gsszo_darts_counter as app
+
+
+def play(tournament, winner_of, legs=(2, 1)):
+    """Play every ready match until none is left; winner_of(a, b) picks the winning player."""
+    while (match := tournament.next_match()) is not None:
+        a, b = match.slots
+        slot = 0 if winner_of(a, b) == a else 1
+        won = legs if slot == 0 else legs[::-1]
+        tournament.record(match.id, slot, won, [300, 300], [10, 10])
+
+
+def favourite(a, b):
+    return min(a, b)
+
+
+def test_knockout_with_byes():
+    tournament = app.Tournament("knockout", [f"P{i}" for i in range(6)])
+    first_round = [m for m in tournament.matches if m.round == 1]
+    # Bracket of 8: the top two seeds get the byes and are already through
+    assert [m.slots for m in first_round] == [[0, app.BYE], [3, 4], [1, app.BYE], [2, 5]]
+    assert [m.result[0] for m in first_round if app.BYE in m.slots] == [0, 0]
+    assert {tuple(m.slots) for m in tournament.ready_matches()} == {(3, 4), (2, 5)}
+    semi_finals = [m for m in tournament.matches if m.round == 2]
+    assert [m.slots[0] for m in semi_finals] == [0, 1]
+
+    play(tournament, favourite)
+    assert tournament.finished() and tournament.champion == 0
+    assert tournament.rows[0]["played"] == 2        # the bye is not a match
+
+
+def test_double_elimination_loser_comes_back_to_win():
+    tournament = app.Tournament("double", ["A", "B", "C", "D"])
+    # Seed 0 loses its first match, then wins the losers bracket and the grand final
+    beaten_once = set()
+
+    def winner_of(a, b):
+        if 0 in (a, b) and not beaten_once:
+            beaten_once.add(0)
+            return b if a == 0 else a
+        return 0 if 0 in (a, b) else favourite(a, b)
+
+    play(tournament, winner_of)
+    final = tournament.matches[tournament.final_id]
+    assert final.stage == "final"
+    assert final.slots[1] == 0                      # reached the final through the losers bracket
+    assert tournament.champion == 0
+    losers = [m for m in tournament.matches if m.stage == "losers"]
+    assert all(0 in m.slots for m in losers)
+    assert tournament.rows[0]["lost"] == 1 and tournament.rows[0]["won"] == len(losers) + 1
+
+
+def test_double_elimination_knocks_out_on_the_second_loss():
+    tournament = app.Tournament("double", [f"P{i}" for i in range(8)])
+    play(tournament, favourite)
+    # The unbeaten champion; everyone else out after exactly two losses (no bracket reset)
+    assert [row["lost"] for row in tournament.rows] == [0] + [2] * 7
+    assert tournament.champion == 0
+    assert tournament.matches[tournament.final_id].slots == [0, 1]
+
+
+@pytest.mark.parametrize("players, groups", [(5, 1), (6, 1), (16, 4)])
+def test_round_robin_everyone_meets_everyone_once(players, groups):
+    tournament = app.Tournament("roundrobin", [f"P{i}" for i in range(players)], groups=groups)
+    pairs = [frozenset(m.slots) for m in tournament.matches]
+    expected = {frozenset(pair) for group in range(groups)
+                for pair in itertools.combinations(
+                    [p for p in range(players) if tournament.group_of[p] == group], 2)}
+    assert len(pairs) == len(set(pairs)) and set(pairs) == expected
+    for (stage, round_no), matches in itertools.groupby(
+            sorted(tournament.matches, key=lambda m: (m.stage, m.round)), key=lambda m: (m.stage, m.round)):
+        slots = [p for m in matches for p in m.slots]
+        assert len(slots) == len(set(slots))        # nobody plays twice in a round
+    play(tournament, favourite)
+    assert tournament.finished() and tournament.champion is None
+
+
+def test_snake_seeding_spreads_the_seeds_over_the_groups():
+    tournament = app.Tournament("roundrobin", [f"P{i}" for i in range(8)], groups=2)
+    assert tournament.group_of == [0, 1, 1, 0, 0, 1, 1, 0]
+
+
+def test_standings_tiebreaks():
+    tournament = app.Tournament("roundrobin", ["A", "B", "C", "D"])
+    results = {}
+    for match in tournament.matches:
+        results[frozenset(match.slots)] = match
+    # A and B win twice with leg difference +2, B with the better average;
+    # C and D win once with leg difference -2 and the same average, so the seed decides
+    for (winner, loser), legs, points in [((0, 2), (2, 0), (300, 400)), ((0, 3), (2, 1), (300, 400)),
+                                          ((1, 0), (2, 1), (400, 400)), ((1, 2), (2, 0), (400, 400)),
+                                          ((3, 1), (2, 1), (400, 400)), ((2, 3), (2, 0), (400, 400))]:
+        match = results[frozenset((winner, loser))]
+        slot = match.slots.index(winner)
+        tournament.record(match.id, slot, legs if slot == 0 else legs[::-1],
+                          points if slot == 0 else points[::-1], [10, 10])
+    assert [tournament.rows[p]["won"] for p in range(4)] == [2, 2, 1, 1]
+    assert [tournament.rows[p]["legs_for"] - tournament.rows[p]["legs_against"] for p in range(4)] == [2, 2, -2, -2]
+    assert tournament.standings() == [1, 0, 2, 3]
+    assert tournament.standings_lines()[0].startswith("  1. B")
+
+
+def test_standings_kept_in_order_match_a_full_sort():
+    rng = random.Random(3)
+    tournament = app.Tournament("roundrobin", [f"P{i}" for i in range(24)], groups=3)
+    while (match := tournament.next_match()) is not None:
+        slot = rng.randint(0, 1)
+        loser_legs = rng.randint(0, 1)
+        tournament.record(match.id, slot, (2, loser_legs) if slot == 0 else (loser_legs, 2),
+                          [rng.randint(200, 800), rng.randint(200, 800)], [rng.randint(8, 20), rng.randint(8, 20)])
+        for group in range(tournament.groups):
+            members = [p for p in range(24) if tournament.group_of[p] == group]
+            assert tournament.standings(group) == sorted(members, key=tournament._rank_key)
+    assert tournament.standings() == sorted(range(24), key=tournament._rank_key)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    tournament = app.Tournament("double", [f"P{i}" for i in range(6)], legs_to_win=3)
+    for _ in range(5):
+        match = tournament.next_match()
+        tournament.record(match.id, 1, (1, 3), [400, 450], [12, 11])
+    path = str(tmp_path / "cup.json")
+    app.save_tournament(tournament, path)
+    loaded = app.load_tournament(path)
+
+    assert loaded.legs_to_win == 3 and loaded.results == tournament.results
+    assert loaded.rows == tournament.rows
+    assert [m.slots for m in loaded.matches] == [m.slots for m in tournament.matches]
+    assert [m.result for m in loaded.matches] == [m.result for m in tournament.matches]
+    assert loaded.next_match().id == tournament.next_match().id
+    assert loaded.standings() == tournament.standings()
+
+
+def test_result_for_an_unready_match_is_refused():
+    tournament = app.Tournament("knockout", ["A", "B", "C", "D"])
+    final = tournament.matches[tournament.final_id]
+    with pytest.raises(ValueError):
+        tournament.record(final.id, 0, (2, 0), [0, 0], [1, 1])
+
+
+def test_next_pairing_is_announced_once_after_a_match(display, archive, tmp_path, monkeypatch, capsys):
+    cup = app.Tournament("knockout", ["Ann", "Bob", "Cid", "Dan"], legs_to_win=1)
+    monkeypatch.setattr(app, "tournament", cup)
+    monkeypatch.setattr(app, "tournament_path", str(tmp_path / "cup.json"))
+    app.prefill_tournament_match()
+    first = cup.matches[app.tournament_match_id]
+    app.reset_game(101, [cup.players[p] for p in first.slots], 1)
+    app.current_input = "101"
+    app.commit_throw()
+    assert app.state == app.STATE_END
+    capsys.readouterr()
+
+    app.handle_end_event(app.pygame.event.Event(app.pygame.KEYDOWN, key=app.pygame.K_m, mod=0, unicode="m"))
+
+    assert capsys.readouterr().out.count("Next tournament match") == 1
+    second = cup.matches[app.tournament_match_id]
+    assert [app.menu_values[key] for key in app.PLAYER_NAME_KEYS[:2]] == [cup.players[p] for p in second.slots]
@@ -0,0 +1,88 @@
+import random
+
+import pygame
+import pytest
+
+import gsszo_darts_counter as app
+
+
+def full_state():
+    """Everything a visit changes, deep-copied, including the statistics and their undo journal."""
+    return (
+        app.state, app.active_player, app.leg_starter_idx, app.winner_idx, tuple(app.legs_won),
+        [list(column) for column in app.scores], list(app.history), list(app.leg_totals),
+        list(app.match_totals), list(app.match_visits),
+        [([list(column) for column in snap["scores"]], list(snap["history"]), list(snap["totals"]),
+          snap["active_player"], snap["leg_starter_idx"], snap["winner"]) for snap in app.finished_legs_stack],
+        {name: list(column) for name, column in app.match_stats.items()},
+        [list(frame) for frame in app.stats_journal],
+    )
+
+
+def key(code, mod=0):
+    return pygame.event.Event(pygame.KEYDOWN, key=code, unicode="", mod=mod, scancode=0)
+
+
+def handle(event):
+    if app.state == app.STATE_END:
+        app.handle_end_event(event)
+    else:
+        app.handle_game_keydown(event)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_any_interleaving_of_visit_undo_and_redo_restores_the_state(seed, display, archive):
+    """
+    states[n] is the full state after the first n actions on the undo stack. Every
+    undo must land exactly on states[depth - 1] and every redo on states[depth + 1],
+    across leg and match boundaries; a new action drops the redo branch.
+    """
+    rng = random.Random(seed)
+    for _ in range(12):
+        players = rng.randint(app.MIN_PLAYERS, 5)
+        app.reset_game(rng.choice((101, 170, 301)), [f"P{i}" for i in range(players)],
+                       rng.randint(1, 3), rng.random() < 0.8)
+        states = [full_state()]
+        for step in range(800):
+            depth = len(app.undo_stack)
+            roll = rng.random()
+            if roll < 0.3:
+                handle(key(pygame.K_BACKSPACE) if rng.random() < 0.5 else key(pygame.K_z, pygame.KMOD_LCTRL))
+                if depth:
+                    assert len(app.undo_stack) == depth - 1, step
+                    assert full_state() == states[depth - 1], step
+            elif roll < 0.55:
+                could_redo = bool(app.redo_stack) and app.state == app.STATE_GAME
+                handle(key(pygame.K_y, pygame.KMOD_LCTRL))
+                if could_redo:
+                    assert len(app.undo_stack) == depth + 1, step
+                    assert full_state() == states[depth + 1], step
+            elif app.state != app.STATE_END:
+                if roll < 0.6:
+                    handle(key(pygame.K_TAB))
+                else:
+                    remaining = app.START_SCORE - app.leg_totals[app.active_player]
+                    value = remaining if rng.random() < 0.3 and remaining <= 170 else rng.randint(0, 180)
+                    app.current_input = str(value)
+                    app.commit_throw(rng.random() < 0.9)
+                if len(app.undo_stack) == depth + 1:
+                    assert not app.redo_stack
+                    del states[depth + 1:]
+                    states.append(full_state())
+
+        while app.undo_action():
+            pass
+        assert full_state() == states[0]
+        assert app.stats_journal == []
+
+
+def test_undo_across_a_match_win_reopens_the_match(display, archive):
+    app.reset_game(101, ["A", "B", "C"], 1)
+    before = full_state()
+    app.current_input = "101"
+    app.commit_throw()
+    assert app.state == app.STATE_END and app.winner_idx == 0
+    assert app.undo_action()
+    assert app.state == app.STATE_GAME and full_state() == before
+    assert app.redo_action()
+    assert app.state == app.STATE_END and app.legs_won == [1, 0, 0]
@@ -0,0 +1,41 @@
+import concurrent.futures
+
+import gsszo_darts_counter as app
+
+
+def finished(result):
+    future = concurrent.futures.Future()
+    future.set_result(result)
+    return future
+
+
+def test_rematch_drops_chances_of_the_previous_match(display, archive, monkeypatch):
+    estimator = app.WinChanceEstimator()
+    monkeypatch.setattr(app, "win_chance", estimator)
+    app.reset_game(501, ["A", "B", "C", "D"], 2)
+    estimator.generation = 5
+    estimator.running = (5, finished([0.1, 0.2, 0.3, 0.4]))
+    estimator.queued = (5, None)
+
+    app.reset_game(501, ["A", "B"], 2)         # rematch before the old simulation is picked up
+    estimator.poll()
+    assert estimator.chances is None and estimator.queued is None and estimator.running is None
+
+
+def test_result_for_another_player_count_is_dropped(display, archive, monkeypatch):
+    estimator = app.WinChanceEstimator()
+    monkeypatch.setattr(app, "win_chance", estimator)
+    app.reset_game(501, ["A", "B"], 2)
+    estimator.running = (estimator.generation, finished([0.2, 0.3, 0.5]))
+    estimator.poll()
+    assert estimator.chances is None
+
+    estimator.running = (estimator.generation, finished([0.4, 0.6]))
+    estimator.poll()
+    assert estimator.chances == [0.4, 0.6]
+
+
+def test_short_chances_do_not_break_the_frame(display, archive):
+    app.reset_game(501, ["A", "B", "C"], 2)
+    snap = app.game_snapshot()._replace(win_chances=(0.5, 0.5))
+    app.draw_game_frame(app.screen, snap, 0.0)